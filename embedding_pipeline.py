@@ -0,0 +1,170 @@
+"""
+Batch embedding pipeline
+Feeds movie records into a vector index (Pinecone or vector_index.LocalVectorIndex)
+with as few embeddings API calls as possible:
+
+  * records come from the overnight movie store or a details_cache.db-style SQLite table
+  * texts are sent in large batches (one request embeds hundreds of plots)
+  * a bounded number of batches are in flight at once
+  * records whose text hash hasn't changed since the last run are skipped
+  * every finished batch is upserted and recorded straight away, so an
+    interrupted run keeps what it already paid for
+
+The embeddings client is passed in (anything with .embeddings.create), so
+tests and offline runs can use fake_openai.FakeOpenAI.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import random
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from vector_index import vector_id, movie_embedding_text, movie_metadata
+
+EMBED_MODEL = "text-embedding-3-small"
+EMBED_STATE_FILE = "embedding_state.db"
+BATCH_SIZE = 512        # inputs per embeddings request (the API accepts up to 2048)
+MAX_IN_FLIGHT = 4       # concurrent embeddings requests
+UPSERT_BATCH = 100      # vectors per index upsert (Pinecone caps a request at ~2 MB)
+MAX_ATTEMPTS = 4
+
+
+# ----- SOURCES -----
+
+def records_from_store(store):
+    """(cache_key, details) pairs with a plot from a MovieStore"""
+    for cache_key, details in store.items():
+        if details and details.get("plot") and details["plot"] != "N/A":
+            yield cache_key, details
+
+
+def records_from_sqlite(db_path, table="movie_details"):
+    """(cache_key, details) pairs with a plot from a cache_key/payload JSON table (e.g. details_cache.db)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        for cache_key, payload in conn.execute(f'SELECT cache_key, payload FROM {table}'):
+            try:
+                details = json.loads(payload) if payload else None
+            except ValueError:
+                continue
+            if details and details.get("plot") and details["plot"] != "N/A":
+                yield cache_key, details
+    finally:
+        conn.close()
+
+
+# ----- STATE (what has already been embedded) -----
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def open_state(path=EMBED_STATE_FILE):
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS embedded (
+            target TEXT NOT NULL,
+            cache_key TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            embedded_at REAL NOT NULL,
+            PRIMARY KEY (target, cache_key)
+        )
+    ''')
+    return conn
+
+
+def embedded_hashes(state, target, model):
+    """{cache_key: content_hash} already embedded into a target with this model"""
+    return dict(state.execute(
+        'SELECT cache_key, content_hash FROM embedded WHERE target = ? AND model = ?', (target, model)
+    ))
+
+
+# ----- PIPELINE -----
+
+def embed_batch(client, model, texts):
+    """One embeddings request, retried with jittered backoff. Returns vectors in input order"""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = client.embeddings.create(model=model, input=texts)
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = random.uniform(0, min(30, 2 ** attempt))
+            print(f"  ⚠️  Embeddings request failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def run_pipeline(client, index, records, target, model=EMBED_MODEL, state_path=EMBED_STATE_FILE,
+                 batch_size=BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT, force=False):
+    """Embed every changed record into `index`. Returns a stats dict"""
+    state = open_state(state_path)
+    known = {} if force else embedded_hashes(state, target, model)
+
+    # Only records whose embedding text changed (or are new) cost an API call
+    pending = []
+    skipped = 0
+    for cache_key, details in records:
+        text = movie_embedding_text(details)
+        digest = content_hash(text)
+        if known.get(cache_key) == digest:
+            skipped += 1
+            continue
+        pending.append((cache_key, details, text, digest))
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    stats = {"skipped": skipped, "embedded": 0, "failed": 0, "requests": 0, "batches": len(batches)}
+    print(f"🧮 {len(pending)} records to embed in {len(batches)} batches ({skipped} unchanged, skipped)")
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        in_flight = {}
+        queue = iter(batches)
+
+        def submit_next():
+            batch = next(queue, None)
+            if batch is not None:
+                in_flight[pool.submit(embed_batch, client, model, [item[2] for item in batch])] = batch
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        # Upserts happen on this thread, one finished batch at a time
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                submit_next()
+                stats["requests"] += 1
+                try:
+                    vectors = future.result()
+                except Exception as e:
+                    print(f"  ❌ Batch of {len(batch)} failed: {e} - will retry next run")
+                    stats["failed"] += len(batch)
+                    continue
+
+                records = [
+                    {"id": vector_id(cache_key), "values": vector, "metadata": movie_metadata(cache_key, details)}
+                    for (cache_key, details, _, _), vector in zip(batch, vectors)
+                ]
+                for start in range(0, len(records), UPSERT_BATCH):
+                    index.upsert(vectors=records[start:start + UPSERT_BATCH])
+                now = time.time()
+                state.executemany(
+                    'INSERT OR REPLACE INTO embedded (target, cache_key, content_hash, model, embedded_at) VALUES (?, ?, ?, ?, ?)',
+                    [(target, cache_key, digest, model, now) for cache_key, _, _, digest in batch]
+                )
+                state.commit()
+                stats["embedded"] += len(batch)
+
+                elapsed = time.time() - started
+                print(f"📊 PROGRESS: {stats['embedded']}/{len(pending)} embedded ({stats['embedded'] / elapsed:.0f}/s)")
+
+    state.close()
+    stats["seconds"] = round(time.time() - started, 2)
+    return stats
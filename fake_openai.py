@@ -0,0 +1,86 @@
+"""
+Offline stand-in for the OpenAI client
+Set OPENAI_FAKE=1 to run horror.py with no network access or API key. It mimics
+the parts of openai.OpenAI the app uses - chat.completions.create, including
+stream=True, and embeddings.create - and answers with canned, deterministic
+output. Fake embeddings are hashed bags of words, so texts sharing words
+still land near each other.
+"""
+
+import re
+import json
+import math
+import time
+import hashlib
+from types import SimpleNamespace
+
+
+class FakeOpenAI:
+    """Drop-in replacement for openai.OpenAI() that never leaves the process"""
+
+    def __init__(self, reply=None, chunk_delay=0.02, embedding_dim=1536):
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.embedding_dim = embedding_dim
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+        self.embeddings = SimpleNamespace(create=self._create_embedding)
+
+    def _reply_for(self, messages):
+        if self.reply:
+            return self.reply
+        user_message = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+        quiz = re.search(r"Write (\d+) multiple-choice trivia questions about the horror movie '(.+?)'", user_message)
+        if quiz:
+            return self._quiz_reply(int(quiz.group(1)), quiz.group(2))
+        return f"The Oracle is offline, but here's the vibe: \"{user_message[:80]}\" sounds like a perfect excuse for a horror night. Grab the popcorn and keep the lights on!"
+
+    def _quiz_reply(self, count, movie):
+        """A well-formed quiz array, wrapped in the kind of prose real models add"""
+        questions = [
+            {"question": f"Offline trivia #{i + 1}: which of these is true about {movie}?",
+             "options": [f"Fact {i + 1}", f"Myth {i + 1}a", f"Myth {i + 1}b", f"Myth {i + 1}c"],
+             "answer": "A"}
+            for i in range(count)
+        ]
+        return "Here is your quiz!\n```json\n" + json.dumps(questions, indent=2) + "\n```"
+
+    def _create_completion(self, model=None, messages=None, stream=False, **kwargs):
+        messages = messages or []
+        self.calls.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+        text = self._reply_for(messages)
+
+        if not stream:
+            message = SimpleNamespace(role="assistant", content=text)
+            return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+        return self._stream(text)
+
+    def _stream(self, text):
+        """Yield chunks shaped like the real ChatCompletionChunk objects"""
+        for piece in re.findall(r"\S+\s*", text):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            delta = SimpleNamespace(role="assistant", content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+        delta = SimpleNamespace(role=None, content=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason="stop")])
+
+    def embed(self, text):
+        """Deterministic unit vector: each word adds weight to a couple of hashed dimensions"""
+        vector = [0.0] * self.embedding_dim
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            for i in range(2):
+                slot = int.from_bytes(digest[i * 4:i * 4 + 4], "little")
+                vector[slot % self.embedding_dim] += 1.0 if digest[8 + i] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _create_embedding(self, model=None, input=None, **kwargs):
+        inputs = [input] if isinstance(input, str) else list(input or [])
+        self.calls.append({"model": model, "input": inputs, **kwargs})
+        data = [SimpleNamespace(object="embedding", index=i, embedding=self.embed(text)) for i, text in enumerate(inputs)]
+        tokens = sum(len(text.split()) for text in inputs)
+        return SimpleNamespace(data=data, model=model, usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
@@ -0,0 +1,120 @@
+"""
+DAVE'S SCREAMING OFFICIAL LLM CHATBOT
+Horror Stats Builder Script
+Computes stable gore/fear/kills scores for the whole catalogue into
+horror_stats.db (see horror_stats.py), from the overnight movie cache, the
+horror subset in horror_movies.db and the community rating aggregates in
+user_data.db. /get-movie-stats then only looks them up. Rerun it whenever
+the cache or the ratings have grown.
+
+    python horror-stats-builder.py
+    python horror-stats-builder.py --db horror_movies.db --user-db user_data.db
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import sqlite3
+import argparse
+from datetime import datetime
+
+from movie_store import MovieStore, MOVIE_STORE_DIR
+from title_index import GENRE_BITS, HORROR_TABLE, has_horror_table, normalize_title_key
+from horror_stats import HORROR_STATS_FILE, open_stats_db, compute_stats, save_stats
+
+WRITE_BATCH = 5000
+
+
+def genre_ids_from_flags(flags):
+    return [genre_id for genre_id, bit in GENRE_BITS.items() if flags & bit]
+
+
+def load_catalogue(args):
+    """{title_key: {"title", "details", "genre_ids"}} from the movie store and the horror subset"""
+    catalogue = {}
+
+    store = MovieStore(MOVIE_STORE_DIR, read_only=True)
+    for cache_key, details in store.items():
+        if not details:
+            continue
+        title = details.get("title") or cache_key
+        catalogue.setdefault(normalize_title_key(title), {"title": title, "details": None, "genre_ids": None})["details"] = details
+    store.close()
+    print(f"🎬 Movie store: {len(catalogue)} titles")
+
+    if args.db and os.path.exists(args.db):
+        conn = sqlite3.connect(args.db)
+        try:
+            if has_horror_table(conn):
+                count = 0
+                for title, title_key, flags in conn.execute(f'SELECT title, title_key, genre_flags FROM {HORROR_TABLE}'):
+                    entry = catalogue.setdefault(title_key, {"title": title, "details": None, "genre_ids": None})
+                    entry["genre_ids"] = genre_ids_from_flags(flags or 0)
+                    count += 1
+                print(f"🎃 Horror subset: {count} titles")
+        finally:
+            conn.close()
+    return catalogue
+
+
+def load_ratings(path):
+    """{title_key: {"average", "count"}} from the community rating aggregates"""
+    if not path or not os.path.exists(path):
+        return {}
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute('SELECT title_key, title, count, total FROM rating_aggregates WHERE count > 0').fetchall()
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+    return {key: {"title": title, "average": total / count, "count": count} for key, title, count, total in rows}
+
+
+def main():
+    """Run the horror stats builder"""
+    parser = argparse.ArgumentParser(description="Precompute gore/fear/kills for every known title")
+    parser.add_argument("--db", default="horror_movies.db", help="TMDB export database with the horror subset")
+    parser.add_argument("--user-db", default=os.getenv("USER_DB_FILE", "user_data.db"), help="database with the rating aggregates")
+    args = parser.parse_args()
+
+    print("🩸 DAVE'S SCREAMING OFFICIAL - HORROR STATS BUILDER 🩸")
+    print("=" * 50)
+    print(f"Starting stats build at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    catalogue = load_catalogue(args)
+    ratings = load_ratings(args.user_db)
+    print(f"⭐ Rated titles: {len(ratings)}")
+
+    # Rated titles nobody has cached still get a score
+    for key, rating in ratings.items():
+        catalogue.setdefault(key, {"title": rating["title"], "details": None, "genre_ids": None})
+    print("=" * 50)
+
+    conn = open_stats_db(HORROR_STATS_FILE)
+    rows = []
+    written = 0
+    for key, entry in catalogue.items():
+        rating = ratings.get(key)
+        sources = [name for name, present in (("metadata", entry["details"]), ("genres", entry["genre_ids"]), ("ratings", rating)) if present]
+        stats = compute_stats(entry["title"], entry["details"], entry["genre_ids"], rating)
+        rows.append((entry["title"], stats, "+".join(sources) or "title"))
+        if len(rows) >= WRITE_BATCH:
+            save_stats(conn, rows)
+            written += len(rows)
+            rows = []
+            print(f"📊 PROGRESS: {written}/{len(catalogue)} titles")
+    save_stats(conn, rows)
+    written += len(rows)
+    conn.close()
+
+    print("\n" + "=" * 50)
+    print("🎉 HORROR STATS BUILD COMPLETE!")
+    print(f"✅ Titles scored: {written} -> {HORROR_STATS_FILE}")
+    print(f"Finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
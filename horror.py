@@ -2,29 +2,134 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import sys
 import json
-import requests
-from flask import Flask, request, jsonify, send_from_directory
+import re
+from flask import Flask, request, jsonify, send_from_directory, Response
 from flask_cors import CORS
 from openai import OpenAI
 from pinecone import Pinecone, ServerlessSpec
 from urllib.parse import quote 
 import sqlite3
+import numpy as np
 import datetime
 import random
-from collections import defaultdict
+import hashlib
+import hmac
+from collections import defaultdict, OrderedDict, deque
+import threading
+import atexit
+import signal
 import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FuturesTimeout
+from title_index import has_title_index, resolve_title, has_horror_table, resolve_horror_title, normalize_title_key, genre_flags, HORROR_TABLE
+import upstream_client as upstream
+from fake_openai import FakeOpenAI
+from recommendation_graph import GRAPH_FILE, load_graph
+from movie_store import MovieStore, MOVIE_STORE_DIR
+from vector_index import LocalVectorIndex, VECTOR_INDEX_PATH
+import quiz_bank
+from horror_stats import HORROR_STATS_FILE, open_stats_db, lookup_stats, compute_stats
 
 # ----- CONFIG -----
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY") 
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 OMDB_API_KEY = os.getenv("OMDB_API_KEY")
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 INDEX_NAME = "horror-movies"
 EMBED_MODEL = "text-embedding-3-small"
 
+# Movie details cache (memory LRU in front of an on-disk SQLite store)
+DETAILS_CACHE_FILE = os.getenv("DETAILS_CACHE_FILE", "details_cache.db")
+DETAILS_CACHE_SIZE = int(os.getenv("DETAILS_CACHE_SIZE", "1000"))
+DETAILS_CACHE_TTL = int(os.getenv("DETAILS_CACHE_TTL", str(7 * 24 * 3600)))  # found titles: 7 days
+DETAILS_NEGATIVE_TTL = int(os.getenv("DETAILS_NEGATIVE_TTL", str(6 * 3600)))  # "not found" titles: 6 hours
+TMDB_ID_CACHE_TTL = int(os.getenv("TMDB_ID_CACHE_TTL", str(30 * 24 * 3600)))  # title -> TMDB id: 30 days
+
+# How often to check whether recommendation-graph-builder.py published a new graph
+GRAPH_RELOAD_INTERVAL = float(os.getenv("GRAPH_RELOAD_INTERVAL", "60"))
+
+# ...and whether overnight-cache-builder.py published a new generation of the movie store
+OVERNIGHT_CACHE_RELOAD_INTERVAL = float(os.getenv("OVERNIGHT_CACHE_RELOAD_INTERVAL", "30"))
+
+# Semantic search: "general"/"recommendation" queries are answered from embedded plots
+# (Pinecone if configured, otherwise the local index built by semantic-index-builder.py)
+SEMANTIC_QUERY_TYPES = ['general', 'recommendation']
+SEMANTIC_TOP_K = int(os.getenv("SEMANTIC_TOP_K", "5"))
+SEMANTIC_MIN_SCORE = float(os.getenv("SEMANTIC_MIN_SCORE", "0.2"))
+SEMANTIC_DEADLINE = float(os.getenv("SEMANTIC_DEADLINE", "3"))
+VECTOR_RELOAD_INTERVAL = float(os.getenv("VECTOR_RELOAD_INTERVAL", "60"))
+
+# "Movies like X" from plot-embedding similarity in the local index (after the graph, before live TMDB)
+SIMILARITY_RECOMMENDATIONS = os.getenv("SIMILARITY_RECOMMENDATIONS", "1") != "0"
+
+# GPT response cache: several variants per (query type, query, movie, depth), rotated on hits
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2000"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", str(12 * 3600)))
+RESPONSE_CACHE_VARIANTS = int(os.getenv("RESPONSE_CACHE_VARIANTS", "3"))
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.9"))  # 0 = exact matches only
+
+# /theater-releases and /recent-releases are served from memory and refreshed in the
+# background (stale-while-revalidate); payloads are shared between workers via details_cache.db
+RELEASES_REFRESH_INTERVAL = float(os.getenv("RELEASES_REFRESH_INTERVAL", str(3 * 3600)))
+RELEASES_RETRY_INTERVAL = float(os.getenv("RELEASES_RETRY_INTERVAL", "120"))  # after a failed refresh
+RELEASES_PAGES = int(os.getenv("RELEASES_PAGES", "3"))
+RELEASES_MAX_AGE = int(os.getenv("RELEASES_MAX_AGE", "300"))  # browser Cache-Control max-age
+RELEASES_SEED_TIMEOUT = float(os.getenv("RELEASES_SEED_TIMEOUT", "3"))  # cold worker with no shared copy: one short fetch
+
+# Genre buttons are served from pools hydrated (details + recommendations) in the background
+GENRE_POOL_REFRESH_INTERVAL = float(os.getenv("GENRE_POOL_REFRESH_INTERVAL", str(6 * 3600)))
+GENRE_POOL_EXPANSION = int(os.getenv("GENRE_POOL_EXPANSION", "20"))  # extra titles per genre from the horror subset
+GENRE_POOL_RETRY_INTERVAL = float(os.getenv("GENRE_POOL_RETRY_INTERVAL", "600"))  # titles that couldn't be fetched
+
+# /quiz serves pre-generated sets from quiz_bank.db (see quiz-bank-builder.py);
+# titles with too few sets are topped up on a small background pool
+QUIZ_REFILL_WORKERS = int(os.getenv("QUIZ_REFILL_WORKERS", "2"))
+QUIZ_REFILL_MAX_QUEUED = int(os.getenv("QUIZ_REFILL_MAX_QUEUED", "20"))  # titles queued or generating per process
+
+# User profiles live in SQLite; user_data.json is migrated into it on first start
+USER_DB_FILE = os.getenv("USER_DB_FILE", "user_data.db")
+USER_DATA_JSON = "user_data.json"
+
+# Reviews live in the user store; each worker keeps the newest few per title in memory
+RECENT_REVIEWS = int(os.getenv("RECENT_REVIEWS", "10"))
+REVIEW_CACHE_TITLES = int(os.getenv("REVIEW_CACHE_TITLES", "1000"))
+REVIEW_CACHE_TTL = float(os.getenv("REVIEW_CACHE_TTL", "30"))  # bounds staleness across workers
+REVIEW_PAGE_SIZE = 20
+
+# /admin/* endpoints require this token (X-Admin-Token header, or the session cookie /admin/login
+# sets after checking it); unset = disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+ADMIN_SESSION_MAX_AGE = int(os.getenv("ADMIN_SESSION_MAX_AGE", str(12 * 3600)))
+
+# Genre clicks are buffered in memory and flushed on a timer / size threshold
+GENRE_FLUSH_INTERVAL = float(os.getenv("GENRE_FLUSH_INTERVAL", "5"))
+GENRE_FLUSH_MAX_PENDING = int(os.getenv("GENRE_FLUSH_MAX_PENDING", "500"))
+
+# Background threads (genre click flush, release refresher, genre pools) start with the first
+# request or from __main__ - never on import. 0 = don't start them (tests, one-off scripts)
+BACKGROUND_WORKERS = os.getenv("BACKGROUND_WORKERS", "1") != "0"
+
+# ask_oracle fans independent upstream calls out to a bounded thread pool
+ORACLE_PARALLEL = os.getenv("ORACLE_PARALLEL", "1") != "0"
+ORACLE_WORKERS = int(os.getenv("ORACLE_WORKERS", "16"))
+GPT_DEADLINE = float(os.getenv("GPT_DEADLINE", "12"))  # seconds from the start of the request
+DETAILS_DEADLINE = float(os.getenv("DETAILS_DEADLINE", "8"))
+RECOMMENDATIONS_DEADLINE = float(os.getenv("RECOMMENDATIONS_DEADLINE", "8"))
+
+# TMDB/OMDB calls made while a user waits get a short per-call budget; the offline
+# builders keep upstream_client's generous defaults
+REQUEST_UPSTREAM_TIMEOUT = float(os.getenv("REQUEST_UPSTREAM_TIMEOUT", "3"))  # read timeout per attempt
+REQUEST_UPSTREAM_RETRIES = int(os.getenv("REQUEST_UPSTREAM_RETRIES", "1"))
+REQUEST_UPSTREAM_BUDGET = float(os.getenv("REQUEST_UPSTREAM_BUDGET", "5"))  # all attempts and backoff together
+
 # ----- CLIENTS -----
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+if os.getenv("OPENAI_FAKE") == "1":
+    # Offline mode: canned, streamable replies (see fake_openai.py)
+    client = FakeOpenAI()
+else:
+    client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
 # Pinecone initialization (newer API format)
 if PINECONE_API_KEY:
@@ -37,18 +142,383 @@ else:
 db_conn = sqlite3.connect('horror_movies.db', check_same_thread=False)
 db_cursor = db_conn.cursor()
 
+# Title resolver over the imported TMDB export (see import_tmdb.py / title_index.py)
+db_lock = threading.Lock()
+TITLE_INDEX_READY = has_title_index(db_conn)
+HORROR_TABLE_READY = has_horror_table(db_conn)
+
+def resolve_title_locally(title):
+    """Resolve a title to a TMDB movie row - horror subset first, then the full FTS index - or None"""
+    with db_lock:
+        if HORROR_TABLE_READY:
+            movie = resolve_horror_title(db_conn, title)
+            if movie:
+                return movie
+        if TITLE_INDEX_READY:
+            return resolve_title(db_conn, title)
+    return None
+
+# ----- CONCURRENT UPSTREAM CALLS -----
+oracle_executor = ThreadPoolExecutor(max_workers=ORACLE_WORKERS, thread_name_prefix="oracle")
+
+ORACLE_TIMEOUT_RESPONSE = "The spirits are disturbed, but I'd love to talk horror with you! What kind of scares are you looking for?"
+
+def run_async(fn, *args):
+    """Start fn on the oracle thread pool (or run it inline when ORACLE_PARALLEL is off)"""
+    if ORACLE_PARALLEL:
+        return oracle_executor.submit(fn, *args)
+    
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def wait_for(future, deadline, fallback, label):
+    """Join a future by an absolute deadline, returning fallback on timeout or error"""
+    try:
+        return future.result(timeout=max(0, deadline - time.time()))
+    except FuturesTimeout:
+        print(f"⏰ {label} missed its deadline - continuing without it")
+    except Exception as e:
+        print(f"{label} error: {e}")
+    return fallback
+
+# ----- RECOMMENDATION GRAPH (built offline by recommendation-graph-builder.py) -----
+rec_graph = {"by_id": {}, "by_title": {}, "mtime": None, "checked_at": 0}
+rec_graph_lock = threading.Lock()
+
+# ----- SEMANTIC SEARCH (plots embedded offline by semantic-index-builder.py) -----
+local_vectors = {"index": None, "mtime": None, "checked_at": 0}
+local_vectors_lock = threading.Lock()
+
+# ----- OVERNIGHT CACHE (built offline by overnight-cache-builder.py, see movie_store.py) -----
+overnight_cache = {"store": None, "checked_at": 0, "hits": 0, "misses": 0}
+overnight_cache_lock = threading.Lock()
+
+# ----- MOVIE DETAILS CACHE -----
+CACHE_MISS = object()
+
+class TieredCache:
+    """In-process LRU with per-entry TTL, backed by a SQLite table on disk.
+
+    A value of None is a negative entry ("looked it up, it doesn't exist") and
+    is kept for negative_ttl instead of ttl. get() returns CACHE_MISS when
+    neither tier has a fresh entry.
+    """
+
+    def __init__(self, db_path, table, max_items, ttl, negative_ttl):
+        self.table = table
+        self.max_items = max_items
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = defaultdict(int)
+
+        self.disk = sqlite3.connect(db_path, check_same_thread=False)
+        self.disk.execute('PRAGMA journal_mode=WAL')
+        self.disk.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                cache_key TEXT PRIMARY KEY,
+                payload TEXT,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        self.disk.commit()
+
+    def _remember(self, key, value, expires_at):
+        self.memory[key] = (expires_at, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_items:
+            self.memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self.memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    if value is None:
+                        self.counters["negative_hits"] += 1
+                    return value
+                del self.memory[key]
+                self.counters["expired"] += 1
+
+            row = self.disk.execute(
+                f'SELECT payload, expires_at FROM {self.table} WHERE cache_key = ?', (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                self.counters["disk_hits"] += 1
+                if value is None:
+                    self.counters["negative_hits"] += 1
+                return value
+
+            self.counters["misses"] += 1
+            return CACHE_MISS
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        expires_at = time.time() + ttl
+        with self.lock:
+            self._remember(key, value, expires_at)
+            try:
+                self.disk.execute(
+                    f'INSERT OR REPLACE INTO {self.table} (cache_key, payload, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), expires_at)
+                )
+                self.disk.commit()
+            except sqlite3.Error as e:
+                print(f"Cache write error ({self.table}): {e}")
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self.memory)
+        hits = stats.get("memory_hits", 0) + stats.get("disk_hits", 0)
+        lookups = hits + stats.get("misses", 0)
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one in-flight call.
+
+    The first caller (the leader) runs the function; everyone arriving while
+    it's running waits and gets the same result or exception. If the leader
+    was torn down instead (KeyboardInterrupt, SystemExit from the SIGTERM
+    handler), that's not an answer - a waiting caller runs the call itself.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.counters = defaultdict(int)
+
+    def do(self, key, fn, *args):
+        while True:
+            with self.lock:
+                call = self.calls.get(key)
+                leader = call is None
+                if leader:
+                    call = {"done": threading.Event(), "result": None, "error": None}
+                    self.calls[key] = call
+                    self.counters["leaders"] += 1
+                else:
+                    self.counters["shared"] += 1
+            
+            if leader:
+                break
+            call["done"].wait()
+            error = call["error"]
+            if error is None:
+                return call["result"]
+            if isinstance(error, Exception):
+                raise error
+            self.counters["retried"] += 1
+        
+        try:
+            call["result"] = fn(*args)
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["done"].set()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["in_flight"] = len(self.calls)
+        return stats
+
+upstream_flight = SingleFlight()
+
+def request_upstream_get(url):
+    """upstream.get with the request-path budget (see REQUEST_UPSTREAM_*)"""
+    return upstream.get(url, timeout=(upstream.CONNECT_TIMEOUT, REQUEST_UPSTREAM_TIMEOUT),
+                        retries=REQUEST_UPSTREAM_RETRIES, budget=REQUEST_UPSTREAM_BUDGET)
+
+class ResponseCache:
+    """Cache of GPT replies keyed on (query_type, normalized query, movie_title, depth).
+
+    Each key collects up to `variants` different replies before it starts
+    serving them, round-robin - so repeat questions still get some of the
+    temperature=0.9 variety without another completion. With an embed_fn and
+    a similarity threshold, a new query also matches an existing key in the
+    same (query_type, movie_title, depth) bucket when their embeddings are
+    close enough ("bloodiest movies" ~ "goriest films"). Query types whose
+    query text names the movie (exact_only_types) never match by similarity.
+    """
+
+    def __init__(self, max_keys, ttl, variants, similarity=0.0, embed_fn=None, exact_only_types=()):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.variants = variants
+        self.similarity = similarity
+        self.embed_fn = embed_fn if similarity > 0 else None
+        self.exact_only_types = set(exact_only_types)
+        self.entries = OrderedDict()
+        self.aliases = OrderedDict()  # key -> key of the similar entry it was matched to
+        self.query_embeddings = OrderedDict()  # key -> embedding, for keys that don't have an entry yet
+        self.lock = threading.Lock()
+        self.counters = defaultdict(int)
+
+    @staticmethod
+    def make_key(query_type, query, movie_title, depth):
+        return (query_type, normalize_title_key(query), (movie_title or "").lower().strip(), depth)
+
+    def _similar_key(self, key):
+        """Closest live entry in the same bucket, if it clears the threshold"""
+        now = time.time()
+        with self.lock:
+            candidates = [(k, entry["embedding"]) for k, entry in self.entries.items()
+                          if k[0] == key[0] and k[2:] == key[2:] and entry["embedding"] is not None
+                          and entry["expires_at"] > now]
+        if not candidates:
+            return None
+        
+        embedding = self._embedding(key)
+        if embedding is None:
+            return None
+        scores = np.stack([candidate for _, candidate in candidates]) @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        best_key = candidates[best][0]
+        print(f"🧠 Response cache: \"{key[1]}\" ~ \"{best_key[1]}\" ({scores[best]:.2f})")
+        return best_key
+
+    def _embedding(self, key):
+        """Unit-length embedding of a key's normalized query.
+
+        Embedded once per miss: whichever of get()/put() needs it first
+        remembers it in query_embeddings, and put() moves it onto the new
+        entry. A failed embedding isn't remembered, so the next call retries."""
+        with self.lock:
+            if key in self.entries:
+                return self.entries[key]["embedding"]
+            if key in self.query_embeddings:
+                return self.query_embeddings[key]
+        try:
+            vector = self.embed_fn(key[1])
+        except Exception as e:
+            print(f"Response cache embedding error: {e}")
+            return None
+        vector = np.asarray(vector, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        with self.lock:
+            self._remember(self.query_embeddings, key, vector)
+        return vector
+
+    def _remember(self, table, key, value):
+        """Bounded LRU insert into one of the side tables"""
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_keys:
+            table.popitem(last=False)
+
+    def _live_entry(self, key):
+        """The key's entry, or None once it has expired (expired entries are dropped,
+        keeping their embedding so the key can be re-cached without embedding again).
+        Caller holds the lock."""
+        entry = self.entries.get(key)
+        if entry is not None and entry["expires_at"] <= time.time():
+            del self.entries[key]
+            if entry["embedding"] is not None:
+                self._remember(self.query_embeddings, key, entry["embedding"])
+            entry = None
+        return entry
+
+    def _resolve(self, key):
+        with self.lock:
+            if self._live_entry(key) is not None:
+                return key
+            alias = self.aliases.get(key)
+            if alias is not None:
+                if self._live_entry(alias) is not None:
+                    return alias
+                del self.aliases[key]
+        
+        if self.embed_fn is None or key[0] in self.exact_only_types:
+            return key
+        similar = self._similar_key(key)
+        if similar is None:
+            return key
+        with self.lock:
+            self._remember(self.aliases, key, similar)
+        return similar
+
+    def get(self, query_type, query, movie_title=None, depth=0):
+        """A cached reply once the key has all its variants, else None (caller asks GPT, then put()s)"""
+        key = self._resolve(self.make_key(query_type, query, movie_title, depth))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or len(entry["replies"]) < self.variants or entry["expires_at"] <= time.time():
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            reply = entry["replies"][entry["next"] % len(entry["replies"])]
+            entry["next"] += 1
+            self.counters["hits"] += 1
+            return reply
+
+    def put(self, query_type, query, movie_title, depth, reply):
+        """Store one more variant for the key (or the similar key get() matched it to)"""
+        if not reply:
+            return
+        key = self._resolve(self.make_key(query_type, query, movie_title, depth))
+        embedding = self._embedding(key) if self.embed_fn and key[0] not in self.exact_only_types else None
+        with self.lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                entry = {"replies": [], "next": 0, "embedding": embedding, "expires_at": time.time() + self.ttl}
+                self.entries[key] = entry
+                self.query_embeddings.pop(key, None)
+            if len(entry["replies"]) < self.variants:
+                entry["replies"].append(reply)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_keys:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["keys"] = len(self.entries)
+            stats["complete_keys"] = sum(1 for entry in self.entries.values() if len(entry["replies"]) >= self.variants)
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["hit_rate"] = round(stats.get("hits", 0) / lookups, 3) if lookups else 0.0
+        return stats
+
+details_cache = TieredCache(DETAILS_CACHE_FILE, "movie_details", DETAILS_CACHE_SIZE,
+                            DETAILS_CACHE_TTL, DETAILS_NEGATIVE_TTL)
+
+# Title -> {"id", "title"} on TMDB, shared by details, recommendations and trailers
+tmdb_id_cache = TieredCache(DETAILS_CACHE_FILE, "tmdb_ids", DETAILS_CACHE_SIZE,
+                            TMDB_ID_CACHE_TTL, DETAILS_NEGATIVE_TTL)
+
+def embed_text(text):
+    """Embedding vector for one text (EMBED_MODEL)"""
+    return client.embeddings.create(model=EMBED_MODEL, input=[text]).data[0].embedding
+
+# specific_movie queries carry the title in the query text, so only exact repeats may share replies
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, RESPONSE_CACHE_VARIANTS,
+                               RESPONSE_CACHE_SIMILARITY, embed_text if client else None,
+                               exact_only_types=['specific_movie'])
+
 app = Flask(__name__, static_url_path="", static_folder=".")
 CORS(app)
 
-# ----- IN-MEMORY STORAGE FOR RATINGS AND REVIEWS -----
-movie_ratings = defaultdict(list)
-movie_reviews = defaultdict(list)
-movie_stats = defaultdict(lambda: {
-    "gore": 0,
-    "fear": 0,
-    "kills": 0
-})
-
 # Track conversation depth for "Tell Me More" variations
 conversation_depth = defaultdict(int)
 
@@ -91,6 +561,76 @@ HORROR_KNOWLEDGE = {
     ]
 }
 
+# Hand-picked titles behind the genre buttons (/random-genre/<genre>); GenrePools adds more from the horror subset
+GENRE_MOVIES = {
+    "slashers": [
+        "Halloween", "Friday the 13th", "A Nightmare on Elm Street", "Scream",
+        "Child's Play", "Texas Chainsaw Massacre", "Candyman", "I Know What You Did Last Summer",
+        "Black Christmas", "My Bloody Valentine", "Sleepaway Camp", "The Burning"
+    ],
+    "zombies": [
+        "Dawn of the Dead", "28 Days Later", "Train to Busan", "Shaun of the Dead",
+        "Night of the Living Dead", "World War Z", "Zombieland", "Return of the Living Dead",
+        "Day of the Dead", "28 Weeks Later", "Dead Snow", "Rec"
+    ],
+    "vampires": [
+        "Let the Right One In", "Interview with the Vampire", "30 Days of Night",
+        "Near Dark", "The Lost Boys", "Blade", "From Dusk Till Dawn",
+        "What We Do in the Shadows", "Nosferatu", "Bram Stoker's Dracula", "Fright Night"
+    ],
+    "gore-fests": [
+        "Evil Dead", "Dead Alive", "Terrifier", "Saw", "Hostel", "The Green Inferno",
+        "Tokyo Gore Police", "Machine Girl", "Braindead", "Bad Taste", "Dead Snow"
+    ],
+    "supernatural": [
+        "The Conjuring", "Insidious", "Sinister", "The Babadook", "Hereditary",
+        "The Exorcist", "Poltergeist", "The Ring", "The Grudge", "Paranormal Activity"
+    ],
+    "demons": [
+        "The Exorcist", "Hellraiser", "Evil Dead", "The Conjuring", "Insidious",
+        "Sinister", "Drag Me to Hell", "The Possession", "Demons", "Night of the Demons"
+    ],
+    "psycho-killers": [
+        "Psycho", "The Silence of the Lambs", "American Psycho", "Henry: Portrait of a Serial Killer",
+        "Maniac", "The Strangers", "You're Next", "The Purge", "Funny Games"
+    ],
+    "alien-horror": [
+        "Alien", "The Thing", "Invasion of the Body Snatchers", "They Live",
+        "Event Horizon", "Life", "The Faculty", "Attack the Block", "Color Out of Space"
+    ],
+    "creature-features": [
+        "The Descent", "Tremors", "Jeepers Creepers", "Dog Soldiers", "The Ritual",
+        "Crawl", "Alligator", "Jaws", "The Host", "Cloverfield", "A Quiet Place"
+    ],
+    "haunted-houses": [
+        "The Haunting", "House on Haunted Hill", "The Amityville Horror", "Poltergeist",
+        "The Changeling", "Hell House LLC", "Sinister", "Insidious", "The Conjuring"
+    ],
+    "psychological": [
+        "The Babadook", "Black Swan", "Shutter Island", "The Others", "Rosemary's Baby",
+        "Don't Look Now", "The Machinist", "Jacob's Ladder", "Mulholland Drive"
+    ],
+    "cult-horror": [
+        "The Wicker Man", "Rosemary's Baby", "Midsommar", "The Witch", "Apostle",
+        "Kill List", "Red State", "Martha Marcy May Marlene", "The Invitation"
+    ]
+}
+
+GENRE_RESPONSES = {
+    "slashers": "SLASHER PICK: {title}! Classic masked killer mayhem with plenty of creative kills.",
+    "zombies": "ZOMBIE PICK: {title}! Brain-munching undead action at its finest.",
+    "vampires": "VAMPIRE PICK: {title}! Bloodsucking terror from the children of the night.",
+    "gore-fests": "GORE FEST: {title}! Prepare for gallons of blood and extreme violence.",
+    "supernatural": "SUPERNATURAL: {title}! Ghostly encounters and paranormal terror.",
+    "demons": "DEMONIC: {title}! Hell's minions bring pure evil to Earth.",
+    "psycho-killers": "PSYCHO KILLER: {title}! Human monsters are the scariest of all.",
+    "alien-horror": "ALIEN HORROR: {title}! Terror from beyond the stars.",
+    "creature-features": "CREATURE FEATURE: {title}! Monsters, beasts, and things that go bump.",
+    "haunted-houses": "HAUNTED HOUSE: {title}! Spooky dwellings with dark secrets.",
+    "psychological": "PSYCHOLOGICAL: {title}! Mind-bending terror that gets under your skin.",
+    "cult-horror": "CULT HORROR: {title}! Religious fanatics and occult nightmares."
+}
+
 # Predefined horror stats for popular movies
 MOVIE_HORROR_STATS = {
     "saw": {"gore": 85, "fear": 7.5, "kills": 6},
@@ -138,28 +678,265 @@ TELL_ME_MORE_PROMPTS = {
     or "The director confirmed that..." or "There's this Easter egg..." Keep it fresh and exciting."""
 }
 
-# ----- HELPER FUNCTIONS FOR USER DATA -----
+# ----- USER PROFILE STORE (SQLite, one row per user) -----
+user_db_local = threading.local()
+
+def open_sqlite(path):
+    """Open a SQLite connection tuned for many concurrent readers and short writes"""
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA busy_timeout=10000')
+    return conn
+
+def get_user_db():
+    """Per-thread connection to the user store"""
+    conn = getattr(user_db_local, "conn", None)
+    if conn is None:
+        conn = open_sqlite(USER_DB_FILE)
+        user_db_local.conn = conn
+    return conn
+
+@contextmanager
+def sqlite_transaction(conn):
+    """BEGIN IMMEDIATE ... COMMIT, rolling back on any error"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+def init_user_store():
+    """Create the user, rating and review tables and migrate user_data.json into them once"""
+    conn = get_user_db()
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS users (
+            google_id TEXT PRIMARY KEY,
+            my_list TEXT NOT NULL DEFAULT '[]',
+            ratings TEXT NOT NULL DEFAULT '{}',
+            history TEXT NOT NULL DEFAULT '[]',
+            horror_profile TEXT NOT NULL DEFAULT 'New Horror Fan'
+        );
+        CREATE TABLE IF NOT EXISTS genre_searches (
+            google_id TEXT NOT NULL,
+            genre TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (google_id, genre)
+        );
+        CREATE TABLE IF NOT EXISTS rating_aggregates (
+            title_key TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            h1 INTEGER NOT NULL DEFAULT 0,
+            h2 INTEGER NOT NULL DEFAULT 0,
+            h3 INTEGER NOT NULL DEFAULT 0,
+            h4 INTEGER NOT NULL DEFAULT 0,
+            h5 INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS reviews (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title_key TEXT NOT NULL,
+            movie_title TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            review_text TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_reviews_title ON reviews(title_key, id);
+        CREATE TABLE IF NOT EXISTS store_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    ''')
+    
+    migrated = conn.execute("SELECT value FROM store_meta WHERE key = 'json_migrated'").fetchone()
+    if migrated or not os.path.exists(USER_DATA_JSON):
+        return
+    
+    users = load_user_data()
+    with sqlite_transaction(conn):
+        for google_id, user in users.items():
+            conn.execute('''
+                INSERT OR REPLACE INTO users (google_id, my_list, ratings, history, horror_profile)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                google_id,
+                json.dumps(user.get("myList", [])),
+                json.dumps(user.get("ratings", {})),
+                json.dumps(user.get("history", [])),
+                user.get("horror_profile", "New Horror Fan")
+            ))
+            for genre, count in user.get("genre_searches", {}).items():
+                conn.execute(
+                    'INSERT OR REPLACE INTO genre_searches (google_id, genre, count) VALUES (?, ?, ?)',
+                    (google_id, genre, count)
+                )
+        conn.execute(
+            "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('json_migrated', ?)",
+            (datetime.datetime.now().isoformat(),)
+        )
+    print(f"📦 Migrated {len(users)} users from {USER_DATA_JSON} to {USER_DB_FILE}")
+
 def load_user_data():
-    """Load user data from JSON file"""
+    """Load legacy user data from JSON file (only used by the one-shot migration)"""
     try:
-        with open('user_data.json', 'r') as f:
+        with open(USER_DATA_JSON, 'r') as f:
             return json.load(f)
     except:
         return {}
 
-def save_user_data(data):
-    """Save user data to JSON file"""
-    with open('user_data.json', 'w') as f:
-        json.dump(data, f, indent=2)
+def ensure_user(conn, google_id):
+    """Create an empty user row if it doesn't exist yet"""
+    conn.execute('INSERT OR IGNORE INTO users (google_id) VALUES (?)', (google_id,))
 
-def get_user_profile(google_id):
-    """Calculate user's horror profile based on their genre searches"""
-    users = load_user_data()
-    
-    if google_id not in users or 'genre_searches' not in users[google_id]:
-        return "New Horror Fan"
+def get_stored_genre_searches(google_id, conn=None):
+    """Genre -> search count for one user, as committed to the database"""
+    conn = conn or get_user_db()
+    rows = conn.execute('SELECT genre, count FROM genre_searches WHERE google_id = ?', (google_id,))
+    return {genre: count for genre, count in rows}
+
+def get_genre_searches(google_id):
+    """Genre -> search count for one user, including clicks not flushed yet"""
+    genre_searches = get_stored_genre_searches(google_id)
+    for genre, delta in genre_buffer.pending_for(google_id).items():
+        genre_searches[genre] = genre_searches.get(genre, 0) + delta
+    return genre_searches
+
+def get_user(google_id):
+    """Full user record in the old user_data.json shape, or None"""
+    conn = get_user_db()
+    row = conn.execute(
+        'SELECT my_list, ratings, history FROM users WHERE google_id = ?', (google_id,)
+    ).fetchone()
+    genre_searches = get_genre_searches(google_id)
+    if not row and not genre_searches:
+        return None
     
-    genre_searches = users[google_id]['genre_searches']
+    my_list, ratings, history = row if row else ('[]', '{}', '[]')
+    return {
+        "myList": json.loads(my_list),
+        "ratings": json.loads(ratings),
+        "history": json.loads(history),
+        "genre_searches": genre_searches,
+        "horror_profile": get_user_profile(google_id, genre_searches)
+    }
+
+class GenreSearchBuffer:
+    """Write-behind buffer for genre clicks.
+
+    Increments are merged in memory per googleId/genre and written in one
+    transaction when the flush interval passes or max_pending clicks pile up,
+    so disk writes track elapsed time instead of click volume. Until the
+    flush thread is started (BACKGROUND_WORKERS=0, scripts) clicks are
+    written straight through.
+    """
+
+    def __init__(self, flush_interval, max_pending):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = defaultdict(lambda: defaultdict(int))
+        self.flushing = {}
+        self.pending_clicks = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        # Graceful shutdown (Ctrl+C, SIGTERM via __main__) flushes what's left
+        atexit.register(self.flush)
+
+    def add(self, google_id, genre):
+        with self.lock:
+            self.pending[google_id][genre] += 1
+            self.pending_clicks += 1
+            if self.pending_clicks >= self.max_pending:
+                self.wake.set()
+        if self.thread is None:
+            self.flush()
+
+    def pending_for(self, google_id):
+        """Unflushed increments for one user (including a batch mid-flush)"""
+        with self.lock:
+            merged = defaultdict(int)
+            for source in (self.flushing.get(google_id, {}), self.pending.get(google_id, {})):
+                for genre, delta in source.items():
+                    merged[genre] += delta
+            return dict(merged)
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                self.flushing = {google_id: dict(genres) for google_id, genres in self.pending.items()}
+                self.pending = defaultdict(lambda: defaultdict(int))
+                self.pending_clicks = 0
+            
+            batch = self.flushing
+            try:
+                conn = get_user_db()
+                with sqlite_transaction(conn):
+                    for google_id, genres in batch.items():
+                        ensure_user(conn, google_id)
+                        for genre, delta in genres.items():
+                            conn.execute('''
+                                INSERT INTO genre_searches (google_id, genre, count) VALUES (?, ?, ?)
+                                ON CONFLICT (google_id, genre) DO UPDATE SET count = count + excluded.count
+                            ''', (google_id, genre, delta))
+                        profile = get_user_profile(google_id, get_stored_genre_searches(google_id, conn))
+                        conn.execute('UPDATE users SET horror_profile = ? WHERE google_id = ?', (profile, google_id))
+                print(f"💾 Flushed genre clicks for {len(batch)} users")
+            except Exception as e:
+                # Nothing was committed - put the batch back so the next flush retries it
+                print(f"Error flushing genre clicks: {e}")
+                with self.lock:
+                    for google_id, genres in batch.items():
+                        for genre, delta in genres.items():
+                            self.pending[google_id][genre] += delta
+                            self.pending_clicks += delta
+            finally:
+                with self.lock:
+                    self.flushing = {}
+
+    def _run(self):
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.flush()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="genre-flush", daemon=True)
+            self.thread.start()
+
+genre_buffer = GenreSearchBuffer(GENRE_FLUSH_INTERVAL, GENRE_FLUSH_MAX_PENDING)
+
+def add_to_list(google_id, movie):
+    """Add a movie to the user's list (no duplicates). Returns the list"""
+    conn = get_user_db()
+    with sqlite_transaction(conn):
+        ensure_user(conn, google_id)
+        my_list = json.loads(conn.execute('SELECT my_list FROM users WHERE google_id = ?', (google_id,)).fetchone()[0])
+        if movie not in my_list:
+            my_list.append(movie)
+            conn.execute('UPDATE users SET my_list = ? WHERE google_id = ?', (json.dumps(my_list), google_id))
+    return my_list
+
+def set_rating(google_id, movie, rating):
+    """Store the user's personal rating for a movie"""
+    conn = get_user_db()
+    with sqlite_transaction(conn):
+        ensure_user(conn, google_id)
+        ratings = json.loads(conn.execute('SELECT ratings FROM users WHERE google_id = ?', (google_id,)).fetchone()[0])
+        ratings[movie] = rating
+        conn.execute('UPDATE users SET ratings = ? WHERE google_id = ?', (json.dumps(ratings), google_id))
+
+def get_user_profile(google_id, genre_searches=None):
+    """Calculate user's horror profile based on their genre searches"""
+    if genre_searches is None:
+        genre_searches = get_genre_searches(google_id)
     
     if not genre_searches:
         return "New Horror Fan"
@@ -185,13 +962,191 @@ def get_user_profile(google_id):
     
     return profile_map.get(top_genre, "Horror Enthusiast")
 
-def get_conversational_prompt(query, is_tell_me_more=False, movie_title=None):
+# ----- COMMUNITY RATING AGGREGATES (count, sum and 1-5 histogram per title) -----
+RATING_BUCKETS = ["h1", "h2", "h3", "h4", "h5"]
+
+def rating_summary(row):
+    """Average/count/histogram dict from a rating_aggregates row (or None)"""
+    if not row or not row[0]:
+        return {"average": 0, "count": 0, "histogram": [0] * 5}
+    count, total = row[0], row[1]
+    return {"average": round(total / count, 1), "count": count, "histogram": list(row[2:7])}
+
+def record_rating(movie_title, rating):
+    """Add one 1-5 rating to a title's aggregate in a single atomic upsert. Returns the new summary"""
+    title_key = normalize_title_key(movie_title)
+    bucket = RATING_BUCKETS[rating - 1]
+    conn = get_user_db()
+    with sqlite_transaction(conn):
+        conn.execute(f'''
+            INSERT INTO rating_aggregates (title_key, title, count, total, {bucket}, updated_at)
+            VALUES (?, ?, 1, ?, 1, ?)
+            ON CONFLICT(title_key) DO UPDATE SET
+                count = count + 1,
+                total = total + excluded.total,
+                {bucket} = {bucket} + 1,
+                updated_at = excluded.updated_at
+        ''', (title_key, movie_title, rating, time.time()))
+        row = conn.execute(
+            'SELECT count, total, h1, h2, h3, h4, h5 FROM rating_aggregates WHERE title_key = ?', (title_key,)
+        ).fetchone()
+    return rating_summary(row)
+
+def get_rating_summary(movie_title):
+    """Current rating summary for a title (one primary-key read)"""
+    row = get_user_db().execute(
+        'SELECT count, total, h1, h2, h3, h4, h5 FROM rating_aggregates WHERE title_key = ?',
+        (normalize_title_key(movie_title),)
+    ).fetchone()
+    return rating_summary(row)
+
+# ----- REVIEWS (durable in SQLite, newest few per title cached in ring buffers) -----
+REVIEW_COLUMNS = 'id, movie_title, user_name, review_text, created_at'
+
+# Moderation hooks: fn(review) -> None to accept, or a reason string to reject.
+# Register with @review_moderation_hook; they run in order before a review is stored.
+review_moderation_hooks = []
+
+def review_moderation_hook(fn):
+    review_moderation_hooks.append(fn)
+    return fn
+
+def review_from_row(row):
+    """Admin-facing review dict"""
+    return {"id": row[0], "movie_title": row[1], "user_name": row[2], "review_text": row[3], "created_at": row[4]}
+
+def public_review(review):
+    """The review shape the stats panel renders"""
+    return {"id": review["id"], "text": review["review_text"], "user": review["user_name"], "timestamp": review["created_at"]}
+
+class RecentReviewCache:
+    """Per-title deque(maxlen) of the newest reviews, LRU-bounded by title count.
+
+    Entries expire after `ttl` seconds so reviews written by other workers
+    show up; writes and deletes on this worker update the entry directly."""
+
+    def __init__(self, max_titles, per_title, ttl):
+        self.max_titles = max_titles
+        self.per_title = per_title
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # title_key -> (expires_at, deque of review dicts, oldest first)
+        self.counters = {"hits": 0, "misses": 0}
+
+    def get(self, title_key):
+        with self.lock:
+            entry = self.entries.get(title_key)
+            if entry is None or entry[0] < time.time():
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(title_key)
+            self.counters["hits"] += 1
+            return list(entry[1])
+
+    def fill(self, title_key, reviews):
+        with self.lock:
+            self.entries[title_key] = (time.time() + self.ttl, deque(reviews, maxlen=self.per_title))
+            self.entries.move_to_end(title_key)
+            while len(self.entries) > self.max_titles:
+                self.entries.popitem(last=False)
+
+    def append(self, title_key, review):
+        """Add a just-written review (only if the title is cached - otherwise the next read loads it)"""
+        with self.lock:
+            entry = self.entries.get(title_key)
+            if entry is not None:
+                entry[1].append(review)
+
+    def discard(self, title_key):
+        with self.lock:
+            self.entries.pop(title_key, None)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, titles=len(self.entries))
+
+recent_reviews = RecentReviewCache(REVIEW_CACHE_TITLES, RECENT_REVIEWS, REVIEW_CACHE_TTL)
+
+def add_review(movie_title, review_text, user_name="Anonymous"):
+    """Run moderation hooks, then store a review. Returns (review, None) or (None, rejection reason)"""
+    review = {
+        "movie_title": movie_title,
+        "user_name": user_name,
+        "review_text": review_text,
+        "created_at": datetime.datetime.now().isoformat()
+    }
+    for hook in review_moderation_hooks:
+        reason = hook(review)
+        if reason:
+            return None, reason
+    
+    title_key = normalize_title_key(movie_title)
+    cursor = get_user_db().execute(
+        'INSERT INTO reviews (title_key, movie_title, user_name, review_text, created_at) VALUES (?, ?, ?, ?, ?)',
+        (title_key, movie_title, user_name, review_text, review["created_at"])
+    )
+    review["id"] = cursor.lastrowid
+    recent_reviews.append(title_key, review)
+    return review, None
+
+def get_recent_reviews(movie_title):
+    """Newest RECENT_REVIEWS reviews for a title, oldest first (served from the ring buffer when warm)"""
+    title_key = normalize_title_key(movie_title)
+    reviews = recent_reviews.get(title_key)
+    if reviews is None:
+        rows = get_user_db().execute(
+            f'SELECT {REVIEW_COLUMNS} FROM reviews WHERE title_key = ? ORDER BY id DESC LIMIT ?',
+            (title_key, RECENT_REVIEWS)
+        ).fetchall()
+        reviews = [review_from_row(row) for row in reversed(rows)]
+        recent_reviews.fill(title_key, reviews)
+    return reviews
+
+def count_reviews(movie_title):
+    return get_user_db().execute(
+        'SELECT COUNT(*) FROM reviews WHERE title_key = ?', (normalize_title_key(movie_title),)
+    ).fetchone()[0]
+
+def list_reviews(movie_title=None, cursor=None, limit=REVIEW_PAGE_SIZE):
+    """One page of reviews, newest first, for a title (or all titles).
+    `cursor` is the next_cursor of the previous page. Returns (reviews, next_cursor)"""
+    clauses, params = [], []
+    if movie_title:
+        clauses.append('title_key = ?')
+        params.append(normalize_title_key(movie_title))
+    if cursor:
+        clauses.append('id < ?')
+        params.append(cursor)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = get_user_db().execute(
+        f'SELECT {REVIEW_COLUMNS} FROM reviews {where} ORDER BY id DESC LIMIT ?', params + [limit + 1]
+    ).fetchall()
+    reviews = [review_from_row(row) for row in rows[:limit]]
+    next_cursor = reviews[-1]["id"] if len(rows) > limit else None
+    return reviews, next_cursor
+
+def delete_review(review_id):
+    """Remove a review (moderation). Returns True if it existed"""
+    conn = get_user_db()
+    with sqlite_transaction(conn):
+        row = conn.execute('SELECT title_key FROM reviews WHERE id = ?', (review_id,)).fetchone()
+        if row is None:
+            return False
+        conn.execute('DELETE FROM reviews WHERE id = ?', (review_id,))
+    recent_reviews.discard(row[0])
+    return True
+
+def next_conversation_depth(movie_title):
+    """Advance and return the "Tell Me More" depth (1-4) for a movie"""
+    depth_key = f"depth_{movie_title.lower()}"
+    conversation_depth[depth_key] = (conversation_depth[depth_key] % 4) + 1
+    return conversation_depth[depth_key]
+
+def get_conversational_prompt(query, is_tell_me_more=False, movie_title=None, depth=None):
     """Get the appropriate conversational prompt based on context"""
     
     if is_tell_me_more and movie_title:
-        depth_key = f"depth_{movie_title.lower()}"
-        conversation_depth[depth_key] = (conversation_depth[depth_key] % 4) + 1
-        current_depth = conversation_depth[depth_key]
+        current_depth = depth or next_conversation_depth(movie_title)
         
         base_prompt = TELL_ME_MORE_PROMPTS.get(current_depth, TELL_ME_MORE_PROMPTS[1])
         return base_prompt + f"\n\nMovie being discussed: {movie_title}\nUser query: {query}"
@@ -219,47 +1174,113 @@ When answering questions about categories (bloodiest, weirdest, most nudity, etc
 
 Keep responses to 2-3 short paragraphs max, but make them engaging and conversational."""
 
+def resolve_tmdb_movie(title, allow_search=True):
+    """Resolve a title to {"id", "title"} on TMDB, or None.
+
+    Checks the id cache, then the local FTS index, then (if allow_search)
+    TMDB search/movie - so each title is searched at most once per cache TTL.
+    """
+    cache_key = title.lower().strip()
+    
+    cached = tmdb_id_cache.get(cache_key)
+    if cached is not CACHE_MISS:
+        return cached
+    
+    local = resolve_title_locally(title)
+    if local:
+        tmdb_movie = {"id": local["id"], "title": local["title"]}
+        tmdb_id_cache.set(cache_key, tmdb_movie)
+        return tmdb_movie
+    
+    if not allow_search or not TMDB_API_KEY:
+        return None
+    
+    return upstream_flight.do(("search", cache_key), search_tmdb_movie, title)
+
+def search_tmdb_movie(title):
+    """Search TMDB for a title and cache the resolved id (or the miss)"""
+    search_url = f"https://api.themoviedb.org/3/search/movie?api_key={TMDB_API_KEY}&query={quote(title)}"
+    search_response = request_upstream_get(search_url)
+    search_data = search_response.json()
+    
+    if "results" not in search_data:
+        # Error payload (bad key, rate limit...) - not an answer worth caching
+        raise Exception(search_data.get("status_message", "TMDB search failed"))
+    
+    tmdb_movie = None
+    if search_data["results"]:
+        movie = search_data["results"][0]
+        tmdb_movie = {"id": movie["id"], "title": movie.get("title", title)}
+    
+    tmdb_id_cache.set(title.lower().strip(), tmdb_movie)
+    return tmdb_movie
+
 def get_movie_details_from_apis(title):
-    """Get movie details - check database first, then APIs"""
+    """Get movie details - check the details cache first, then database/APIs"""
+    cache_key = title.lower().strip()
+    
+    cached = details_cache.get(cache_key)
+    if cached is not CACHE_MISS:
+        print(f"⚡ CACHE HIT: {title}")
+        return cached if cached is not None else empty_movie_details(title)
+    
+    overnight = overnight_cache_lookup(cache_key)
+    if overnight is not None:
+        print(f"🌙 OVERNIGHT CACHE HIT: {title}")
+        return overnight
+    
+    # Concurrent requests for the same title share one upstream fetch
+    return upstream_flight.do(("details", cache_key), load_movie_details, title)
+
+def load_movie_details(title):
+    """Fetch movie details and store the answer in the details cache"""
     cache_key = title.lower().strip()
+    movie_details, status = fetch_movie_details(title)
     
-    # STEP 1: Check SQLite database first
+    # Only cache real answers - a timeout or missing API key isn't a "not found"
+    if status == "found":
+        details_cache.set(cache_key, movie_details)
+    elif status == "not_found":
+        details_cache.set(cache_key, None)
+    
+    return movie_details
+
+def empty_movie_details(title):
+    """Placeholder details returned when a title can't be found"""
+    return {
+        "title": title,
+        "year": None,
+        "director": None,
+        "poster": None,
+        "plot": None,
+        "rating": None,
+        "genres": "Horror"
+    }
+
+def fetch_movie_details(title):
+    """Fetch movie details from database/APIs. Returns (details, status) where
+    status is "found", "not_found" or "error" (lookup failed, don't cache)"""
+    status = "not_found"
+    
+    # STEP 1: Use an already-known TMDB id (id cache or local FTS index) - no search needed
     try:
-        raise Exception("Skip database - no titles")  # TEMPORARY FIX
-        # Try exact match first
-        db_cursor.execute('''
-            SELECT id, title, original_title, popularity 
-            FROM movies 
-            WHERE LOWER(title) = ? OR LOWER(original_title) = ?
-            ORDER BY popularity DESC
-            LIMIT 1
-        ''', (cache_key, cache_key))
-        
-        db_result = db_cursor.fetchone()
-        
-        # If no exact match, try partial match
-        if not db_result:
-            db_cursor.execute('''
-                SELECT id, title, original_title, popularity 
-                FROM movies 
-                WHERE LOWER(title) LIKE ? OR LOWER(original_title) LIKE ?
-                ORDER BY popularity DESC
-                LIMIT 1
-            ''', (f'%{cache_key}%', f'%{cache_key}%'))
-            db_result = db_cursor.fetchone()
+        db_result = resolve_tmdb_movie(title, allow_search=False)
         
         if db_result:
-            movie_id = db_result[0]
-            movie_title = db_result[1]
-            print(f"✅ DATABASE HIT: {movie_title}")
+            movie_id = db_result["id"]
+            movie_title = db_result["title"]
+            print(f"✅ TMDB ID KNOWN: {movie_title} (ID: {movie_id})")
             
-            # Get full details from TMDB using the ID
+            # Get full details from TMDB using the ID - no search/movie call needed
             if TMDB_API_KEY:
                 try:
                     detail_url = f"https://api.themoviedb.org/3/movie/{movie_id}?api_key={TMDB_API_KEY}&append_to_response=credits"
-                    detail_response = requests.get(detail_url, timeout=3)
+                    detail_response = request_upstream_get(detail_url)
                     detail_data = detail_response.json()
                     
+                    if not detail_data.get("id"):
+                        raise Exception(detail_data.get("status_message", "movie not found on TMDB"))
+                    
                     movie_details = {
                         "title": detail_data.get("title", movie_title),
                         "year": detail_data.get("release_date", "").split("-")[0] if detail_data.get("release_date") else None,
@@ -275,7 +1296,7 @@ def get_movie_details_from_apis(title):
                         if directors:
                             movie_details["director"] = directors[0]
                     
-                    return movie_details
+                    return movie_details, "found"
                 except Exception as e:
                     print(f"TMDB detail error: {e}")
     except Exception as e:
@@ -284,21 +1305,16 @@ def get_movie_details_from_apis(title):
     # STEP 2: Not in database, fall back to original API method
     print(f"❌ DATABASE MISS: {title} (using APIs)")
     
-    movie_details = {
-        "title": title,
-        "year": None,
-        "director": None,
-        "poster": None,
-        "plot": None,
-        "rating": None,
-        "genres": "Horror"
-    }
+    movie_details = empty_movie_details(title)
+    
+    if not OMDB_API_KEY and not TMDB_API_KEY:
+        status = "error"
     
     # Try OMDB first
     if OMDB_API_KEY:
         try:
             omdb_url = f"http://www.omdbapi.com/?t={quote(title)}&apikey={OMDB_API_KEY}"
-            omdb_response = requests.get(omdb_url, timeout=3)
+            omdb_response = request_upstream_get(omdb_url)
             omdb_data = omdb_response.json()
             
             if omdb_data.get("Response") == "True":
@@ -309,23 +1325,21 @@ def get_movie_details_from_apis(title):
                 movie_details["plot"] = omdb_data.get("Plot")
                 movie_details["rating"] = omdb_data.get("imdbRating")
                 movie_details["genres"] = omdb_data.get("Genre", "Horror")
-                return movie_details
+                return movie_details, "found"
         except Exception as e:
             print(f"OMDB error: {e}")
+            status = "error"
     
     # Try TMDB as fallback
     if TMDB_API_KEY:
         try:
-            search_url = f"https://api.themoviedb.org/3/search/movie?api_key={TMDB_API_KEY}&query={quote(title)}"
-            search_response = requests.get(search_url, timeout=3)
-            search_data = search_response.json()
+            tmdb_movie = resolve_tmdb_movie(title)
             
-            if search_data.get("results"):
-                movie = search_data["results"][0]
-                movie_id = movie["id"]
+            if tmdb_movie:
+                movie_id = tmdb_movie["id"]
                 
                 detail_url = f"https://api.themoviedb.org/3/movie/{movie_id}?api_key={TMDB_API_KEY}&append_to_response=credits"
-                detail_response = requests.get(detail_url, timeout=3)
+                detail_response = request_upstream_get(detail_url)
                 detail_data = detail_response.json()
                 
                 movie_details["title"] = detail_data.get("title", title)
@@ -340,26 +1354,210 @@ def get_movie_details_from_apis(title):
                     if directors:
                         movie_details["director"] = directors[0]
                 
-                return movie_details
+                return movie_details, "found"
         except Exception as e:
             print(f"TMDB error: {e}")
+            status = "error"
+    
+    return movie_details, status
+
+def refresh_overnight_cache():
+    """Open the overnight movie store on first use, and re-index it when the builder publishes a new generation"""
+    now = time.time()
+    if now - overnight_cache["checked_at"] < OVERNIGHT_CACHE_RELOAD_INTERVAL:
+        return
     
+    with overnight_cache_lock:
+        if now - overnight_cache["checked_at"] < OVERNIGHT_CACHE_RELOAD_INTERVAL:
+            return
+        overnight_cache["checked_at"] = now
+        
+        store = overnight_cache["store"]
+        try:
+            if store is None:
+                if not os.path.exists(MOVIE_STORE_DIR):
+                    return
+                store = MovieStore(MOVIE_STORE_DIR, read_only=True)
+                overnight_cache["store"] = store
+            elif not store.reload_if_changed():
+                return
+            print(f"🌙 Loaded overnight cache: {len(store)} movies (generation {store.generation})")
+        except Exception as e:
+            print(f"Overnight cache load error: {e}")
+
+def overnight_cache_lookup(cache_key):
+    """Movie details the overnight builder already fetched, or None"""
+    refresh_overnight_cache()
+    store = overnight_cache["store"]
+    movie_details = store.get(cache_key) if store is not None else None
+    overnight_cache["hits" if movie_details is not None else "misses"] += 1
     return movie_details
 
+def refresh_local_vectors():
+    """(Re)load the local vector index when the builder has written a new one"""
+    now = time.time()
+    if now - local_vectors["checked_at"] < VECTOR_RELOAD_INTERVAL:
+        return
+    
+    with local_vectors_lock:
+        if now - local_vectors["checked_at"] < VECTOR_RELOAD_INTERVAL:
+            return
+        local_vectors["checked_at"] = now
+        
+        # The side-table commit is what publishes new rows, so watch the .db and its WAL
+        table_path = VECTOR_INDEX_PATH + ".db"
+        mtimes = [os.path.getmtime(path) for path in (table_path, table_path + "-wal") if os.path.exists(path)]
+        if not mtimes or max(mtimes) == local_vectors["mtime"]:
+            return
+        
+        try:
+            previous = local_vectors["index"]
+            local_vectors["index"] = LocalVectorIndex(VECTOR_INDEX_PATH)
+            local_vectors["mtime"] = max(mtimes)
+            if previous is not None:
+                previous.close()
+            print(f"🧭 Loaded local vector index: {len(local_vectors['index'])} movies")
+        except Exception as e:
+            print(f"Vector index load error: {e}")
+
+def semantic_index():
+    """The Pinecone index when configured, else the local one (None if neither exists)"""
+    if index is not None:
+        return index
+    refresh_local_vectors()
+    return local_vectors["index"]
+
+def semantic_search(query, top_k=SEMANTIC_TOP_K):
+    """Catalogue movies whose plots are closest to the query, best first"""
+    vectors = semantic_index()
+    if not client or vectors is None:
+        return []
+    
+    try:
+        result = vectors.query(vector=embed_text(query), top_k=top_k, include_metadata=True)
+    except Exception as e:
+        print(f"Semantic search error: {e}")
+        return []
+    
+    matches = []
+    for match in result["matches"]:
+        if match["score"] < SEMANTIC_MIN_SCORE:
+            continue
+        metadata = match["metadata"] or {}
+        matches.append({
+            "title": metadata.get("title"),
+            "year": metadata.get("year") or None,
+            "poster": metadata.get("poster") or None,
+            "genres": metadata.get("genres"),
+            "plot": metadata.get("plot"),
+            "score": round(float(match["score"]), 3)
+        })
+    print(f"🧭 Semantic search: {len(matches)} matches for \"{query}\"")
+    return matches
+
+def semantic_recommendations(matches):
+    """Recommendation cards from semantic search matches"""
+    return [{"title": m["title"], "year": m["year"], "poster": m["poster"]} for m in matches[:5]]
+
+def similarity_recommendations(title):
+    """Nearest neighbours by plot embedding in the local vector index, or None if the title isn't indexed"""
+    if not SIMILARITY_RECOMMENDATIONS:
+        return None
+    refresh_local_vectors()
+    vectors = local_vectors["index"]
+    if vectors is None:
+        return None
+    
+    matches = vectors.similar(title.lower().strip())
+    if not matches:
+        return None
+    return [{
+        "title": m["metadata"].get("title"),
+        "year": m["metadata"].get("year") or None,
+        "poster": m["metadata"].get("poster") or None
+    } for m in matches]
+
 def get_movie_recommendations(title):
+    """Get similar movie recommendations - offline graph, then embedding similarity, then one shared live fetch"""
+    graph_recs = graph_recommendations(title)
+    if graph_recs is not None:
+        return graph_recs
+    
+    similar_recs = similarity_recommendations(title)
+    if similar_recs is not None:
+        return similar_recs
+    
+    return upstream_flight.do(("recommendations", title.lower().strip()), fetch_movie_recommendations, title)
+
+def refresh_recommendation_graph():
+    """(Re)load the offline recommendation graph when the builder has written a new one"""
+    now = time.time()
+    if now - rec_graph["checked_at"] < GRAPH_RELOAD_INTERVAL:
+        return
+    
+    with rec_graph_lock:
+        if now - rec_graph["checked_at"] < GRAPH_RELOAD_INTERVAL:
+            return
+        rec_graph["checked_at"] = now
+        
+        mtimes = [os.path.getmtime(path) for path in (GRAPH_FILE, GRAPH_FILE + "-wal") if os.path.exists(path)]
+        if not mtimes or max(mtimes) == rec_graph["mtime"]:
+            return
+        
+        graph = load_graph(GRAPH_FILE)
+        if graph is None:
+            return  # mtime not recorded, so the next check retries
+        by_id, by_title = graph
+        rec_graph["by_id"] = by_id
+        rec_graph["by_title"] = by_title
+        rec_graph["mtime"] = max(mtimes)
+        print(f"🕸️ Loaded recommendation graph: {len(by_id)} movies")
+
+def graph_recommendations(title):
+    """Recommendations from the offline graph (a local dict read), or None if the title isn't in it
+    or none of its neighbours are horror - the caller then falls through to the live sources"""
+    refresh_recommendation_graph()
+    if not rec_graph["by_id"]:
+        return None
+    
+    original_title_lower = title.lower().strip()
+    movie_id = rec_graph["by_title"].get(original_title_lower)
+    if movie_id is None:
+        tmdb_movie = resolve_tmdb_movie(title, allow_search=False)
+        movie_id = tmdb_movie["id"] if tmdb_movie else None
+    
+    neighbours = rec_graph["by_id"].get(movie_id)
+    if neighbours is None:
+        return None
+    
+    recommendations = []
+    for movie in neighbours:
+        if (movie.get("title") or "").lower() == original_title_lower:
+            continue
+        # Graphs built before the flag existed have no "horror" key - keep those neighbours
+        if not movie.get("horror", True):
+            continue
+        recommendations.append({
+            "title": movie.get("title"),
+            "year": movie.get("year"),
+            "poster": f"https://image.tmdb.org/t/p/w200{movie['poster_path']}" if movie.get("poster_path") else None
+        })
+        if len(recommendations) >= 5:
+            break
+    
+    return recommendations or None
+
+def fetch_movie_recommendations(title):
     """Get similar movie recommendations with posters - FIXED to exclude original movie"""
     recommendations = []
     original_title_lower = title.lower().strip()
     
     if TMDB_API_KEY:
         try:
-            # Step 1: Search for the movie to get its ID
-            search_url = f"https://api.themoviedb.org/3/search/movie?api_key={TMDB_API_KEY}&query={quote(title)}"
-            search_response = requests.get(search_url, timeout=3)
-            search_data = search_response.json()
+            # Step 1: Resolve the movie's TMDB ID (cached, searched at most once per title)
+            original_movie = resolve_tmdb_movie(title)
             
-            if search_data.get("results"):
-                original_movie = search_data["results"][0]
+            if original_movie:
                 movie_id = original_movie["id"]
                 original_title = original_movie.get("title", "").lower()
                 
@@ -367,7 +1565,7 @@ def get_movie_recommendations(title):
                 
                 # Step 2: Get recommendations for this movie
                 rec_url = f"https://api.themoviedb.org/3/movie/{movie_id}/recommendations?api_key={TMDB_API_KEY}"
-                rec_response = requests.get(rec_url, timeout=3)
+                rec_response = request_upstream_get(rec_url)
                 rec_data = rec_response.json()
                 
                 # Step 3: Filter out the original movie and get DIFFERENT movies
@@ -426,7 +1624,7 @@ def detect_query_type(query):
             return 'specific_movie'
         return 'general'
 
-def generate_conversational_response(query, query_type, movie_title=None):
+def generate_conversational_response(query, query_type, movie_title=None, semantic_matches=None):
     """Generate a conversational response based on query type"""
     
     is_tell_me_more = query_type == 'tell_me_more'
@@ -450,18 +1648,16 @@ def generate_conversational_response(query, query_type, movie_title=None):
         else:
             return "I love talking horror! What specifically are you in the mood for? Slashers, zombies, vampires, or something really messed up?"
     
-    context = get_conversational_prompt(query, is_tell_me_more, movie_title)
+    # Depth is part of the cache key, so it has to be settled before the lookup
+    depth = next_conversation_depth(movie_title) if is_tell_me_more and movie_title else 0
+    cached = response_cache.get(query_type, query, movie_title, depth)
+    if cached:
+        print(f"🧠 RESPONSE CACHE HIT: {query_type}")
+        return cached
     
-    if query_type in ['bloodiest', 'weird_kills', 'nudity', 'zombies', 'vampires', 'slashers']:
-        knowledge_data = HORROR_KNOWLEDGE.get(query_type.replace('weird_kills', 'weirdest_kills'), [])
-        context += f"\n\nRelevant movies for this category: {json.dumps(knowledge_data)}"
+    messages = build_conversation_messages(query, query_type, movie_title, semantic_matches, depth)
     
     try:
-        messages = [
-            {"role": "system", "content": context},
-            {"role": "user", "content": query}
-        ]
-        
         completion = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=messages,
@@ -469,12 +1665,663 @@ def generate_conversational_response(query, query_type, movie_title=None):
             max_tokens=200
         )
         
-        return completion.choices[0].message.content
+        reply = completion.choices[0].message.content
+        response_cache.put(query_type, query, movie_title, depth, reply)
+        return reply
     except Exception as e:
         print(f"GPT error: {e}")
-        if is_tell_me_more:
-            return f"Here's a fascinating detail about {movie_title} - it's considered one of the most influential horror films of its era!"
-        return "The spirits are disturbed, but I'd love to talk horror with you! What kind of scares are you looking for?"
+        return gpt_error_response(is_tell_me_more, movie_title)
+
+def build_conversation_messages(query, query_type, movie_title=None, semantic_matches=None, depth=None):
+    """Build the system + user messages for a conversational completion"""
+    is_tell_me_more = query_type == 'tell_me_more'
+    context = get_conversational_prompt(query, is_tell_me_more, movie_title, depth)
+    
+    if query_type in ['bloodiest', 'weird_kills', 'nudity', 'zombies', 'vampires', 'slashers']:
+        knowledge_data = HORROR_KNOWLEDGE.get(query_type.replace('weird_kills', 'weirdest_kills'), [])
+        context += f"\n\nRelevant movies for this category: {json.dumps(knowledge_data)}"
+    
+    if semantic_matches:
+        catalogue = [{"title": m["title"], "year": m["year"], "plot": m["plot"]} for m in semantic_matches]
+        context += f"\n\nMovies from our catalogue whose plots best match this request - build your answer around these: {json.dumps(catalogue)}"
+    
+    return [
+        {"role": "system", "content": context},
+        {"role": "user", "content": query}
+    ]
+
+def gpt_error_response(is_tell_me_more, movie_title=None):
+    """Fallback text when the GPT call fails"""
+    if is_tell_me_more:
+        return f"Here's a fascinating detail about {movie_title} - it's considered one of the most influential horror films of its era!"
+    return ORACLE_TIMEOUT_RESPONSE
+
+def stream_conversational_response(query, query_type, movie_title=None, semantic_matches=None):
+    """Like generate_conversational_response, but yields the text as the model streams it"""
+    if not client:
+        yield generate_conversational_response(query, query_type, movie_title, semantic_matches)
+        return
+    
+    is_tell_me_more = query_type == 'tell_me_more'
+    depth = next_conversation_depth(movie_title) if is_tell_me_more and movie_title else 0
+    cached = response_cache.get(query_type, query, movie_title, depth)
+    if cached:
+        # Replay in word-sized pieces so the client sees the same token events
+        print(f"🧠 RESPONSE CACHE HIT: {query_type}")
+        for piece in re.findall(r"\S+\s*", cached):
+            yield piece
+        return
+    
+    messages = build_conversation_messages(query, query_type, movie_title, semantic_matches, depth)
+    sent_anything = False
+    pieces = []
+    
+    try:
+        stream = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.9,
+            max_tokens=200,
+            stream=True,
+            timeout=GPT_DEADLINE
+        )
+        
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content
+            if piece:
+                sent_anything = True
+                pieces.append(piece)
+                yield piece
+        
+        response_cache.put(query_type, query, movie_title, depth, "".join(pieces))
+    except Exception as e:
+        print(f"GPT stream error: {e}")
+        if not sent_anything:
+            yield gpt_error_response(query_type == 'tell_me_more', movie_title)
+
+def find_tell_me_more_title(query):
+    """Find which known movie a "tell me more" query is about"""
+    query_lower = query.lower()
+    for movie in ['saw', 'halloween', 'scream', 'the conjuring', 'the exorcist', 'insidious', 
+                 'sinister', 'hereditary', 'midsommar', 'get out', 'friday the 13th',
+                 'nightmare on elm street', 'texas chainsaw massacre', "child's play",
+                 'evil dead', 'hellraiser', 'candyman']:
+        if movie in query_lower:
+            return movie.title()
+    return None
+
+def category_sample_title(query_type):
+    """Pick the showcase movie for a category query, or None"""
+    if query_type not in ['bloodiest', 'zombies', 'vampires', 'slashers']:
+        return None
+    category_movies = HORROR_KNOWLEDGE.get(query_type, [])
+    if category_movies and isinstance(category_movies[0], dict):
+        return category_movies[0].get('title', '')
+    elif category_movies:
+        return category_movies[0].split('(')[0].strip()
+    return None
+
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# ----- HORROR STATS (precomputed by horror-stats-builder.py, see horror_stats.py) -----
+stats_db_local = threading.local()
+
+def get_stats_db():
+    """Per-thread connection to the stats table"""
+    conn = getattr(stats_db_local, "conn", None)
+    if conn is None:
+        conn = open_stats_db(HORROR_STATS_FILE)
+        stats_db_local.conn = conn
+    return conn
+
+def get_horror_stats(movie_title):
+    """Curated stats, else the precomputed row, else the deterministic title-only score"""
+    curated = MOVIE_HORROR_STATS.get(movie_title.lower())
+    if curated:
+        return curated
+    try:
+        stats = lookup_stats(get_stats_db(), movie_title)
+    except sqlite3.Error as e:
+        print(f"Horror stats lookup error: {e}")
+        stats = None
+    return stats or compute_stats(movie_title)
+
+def json_response_with_etag(payload):
+    """JSON response with a content ETag; answers 304 when the client already has it"""
+    response = jsonify(payload)
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    response.headers["Cache-Control"] = "no-cache"  # cache, but revalidate with If-None-Match
+    return response.make_conditional(request)
+
+# ----- RELEASE FEEDS (TMDB discover lists, refreshed in the background) -----
+class ReleaseFeed:
+    """A TMDB discover list served stale-while-revalidate.
+
+    Requests only ever read the in-memory payload (and its pre-serialized
+    JSON body + ETag); when it's older than refresh_interval a refresh is
+    queued on the refresher thread. Refreshes first look at the shared
+    SQLite copy, so with several workers only one of them calls TMDB per
+    interval. A failed refresh keeps serving the old payload. A cold feed
+    is seeded on the request path (see seed()), so it never waits for the
+    refresher thread to come around.
+    """
+
+    def __init__(self, name, params_fn, format_fn, default_limit, refresh_interval, pages):
+        self.name = name
+        self.params_fn = params_fn
+        self.format_fn = format_fn
+        self.default_limit = default_limit
+        self.refresh_interval = refresh_interval
+        self.pages = pages
+        self.lock = threading.Lock()
+        self.releases = None
+        self.fetched_at = 0
+        self.bodies = {}  # limit -> (json bytes, etag)
+        self.next_attempt = 0
+        self.seed_lock = threading.Lock()
+        self.counters = defaultdict(int)
+
+    def is_stale(self):
+        return time.time() - self.fetched_at >= self.refresh_interval
+
+    def _publish(self, releases, fetched_at):
+        with self.lock:
+            self.releases = releases
+            self.fetched_at = fetched_at
+            self.bodies = {}
+
+    def body(self, limit=None):
+        """(json bytes, etag) for the first `limit` (>= 1) releases - served without touching TMDB"""
+        limit = self.default_limit if limit is None else limit
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        with self.lock:
+            self.counters["requests"] += 1
+            if self.releases is None:
+                self.counters["cold"] += 1
+            elif self.is_stale():
+                self.counters["stale"] += 1
+            # Every limit past the end of the list is the same body, so memoized bodies stay bounded
+            limit = min(limit, max(1, len(self.releases or [])))
+            cached = self.bodies.get(limit)
+            if cached is None:
+                data = json.dumps({"releases": (self.releases or [])[:limit]}).encode("utf-8")
+                cached = (data, hashlib.sha1(data).hexdigest())
+                if self.releases is not None:
+                    self.bodies[limit] = cached
+        return cached
+
+    def load_shared(self, conn):
+        """Adopt the copy another worker (or a previous run) stored, if it's newer than ours"""
+        row = conn.execute('SELECT payload, fetched_at FROM release_feeds WHERE name = ?', (self.name,)).fetchone()
+        if row and row[1] > self.fetched_at:
+            self._publish(json.loads(row[0]), row[1])
+
+    def fetch(self, pages=None, timeout=None, retries=None):
+        """Pull `pages` pages from TMDB discover and format them"""
+        releases = []
+        params = self.params_fn()
+        for page in range(1, (pages or self.pages) + 1):
+            response = upstream.get("https://api.themoviedb.org/3/discover/movie", params=dict(params, page=page),
+                                    timeout=timeout, retries=retries)
+            data = response.json()
+            if "results" not in data:
+                raise Exception(data.get("status_message", "no results"))
+            releases.extend(self.format_fn(movie) for movie in data["results"])
+            if page >= data.get("total_pages", page):
+                break
+        return releases
+
+    def refresh(self, conn):
+        """Bring the payload up to date; called from the refresher thread only"""
+        self.load_shared(conn)
+        if not self.is_stale() or time.time() < self.next_attempt:
+            return
+        try:
+            releases = self.fetch()
+        except Exception as e:
+            self.counters["refresh_errors"] += 1
+            self.next_attempt = time.time() + RELEASES_RETRY_INTERVAL
+            print(f"⚠️ {self.name} refresh failed ({e}) - serving the cached list")
+            return
+        self._store(conn, releases, time.time())
+        self.counters["refreshes"] += 1
+        print(f"🎟️ Refreshed {self.name}: {len(releases)} releases")
+
+    def _store(self, conn, releases, fetched_at):
+        conn.execute(
+            'INSERT OR REPLACE INTO release_feeds (name, payload, fetched_at) VALUES (?, ?, ?)',
+            (self.name, json.dumps(releases), fetched_at)
+        )
+        self._publish(releases, fetched_at)
+
+    def seed(self, conn):
+        """Cold start on the request path: adopt the shared copy, or else fetch the first page
+        once, with a short timeout and no retries. That partial list is stored already stale,
+        so the refresher replaces it with the full one on its next pass."""
+        with self.seed_lock:
+            if self.releases is not None:
+                return
+            self.load_shared(conn)
+            if self.releases is not None or time.time() < self.next_attempt:
+                return
+            try:
+                releases = self.fetch(pages=1, timeout=RELEASES_SEED_TIMEOUT, retries=0)
+            except Exception as e:
+                self.counters["seed_errors"] += 1
+                self.next_attempt = time.time() + RELEASES_RETRY_INTERVAL
+                print(f"⚠️ {self.name} seed failed ({e}) - serving an empty list")
+                return
+            self._store(conn, releases, time.time() - self.refresh_interval)
+            self.counters["seeds"] += 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["releases"] = len(self.releases or [])
+            stats["age_seconds"] = round(time.time() - self.fetched_at) if self.fetched_at else None
+        return stats
+
+def open_release_db(path):
+    """Connection to the release_feeds table shared by every worker"""
+    conn = open_sqlite(path)
+    conn.execute('CREATE TABLE IF NOT EXISTS release_feeds (name TEXT PRIMARY KEY, payload TEXT NOT NULL, fetched_at REAL NOT NULL)')
+    return conn
+
+release_db_local = threading.local()
+
+def get_release_db():
+    """Per-thread connection for seeding cold feeds on the request path"""
+    conn = getattr(release_db_local, "conn", None)
+    if conn is None:
+        conn = open_release_db(DETAILS_CACHE_FILE)
+        release_db_local.conn = conn
+    return conn
+
+class ReleaseRefresher:
+    """Background thread that keeps every ReleaseFeed fresh; requests just poke it"""
+
+    def __init__(self, feeds, db_path):
+        self.feeds = feeds
+        self.db_path = db_path
+        self.wake = threading.Event()
+        self.thread = None
+
+    def poke(self):
+        self.wake.set()
+
+    def _run(self):
+        conn = open_release_db(self.db_path)
+        while True:
+            for feed in self.feeds:
+                try:
+                    feed.refresh(conn)
+                except Exception as e:
+                    print(f"Release refresher error ({feed.name}): {e}")
+            # Sleep until the next feed goes stale (or a request finds one already stale);
+            # the jitter lets one worker refresh first and the others adopt its copy
+            wait = min(max(RELEASES_RETRY_INTERVAL, feed.fetched_at + feed.refresh_interval - time.time()) for feed in self.feeds)
+            self.wake.wait(wait + random.uniform(0, 30))
+            self.wake.clear()
+
+    def start(self):
+        if self.thread is None and TMDB_API_KEY:
+            self.thread = threading.Thread(target=self._run, name="release-refresher", daemon=True)
+            self.thread.start()
+
+def theater_release_params():
+    today = datetime.datetime.now()
+    four_weeks_ago = today - datetime.timedelta(days=28)
+    return {
+        "api_key": TMDB_API_KEY,
+        "with_genres": "27",
+        "primary_release_date.gte": four_weeks_ago.strftime("%Y-%m-%d"),
+        "primary_release_date.lte": today.strftime("%Y-%m-%d"),
+        "sort_by": "popularity.desc",
+        "region": "US"
+    }
+
+def recent_release_params():
+    today = datetime.datetime.now()
+    three_months_ago = today - datetime.timedelta(days=90)
+    return {
+        "api_key": TMDB_API_KEY,
+        "with_genres": "27",
+        "primary_release_date.gte": three_months_ago.strftime("%Y-%m-%d"),
+        "primary_release_date.lte": today.strftime("%Y-%m-%d"),
+        "sort_by": "primary_release_date.desc"
+    }
+
+def format_theater_release(movie):
+    return {
+        "title": movie.get("title"),
+        "release_date": movie.get("release_date"),
+        "poster_path": movie.get("poster_path"),
+        "vote_average": movie.get("vote_average", 0),
+        "overview": (movie.get("overview") or "")[:150] + "..."
+    }
+
+def format_recent_release(movie):
+    return {
+        "title": movie.get("title"),
+        "release_date": movie.get("release_date"),
+        "poster_path": movie.get("poster_path"),
+        "overview": (movie.get("overview") or "")[:150] + "..."
+    }
+
+theater_feed = ReleaseFeed("theater_releases", theater_release_params, format_theater_release, 3,
+                           RELEASES_REFRESH_INTERVAL, RELEASES_PAGES)
+recent_feed = ReleaseFeed("recent_releases", recent_release_params, format_recent_release, 10,
+                          RELEASES_REFRESH_INTERVAL, RELEASES_PAGES)
+release_refresher = ReleaseRefresher([theater_feed, recent_feed], DETAILS_CACHE_FILE)
+
+def release_feed_response(feed):
+    """Cached feed body with Cache-Control/ETag; never waits on TMDB"""
+    limit = request.args.get("limit", type=int)
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be at least 1"}), 400
+    if feed.releases is None:
+        try:
+            feed.seed(get_release_db())
+        except sqlite3.Error as e:
+            print(f"Release feed seed error ({feed.name}): {e}")
+    if feed.releases is None or feed.is_stale():
+        release_refresher.poke()
+    data, etag = feed.body(limit)
+    response = Response(data, mimetype="application/json")
+    response.set_etag(etag)
+    if feed.releases is not None:
+        response.headers["Cache-Control"] = f"public, max-age={RELEASES_MAX_AGE}, stale-while-revalidate={int(RELEASES_REFRESH_INTERVAL)}"
+    else:
+        response.headers["Cache-Control"] = "no-cache"  # still warming up - don't let browsers keep the empty list
+    return response.make_conditional(request)
+
+# ----- GENRE POOLS (hydrated in the background for /random-genre) -----
+# How each genre button expands from the horror subset: TMDB genres the movie must
+# also have, and/or words its title must contain (empty = hand-picked titles only)
+GENRE_POOL_SPECS = {
+    "slashers": {"title_terms": ["slasher", "massacre", "killer"]},
+    "zombies": {"title_terms": ["zombie", "living dead", "undead"]},
+    "vampires": {"title_terms": ["vampire", "dracula", "nosferatu"]},
+    "gore-fests": {"title_terms": ["gore", "blood"]},
+    "supernatural": {"genre_ids": [14]},            # + Fantasy
+    "demons": {"title_terms": ["demon", "exorcis", "possess", "devil", "satan"]},
+    "psycho-killers": {"genre_ids": [80]},          # + Crime
+    "alien-horror": {"genre_ids": [878]},           # + Science Fiction
+    "creature-features": {"title_terms": ["creature", "monster", "beast", "shark"]},
+    "haunted-houses": {"title_terms": ["haunt", "house", "ghost"]},
+    "psychological": {"genre_ids": [53, 9648]},     # + Thriller and Mystery
+    "cult-horror": {"title_terms": ["cult", "ritual", "coven", "witch"]},
+}
+
+class GenrePools:
+    """Every genre's titles with details and recommendations already fetched.
+
+    A background thread expands the hand-picked GENRE_MOVIES lists from the
+    horror subset, then hydrates each title through the normal caches and
+    re-hydrates it every refresh_interval. /random-genre only picks from
+    titles that are already hydrated, so a click costs no upstream calls.
+    Hydrated entries are shared through SQLite, so a new worker starts warm
+    and only one worker refetches a title per interval.
+    """
+
+    def __init__(self, genre_movies, refresh_interval, expansion, db_path):
+        self.genre_movies = genre_movies
+        self.refresh_interval = refresh_interval
+        self.expansion = expansion
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.pools = {genre: list(titles) for genre, titles in genre_movies.items()}
+        self.hand_picked = {title for titles in genre_movies.values() for title in titles}
+        self.entries = {}  # title key -> {"title", "details", "recommendations", "hydrated_at"}
+        self.thread = None
+        self.counters = defaultdict(int)
+
+    def expand(self):
+        """Add the most popular matching titles from the horror subset to each pool"""
+        if not HORROR_TABLE_READY or not self.expansion:
+            return
+        horror_bit = genre_flags([27])
+        for genre, titles in self.genre_movies.items():
+            spec = GENRE_POOL_SPECS.get(genre) or {}
+            clauses, params = [], []
+            if spec.get("genre_ids"):
+                mask = horror_bit | genre_flags(spec["genre_ids"])
+                clauses.append('(genre_flags & ?) = ?')
+                params += [mask, mask]
+            if spec.get("title_terms"):
+                clauses.append("(" + " OR ".join(["(' ' || title_key) LIKE ?"] * len(spec["title_terms"])) + ")")
+                params += [f"% {term}%" for term in spec["title_terms"]]
+            if not clauses:
+                continue
+            try:
+                with db_lock:
+                    rows = db_conn.execute(
+                        f'SELECT title FROM {HORROR_TABLE} WHERE {" AND ".join(clauses)} ORDER BY popularity DESC LIMIT ?',
+                        params + [self.expansion]
+                    ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Genre pool expansion error ({genre}): {e}")
+                continue
+            known = {normalize_title_key(title) for title in titles}
+            extra = [row[0] for row in rows if row[0] and normalize_title_key(row[0]) not in known]
+            with self.lock:
+                self.pools[genre] = list(titles) + extra
+
+    def hydrate(self, title, conn=None):
+        """Fetch (through the usual caches) and store one title's details and recommendations"""
+        details = get_movie_details_from_apis(title)
+        found = bool(details and (details.get("poster") or details.get("plot")))
+        recommendations = get_movie_recommendations(details["title"]) if found else []
+        entry = {"title": title, "details": details if found else None,
+                 "recommendations": recommendations, "hydrated_at": time.time()}
+        key = normalize_title_key(title)
+        with self.lock:
+            self.entries[key] = entry
+        if conn is not None:
+            conn.execute('INSERT OR REPLACE INTO genre_pool_entries (title_key, entry, hydrated_at) VALUES (?, ?, ?)',
+                         (key, json.dumps(entry), entry["hydrated_at"]))
+        self.counters["hydrated"] += 1
+        return entry
+
+    def load_shared(self, conn, title_key=None):
+        """Adopt entries another worker (or a previous run) hydrated, if they're newer than ours"""
+        if title_key is None:
+            rows = conn.execute('SELECT title_key, entry, hydrated_at FROM genre_pool_entries').fetchall()
+        else:
+            rows = conn.execute('SELECT title_key, entry, hydrated_at FROM genre_pool_entries WHERE title_key = ?',
+                                (title_key,)).fetchall()
+        adopted = 0
+        with self.lock:
+            for key, payload, hydrated_at in rows:
+                entry = self.entries.get(key)
+                if entry is None or hydrated_at > entry["hydrated_at"]:
+                    self.entries[key] = json.loads(payload)
+                    adopted += 1
+        self.counters["adopted"] += adopted
+        return adopted
+
+    def _is_due(self, key, now):
+        """Never hydrated, or stale; failed lookups are retried sooner. Caller holds the lock"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return True
+        max_age = self.refresh_interval if entry["details"] else GENRE_POOL_RETRY_INTERVAL
+        return now - entry["hydrated_at"] >= max_age
+
+    def _due(self):
+        """Titles never hydrated (hand-picked first), then stale ones"""
+        now = time.time()
+        with self.lock:
+            titles = [title for pool in self.pools.values() for title in pool]
+            titles.sort(key=lambda title: title not in self.hand_picked)
+            due, seen = [], set()
+            for title in titles:
+                key = normalize_title_key(title)
+                if key not in seen and self._is_due(key, now):
+                    seen.add(key)
+                    due.append(title)
+        return due
+
+    def _run(self):
+        conn = open_sqlite(self.db_path)
+        conn.execute('CREATE TABLE IF NOT EXISTS genre_pool_entries (title_key TEXT PRIMARY KEY, entry TEXT NOT NULL, hydrated_at REAL NOT NULL)')
+        adopted = self.load_shared(conn)
+        if adopted:
+            print(f"🎲 Genre pools: {adopted} titles from the shared store")
+        # Workers usually start together - the jitter lets one of them hydrate first and the others adopt
+        time.sleep(random.uniform(0, 30))
+        while True:
+            try:
+                self.expand()
+                self.load_shared(conn)
+                due = self._due()
+                if due:
+                    print(f"🎲 Genre pools: hydrating {len(due)} titles")
+                for title in due:
+                    try:
+                        # Another worker may have hydrated it since this pass started
+                        key = normalize_title_key(title)
+                        self.load_shared(conn, key)
+                        with self.lock:
+                            if not self._is_due(key, time.time()):
+                                continue
+                        self.hydrate(title, conn)
+                    except Exception as e:
+                        self.counters["errors"] += 1
+                        print(f"Genre pool hydrate error ({title}): {e}")
+            except Exception as e:
+                print(f"Genre pool error: {e}")
+            time.sleep(min(self.refresh_interval, GENRE_POOL_RETRY_INTERVAL))
+
+    def start(self):
+        # Without provider keys every lookup would just come back empty
+        if self.thread is None and (OMDB_API_KEY or TMDB_API_KEY):
+            self.thread = threading.Thread(target=self._run, name="genre-pools", daemon=True)
+            self.thread.start()
+
+    def pick(self, genre):
+        """(title, entry) for a random hydrated title in the genre, or None while the pool is cold"""
+        with self.lock:
+            ready = [self.entries[key] for key in (normalize_title_key(t) for t in self.pools.get(genre, []))
+                     if key in self.entries and self.entries[key]["details"]]
+        if not ready:
+            self.counters["cold_picks"] += 1
+            return None
+        self.counters["warm_picks"] += 1
+        entry = random.choice(ready)
+        return entry["title"], entry
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["titles"] = {genre: len(pool) for genre, pool in self.pools.items()}
+            stats["hydrated"] = sum(1 for entry in self.entries.values() if entry["details"])
+        return stats
+
+genre_pools = GenrePools(GENRE_MOVIES, GENRE_POOL_REFRESH_INTERVAL, GENRE_POOL_EXPANSION, DETAILS_CACHE_FILE)
+
+# ----- QUIZ BANK (pre-generated by quiz-bank-builder.py, see quiz_bank.py) -----
+quiz_db_local = threading.local()
+quiz_executor = ThreadPoolExecutor(max_workers=QUIZ_REFILL_WORKERS, thread_name_prefix="quiz")
+quiz_refills = set()  # title keys with a refill queued or running
+quiz_refills_lock = threading.Lock()
+quiz_counters = {"served": 0, "cold": 0, "refills": 0, "refill_failures": 0, "refills_rejected": 0}
+
+def get_quiz_db():
+    """Per-thread connection to the quiz bank"""
+    conn = getattr(quiz_db_local, "conn", None)
+    if conn is None:
+        conn = quiz_bank.open_quiz_bank(quiz_bank.QUIZ_BANK_FILE)
+        quiz_db_local.conn = conn
+    return conn
+
+def refill_quiz_bank(movie, missing):
+    """Background job: generate `missing` sets for a movie and store them"""
+    key = normalize_title_key(movie)
+    try:
+        for _ in range(missing):
+            questions = quiz_bank.generate_quiz_set(client, movie)
+            if not questions:
+                quiz_counters["refill_failures"] += 1
+                break
+            quiz_bank.add_quiz_set(get_quiz_db(), movie, questions)
+            quiz_counters["refills"] += 1
+            print(f"🧩 QUIZ BANK: stored a set for {movie}")
+    except Exception as e:
+        print(f"Quiz refill error for {movie}: {e}")
+    finally:
+        with quiz_refills_lock:
+            quiz_refills.discard(key)
+
+def is_known_title(movie):
+    """True if the title exactly names a movie in the horror subset, the title index or the movie store"""
+    key = normalize_title_key(movie)
+    if not key:
+        return False
+    try:
+        local = resolve_title_locally(movie)
+    except sqlite3.Error as e:
+        print(f"Title lookup error: {e}")
+        local = None
+    # The FTS fallback also matches partial titles - only an exact hit counts here
+    if local and key in (normalize_title_key(local.get("title")), normalize_title_key(local.get("original_title"))):
+        return True
+    refresh_overnight_cache()
+    store = overnight_cache["store"]
+    return store is not None and store.get(movie.lower().strip()) is not None
+
+def schedule_quiz_refill(movie, missing):
+    """Queue one refill per known title at a time, at most QUIZ_REFILL_MAX_QUEUED titles.
+    Returns True if one is queued or running"""
+    if not client or missing <= 0:
+        return False
+    key = normalize_title_key(movie)
+    with quiz_refills_lock:
+        if key in quiz_refills:
+            return True
+    
+    # Every refill is SETS_PER_TITLE completions and a bank row - never for made-up titles
+    if not is_known_title(movie):
+        quiz_counters["refills_rejected"] += 1
+        return False
+    
+    with quiz_refills_lock:
+        if key in quiz_refills:
+            return True
+        if len(quiz_refills) >= QUIZ_REFILL_MAX_QUEUED:
+            quiz_counters["refills_rejected"] += 1
+            return False
+        quiz_refills.add(key)
+    quiz_executor.submit(refill_quiz_bank, movie, missing)
+    return True
+
+init_user_store()
+
+background_lock = threading.Lock()
+background_started = False
+
+def start_background_workers():
+    """Start the background threads once per process"""
+    global background_started
+    if background_started or not BACKGROUND_WORKERS:
+        return
+    with background_lock:
+        if background_started:
+            return
+        background_started = True
+        genre_buffer.start()
+        release_refresher.start()
+        genre_pools.start()
+
+@app.before_request
+def ensure_background_workers():
+    # Under gunicorn (or any WSGI server) the first request in each worker starts them
+    start_background_workers()
 
 # ----- ROUTES -----
 
@@ -495,37 +2342,15 @@ def track_genre_preference():
         if not google_id or not genre:
             return jsonify({"error": "Missing googleId or genre"}), 400
         
-        users = load_user_data()
-        
-        # Initialize user if not exists
-        if google_id not in users:
-            users[google_id] = {
-                "myList": [],
-                "ratings": {},
-                "history": [],
-                "genre_searches": {},
-                "horror_profile": "New Horror Fan"
-            }
-        
-        # Initialize genre_searches if not exists
-        if "genre_searches" not in users[google_id]:
-            users[google_id]["genre_searches"] = {}
-        
-        # Increment genre count
-        genre_lower = genre.lower()
-        if genre_lower not in users[google_id]["genre_searches"]:
-            users[google_id]["genre_searches"][genre_lower] = 0
-        users[google_id]["genre_searches"][genre_lower] += 1
-        
-        # Update horror profile
-        users[google_id]["horror_profile"] = get_user_profile(google_id)
-        
-        save_user_data(users)
+        # Buffered - the write happens on the next flush, the response reflects it already
+        genre_buffer.add(google_id, genre.lower())
+        genre_searches = get_genre_searches(google_id)
+        horror_profile = get_user_profile(google_id, genre_searches)
         
         return jsonify({
             "success": True,
-            "genre_searches": users[google_id]["genre_searches"],
-            "horror_profile": users[google_id]["horror_profile"]
+            "genre_searches": genre_searches,
+            "horror_profile": horror_profile
         })
         
     except Exception as e:
@@ -541,12 +2366,8 @@ def get_horror_profile():
         if not google_id:
             return jsonify({"error": "Missing googleId"}), 400
         
-        profile = get_user_profile(google_id)
-        
-        users = load_user_data()
-        genre_searches = {}
-        if google_id in users and "genre_searches" in users[google_id]:
-            genre_searches = users[google_id]["genre_searches"]
+        genre_searches = get_genre_searches(google_id)
+        profile = get_user_profile(google_id, genre_searches)
         
         return jsonify({
             "horror_profile": profile,
@@ -566,12 +2387,7 @@ def get_personalized_recommendations():
         if not google_id:
             return jsonify({"error": "Missing googleId"}), 400
         
-        users = load_user_data()
-        
-        if google_id not in users or "genre_searches" not in users[google_id]:
-            return jsonify({"recommendations": []})
-        
-        genre_searches = users[google_id]["genre_searches"]
+        genre_searches = get_genre_searches(google_id)
         
         if not genre_searches:
             return jsonify({"recommendations": []})
@@ -607,7 +2423,7 @@ def get_personalized_recommendations():
         return jsonify({
             "recommendations": rec_details,
             "based_on_genre": top_genre,
-            "horror_profile": get_user_profile(google_id)
+            "horror_profile": get_user_profile(google_id, genre_searches)
         })
         
     except Exception as e:
@@ -622,26 +2438,12 @@ def save_to_list():
     google_id = data.get('googleId')
     movie = data.get('movie')
     
-    try:
-        users = load_user_data()
-    except:
-        users = {}
-    
-    if google_id not in users:
-        users[google_id] = {
-            "myList": [],
-            "ratings": {},
-            "history": [],
-            "genre_searches": {},
-            "horror_profile": "New Horror Fan"
-        }
-    
-    if movie not in users[google_id]["myList"]:
-        users[google_id]["myList"].append(movie)
+    if not google_id:
+        return jsonify({"error": "Missing googleId"}), 400
     
-    save_user_data(users)
+    my_list = add_to_list(google_id, movie)
     
-    return jsonify({"success": True, "list": users[google_id]["myList"]})
+    return jsonify({"success": True, "list": my_list})
 
 @app.route("/get-user-data", methods=["POST"])
 def get_user_data():
@@ -649,17 +2451,11 @@ def get_user_data():
     google_id = request.json.get('googleId')
     
     try:
-        users = load_user_data()
-        if google_id in users:
-            # Ensure all fields exist
-            if "genre_searches" not in users[google_id]:
-                users[google_id]["genre_searches"] = {}
-            if "horror_profile" not in users[google_id]:
-                users[google_id]["horror_profile"] = get_user_profile(google_id)
-            
-            return jsonify(users[google_id])
-    except:
-        pass
+        user = get_user(google_id)
+        if user:
+            return jsonify(user)
+    except Exception as e:
+        print(f"Error loading user data: {e}")
     
     return jsonify({
         "myList": [],
@@ -676,23 +2472,10 @@ def save_rating():
     movie = data.get('movie')
     rating = data.get('rating')
     
-    try:
-        users = load_user_data()
-    except:
-        users = {}
-    
-    if google_id not in users:
-        users[google_id] = {
-            "myList": [],
-            "ratings": {},
-            "history": [],
-            "genre_searches": {},
-            "horror_profile": "New Horror Fan"
-        }
-    
-    users[google_id]["ratings"][movie] = rating
+    if not google_id:
+        return jsonify({"error": "Missing googleId"}), 400
     
-    save_user_data(users)
+    set_rating(google_id, movie, rating)
     
     return jsonify({"success": True})
 
@@ -721,66 +2504,81 @@ def ask_oracle():
         movie_details = None
         recommendations = []
         
+        # Each upstream call gets its own deadline, counted from the start of the request
+        gpt_deadline = start_time + GPT_DEADLINE
+        details_deadline = start_time + DETAILS_DEADLINE
+        recs_deadline = start_time + RECOMMENDATIONS_DEADLINE
+        
         movie_title = None
         if query_type == 'tell_me_more':
-            query_lower = query.lower()
-            for movie in ['saw', 'halloween', 'scream', 'the conjuring', 'the exorcist', 'insidious', 
-                         'sinister', 'hereditary', 'midsommar', 'get out', 'friday the 13th',
-                         'nightmare on elm street', 'texas chainsaw massacre', "child's play",
-                         'evil dead', 'hellraiser', 'candyman']:
-                if movie in query_lower:
-                    movie_title = movie.title()
-                    break
+            movie_title = find_tell_me_more_title(query)
             
             if movie_title:
-                print(f"⏱️ Before GPT: {time.time() - start_time:.2f}s")
-                response = generate_conversational_response(query, query_type, movie_title)
-                print(f"⏱️ After GPT: {time.time() - start_time:.2f}s")
+                # GPT, details and recommendations are independent - fan them all out
+                print(f"⏱️ Before GPT + movie details + recommendations: {time.time() - start_time:.2f}s")
+                gpt_future = run_async(generate_conversational_response, query, query_type, movie_title)
+                details_future = run_async(get_movie_details_from_apis, movie_title)
+                recs_future = run_async(get_movie_recommendations, movie_title)
                 
-                movie_details = get_movie_details_from_apis(movie_title)
+                movie_details = wait_for(details_future, details_deadline, None, "Movie details")
                 print(f"⏱️ After movie details: {time.time() - start_time:.2f}s")
                 
                 if movie_details:
-                    recommendations = get_movie_recommendations(movie_title)
+                    recommendations = wait_for(recs_future, recs_deadline, [], "Recommendations")
+                
+                response = wait_for(gpt_future, gpt_deadline, ORACLE_TIMEOUT_RESPONSE, "GPT")
+                print(f"⏱️ After GPT: {time.time() - start_time:.2f}s")
             else:
                 response = generate_conversational_response(query, 'general')
         
         elif query_type == 'specific_movie':
+            # Recommendations only need the title, so start them alongside the details lookup
             print(f"⏱️ Before get_movie_details: {time.time() - start_time:.2f}s")
-            movie_details = get_movie_details_from_apis(query)
+            details_future = run_async(get_movie_details_from_apis, query)
+            recs_future = run_async(get_movie_recommendations, query)
+            
+            movie_details = wait_for(details_future, details_deadline, None, "Movie details")
             print(f"⏱️ After get_movie_details: {time.time() - start_time:.2f}s")
             
             if movie_details and movie_details.get("title"):
-                # Get recommendations for this specific movie
-                recommendations = get_movie_recommendations(query)
-                print(f"⏱️ After get_recommendations: {time.time() - start_time:.2f}s")
-                
                 if client:
+                    # The GPT call needs the details as context, so it runs while recommendations finish
                     movie_context = f"Movie: {movie_details['title']} ({movie_details.get('year', 'N/A')})\nDirector: {movie_details.get('director', 'Unknown')}\nPlot: {movie_details.get('plot', 'N/A')}"
                     print(f"⏱️ Before GPT: {time.time() - start_time:.2f}s")
-                    response = generate_conversational_response(f"Tell me about {query}. Context: {movie_context}", 'specific_movie')
+                    gpt_future = run_async(generate_conversational_response, f"Tell me about {query}. Context: {movie_context}", 'specific_movie')
+                    response = wait_for(gpt_future, gpt_deadline, ORACLE_TIMEOUT_RESPONSE, "GPT")
                     print(f"⏱️ After GPT: {time.time() - start_time:.2f}s")
                 else:
                     response = f"{movie_details['title']}! That's a classic from {movie_details.get('year', 'unknown year')}. {movie_details.get('plot', '')} Directed by {movie_details.get('director', 'unknown')}. Such a great horror flick!"
+                
+                recommendations = wait_for(recs_future, recs_deadline, [], "Recommendations")
+                print(f"⏱️ After get_recommendations: {time.time() - start_time:.2f}s")
             else:
                 response = generate_conversational_response(query, query_type)
         else:
+            # Free-text queries: ground GPT in the catalogue movies whose plots match
+            semantic_matches = []
+            if query_type in SEMANTIC_QUERY_TYPES:
+                semantic_matches = wait_for(run_async(semantic_search, query), start_time + SEMANTIC_DEADLINE, [], "Semantic search")
+                recommendations = semantic_recommendations(semantic_matches)
+                print(f"⏱️ After semantic search: {time.time() - start_time:.2f}s")
+            
             print(f"⏱️ Before GPT: {time.time() - start_time:.2f}s")
-            response = generate_conversational_response(query, query_type)
+            gpt_future = run_async(generate_conversational_response, query, query_type, None, semantic_matches)
+            
+            sample_title = category_sample_title(query_type)
+            
+            if sample_title is not None:
+                details_future = run_async(get_movie_details_from_apis, sample_title)
+                recs_future = run_async(get_movie_recommendations, sample_title)
+            
+            response = wait_for(gpt_future, gpt_deadline, ORACLE_TIMEOUT_RESPONSE, "GPT")
             print(f"⏱️ After GPT: {time.time() - start_time:.2f}s")
             
-            if query_type in ['bloodiest', 'zombies', 'vampires', 'slashers']:
-                category_movies = HORROR_KNOWLEDGE.get(query_type, [])
-                if category_movies and isinstance(category_movies[0], dict):
-                    sample_movie = category_movies[0]
-                    movie_details = get_movie_details_from_apis(sample_movie.get('title', ''))
-                    if movie_details:
-                        recommendations = get_movie_recommendations(sample_movie.get('title', ''))
-                elif category_movies:
-                    sample_title = category_movies[0].split('(')[0].strip()
-                    movie_details = get_movie_details_from_apis(sample_title)
-                    if movie_details:
-                        recommendations = get_movie_recommendations(sample_title)
+            if sample_title is not None:
+                movie_details = wait_for(details_future, details_deadline, None, "Movie details")
+                if movie_details:
+                    recommendations = wait_for(recs_future, recs_deadline, [], "Recommendations")
         
         print(f"⏱️ TOTAL TIME: {time.time() - start_time:.2f}s")
         
@@ -796,6 +2594,95 @@ def ask_oracle():
         print(f"⏱️ TOTAL TIME (with error): {time.time() - start_time:.2f}s")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/ask-oracle-stream", methods=["GET", "POST"])
+def ask_oracle_stream():
+    """Streaming /ask-oracle: GPT text as Server-Sent Events, then movie details and recommendations"""
+    if request.method == "POST":
+        query = (request.json or {}).get("query", "").strip()
+    else:
+        query = request.args.get("query", "").strip()
+    
+    if not query:
+        return jsonify({"error": "No query provided"}), 400
+    
+    query_type = detect_query_type(query)
+    print(f"🔍 Streaming query: {query} ({query_type})")
+    
+    def generate():
+        start_time = time.time()
+        yield sse_event("meta", {"query_type": query_type})
+        
+        # Work out what to look up and what to ask GPT (same rules as /ask-oracle)
+        lookup_title = None
+        gpt_args = (query, query_type, None)
+        if query_type == 'tell_me_more':
+            movie_title = find_tell_me_more_title(query)
+            if movie_title:
+                lookup_title = movie_title
+                gpt_args = (query, query_type, movie_title)
+            else:
+                gpt_args = (query, 'general', None)
+        elif query_type == 'specific_movie':
+            lookup_title = query
+        else:
+            lookup_title = category_sample_title(query_type)
+        
+        semantic_matches = []
+        if query_type in SEMANTIC_QUERY_TYPES:
+            semantic_matches = wait_for(run_async(semantic_search, query), start_time + SEMANTIC_DEADLINE, [], "Semantic search")
+            gpt_args = (query, query_type, None, semantic_matches)
+        
+        details_future = recs_future = None
+        if lookup_title:
+            details_future = run_async(get_movie_details_from_apis, lookup_title)
+            recs_future = run_async(get_movie_recommendations, lookup_title)
+        
+        movie_details = None
+        details_sent = False
+        
+        # specific_movie needs the details as GPT context, so they go out first
+        if query_type == 'specific_movie':
+            movie_details = wait_for(details_future, start_time + DETAILS_DEADLINE, None, "Movie details")
+            yield sse_event("movie_details", movie_details)
+            details_sent = True
+            
+            if movie_details and movie_details.get("title"):
+                if client:
+                    movie_context = f"Movie: {movie_details['title']} ({movie_details.get('year', 'N/A')})\nDirector: {movie_details.get('director', 'Unknown')}\nPlot: {movie_details.get('plot', 'N/A')}"
+                    gpt_args = (f"Tell me about {query}. Context: {movie_context}", 'specific_movie', None)
+                else:
+                    gpt_args = None
+                    yield sse_event("token", {"text": f"{movie_details['title']}! That's a classic from {movie_details.get('year', 'unknown year')}. {movie_details.get('plot', '')} Directed by {movie_details.get('director', 'unknown')}. Such a great horror flick!"})
+            else:
+                movie_details = None
+                recs_future = None
+        
+        if gpt_args:
+            first_token = True
+            for piece in stream_conversational_response(*gpt_args):
+                if first_token:
+                    print(f"⏱️ First token: {time.time() - start_time:.2f}s")
+                    first_token = False
+                yield sse_event("token", {"text": piece})
+        
+        if not details_sent:
+            if details_future:
+                movie_details = wait_for(details_future, start_time + DETAILS_DEADLINE, None, "Movie details")
+            yield sse_event("movie_details", movie_details)
+        
+        recommendations = semantic_recommendations(semantic_matches)
+        if movie_details and recs_future:
+            recommendations = wait_for(recs_future, start_time + RECOMMENDATIONS_DEADLINE, [], "Recommendations")
+        yield sse_event("recommendations", recommendations)
+        
+        print(f"⏱️ STREAM TOTAL TIME: {time.time() - start_time:.2f}s")
+        yield sse_event("done", {"query_type": query_type})
+    
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route("/submit-rating", methods=["POST"])
 def submit_rating():
     """Submit a rating for a movie"""
@@ -807,17 +2694,14 @@ def submit_rating():
         if not movie_title or rating is None:
             return jsonify({"error": "Movie title and rating required"}), 400
         
-        if not 1 <= rating <= 5:
+        if isinstance(rating, bool) or not isinstance(rating, (int, float)) or rating != int(rating) or not 1 <= rating <= 5:
             return jsonify({"error": "Rating must be between 1 and 5"}), 400
         
-        movie_ratings[movie_title.lower()].append(rating)
-        
-        ratings_list = movie_ratings[movie_title.lower()]
-        avg_rating = sum(ratings_list) / len(ratings_list)
+        summary = record_rating(movie_title, int(rating))
         
         return jsonify({
-            "average_rating": round(avg_rating, 1),
-            "total_ratings": len(ratings_list),
+            "average_rating": summary["average"],
+            "total_ratings": summary["count"],
             "message": "Rating submitted successfully!"
         })
         
@@ -839,19 +2723,13 @@ def submit_review():
         if len(review_text) > 500:
             return jsonify({"error": "Review must be 500 characters or less"}), 400
         
-        review = {
-            "text": review_text,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "user": "Anonymous"
-        }
-        
-        movie_reviews[movie_title.lower()].append(review)
-        if len(movie_reviews[movie_title.lower()]) > 10:
-            movie_reviews[movie_title.lower()].pop(0)
+        review, rejected = add_review(movie_title, review_text)
+        if rejected:
+            return jsonify({"error": rejected}), 400
         
         return jsonify({
             "message": "Review submitted successfully!",
-            "total_reviews": len(movie_reviews[movie_title.lower()])
+            "total_reviews": count_reviews(movie_title)
         })
         
     except Exception as e:
@@ -867,22 +2745,14 @@ def get_movie_stats():
         if not movie_title:
             return jsonify({"error": "Movie title required"}), 400
         
-        ratings_list = movie_ratings.get(movie_title, [])
-        avg_rating = sum(ratings_list) / len(ratings_list) if ratings_list else 0
+        rating_stats = get_rating_summary(movie_title)
         
-        reviews_list = movie_reviews.get(movie_title, [])
+        reviews_list = [public_review(review) for review in get_recent_reviews(movie_title)]
         
-        stats = MOVIE_HORROR_STATS.get(movie_title, {
-            "gore": random.randint(20, 95),
-            "fear": round(random.uniform(5.0, 10.0), 1),
-            "kills": random.randint(1, 25)
-        })
+        stats = get_horror_stats(movie_title)
         
-        return jsonify({
-            "rating": {
-                "average": round(avg_rating, 1),
-                "count": len(ratings_list)
-            },
+        return json_response_with_etag({
+            "rating": rating_stats,
             "reviews": reviews_list[-5:],
             "stats": stats
         })
@@ -893,170 +2763,41 @@ def get_movie_stats():
 
 @app.route("/theater-releases", methods=["GET"])
 def theater_releases():
-    """Get current horror movies in theaters with posters"""
+    """Get current horror movies in theaters with posters (?limit=N, default 3)"""
     if not TMDB_API_KEY:
         return jsonify({"releases": []})
     
-    try:
-        today = datetime.datetime.now()
-        four_weeks_ago = today - datetime.timedelta(days=28)
-        
-        url = f"https://api.themoviedb.org/3/discover/movie"
-        params = {
-            "api_key": TMDB_API_KEY,
-            "with_genres": "27",
-            "primary_release_date.gte": four_weeks_ago.strftime("%Y-%m-%d"),
-            "primary_release_date.lte": today.strftime("%Y-%m-%d"),
-            "sort_by": "popularity.desc",
-            "page": 1,
-            "region": "US"
-        }
-        
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        releases = []
-        for movie in data.get("results", [])[:3]:
-            releases.append({
-                "title": movie.get("title"),
-                "release_date": movie.get("release_date"),
-                "poster_path": movie.get("poster_path"),
-                "vote_average": movie.get("vote_average", 0),
-                "overview": movie.get("overview", "")[:150] + "..."
-            })
-        
-        return jsonify({"releases": releases})
-        
-    except Exception as e:
-        print(f"Error getting theater releases: {e}")
-        return jsonify({"releases": []})
+    return release_feed_response(theater_feed)
 
 @app.route("/recent-releases", methods=["GET"])
 def recent_releases():
-    """Get recent horror movie releases with posters"""
+    """Get recent horror movie releases with posters (?limit=N, default 10)"""
     if not TMDB_API_KEY:
         return jsonify({"releases": []})
     
-    try:
-        today = datetime.datetime.now()
-        three_months_ago = today - datetime.timedelta(days=90)
-        
-        url = f"https://api.themoviedb.org/3/discover/movie"
-        params = {
-            "api_key": TMDB_API_KEY,
-            "with_genres": "27",
-            "primary_release_date.gte": three_months_ago.strftime("%Y-%m-%d"),
-            "primary_release_date.lte": today.strftime("%Y-%m-%d"),
-            "sort_by": "primary_release_date.desc",
-            "page": 1
-        }
-        
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        releases = []
-        for movie in data.get("results", [])[:10]:
-            releases.append({
-                "title": movie.get("title"),
-                "release_date": movie.get("release_date"),
-                "poster_path": movie.get("poster_path"),
-                "overview": movie.get("overview", "")[:150] + "..."
-            })
-        
-        return jsonify({"releases": releases})
-        
-    except Exception as e:
-        print(f"Error getting recent releases: {e}")
-        return jsonify({"releases": []})
+    return release_feed_response(recent_feed)
 
 @app.route("/random-genre/<genre>", methods=["GET"])
 def random_genre(genre):
     """Get a random movie from a specific horror genre"""
     try:
-        genre_movies = {
-            "slashers": [
-                "Halloween", "Friday the 13th", "A Nightmare on Elm Street", "Scream",
-                "Child's Play", "Texas Chainsaw Massacre", "Candyman", "I Know What You Did Last Summer",
-                "Black Christmas", "My Bloody Valentine", "Sleepaway Camp", "The Burning"
-            ],
-            "zombies": [
-                "Dawn of the Dead", "28 Days Later", "Train to Busan", "Shaun of the Dead",
-                "Night of the Living Dead", "World War Z", "Zombieland", "Return of the Living Dead",
-                "Day of the Dead", "28 Weeks Later", "Dead Snow", "Rec"
-            ],
-            "vampires": [
-                "Let the Right One In", "Interview with the Vampire", "30 Days of Night",
-                "Near Dark", "The Lost Boys", "Blade", "From Dusk Till Dawn",
-                "What We Do in the Shadows", "Nosferatu", "Bram Stoker's Dracula", "Fright Night"
-            ],
-            "gore-fests": [
-                "Evil Dead", "Dead Alive", "Terrifier", "Saw", "Hostel", "The Green Inferno",
-                "Tokyo Gore Police", "Machine Girl", "Braindead", "Bad Taste", "Dead Snow"
-            ],
-            "supernatural": [
-                "The Conjuring", "Insidious", "Sinister", "The Babadook", "Hereditary",
-                "The Exorcist", "Poltergeist", "The Ring", "The Grudge", "Paranormal Activity"
-            ],
-            "demons": [
-                "The Exorcist", "Hellraiser", "Evil Dead", "The Conjuring", "Insidious",
-                "Sinister", "Drag Me to Hell", "The Possession", "Demons", "Night of the Demons"
-            ],
-            "psycho-killers": [
-                "Psycho", "The Silence of the Lambs", "American Psycho", "Henry: Portrait of a Serial Killer",
-                "Maniac", "The Strangers", "You're Next", "The Purge", "Funny Games"
-            ],
-            "alien-horror": [
-                "Alien", "The Thing", "Invasion of the Body Snatchers", "They Live",
-                "Event Horizon", "Life", "The Faculty", "Attack the Block", "Color Out of Space"
-            ],
-            "creature-features": [
-                "The Descent", "Tremors", "Jeepers Creepers", "Dog Soldiers", "The Ritual",
-                "Crawl", "Alligator", "Jaws", "The Host", "Cloverfield", "A Quiet Place"
-            ],
-            "haunted-houses": [
-                "The Haunting", "House on Haunted Hill", "The Amityville Horror", "Poltergeist",
-                "The Changeling", "Hell House LLC", "Sinister", "Insidious", "The Conjuring"
-            ],
-            "psychological": [
-                "The Babadook", "Black Swan", "Shutter Island", "The Others", "Rosemary's Baby",
-                "Don't Look Now", "The Machinist", "Jacob's Ladder", "Mulholland Drive"
-            ],
-            "cult-horror": [
-                "The Wicker Man", "Rosemary's Baby", "Midsommar", "The Witch", "Apostle",
-                "Kill List", "Red State", "Martha Marcy May Marlene", "The Invitation"
-            ]
-        }
-        
-        movies = genre_movies.get(genre.lower(), [])
-        
-        if not movies:
+        genre_key = genre.lower()
+        if genre_key not in GENRE_MOVIES:
             return jsonify({"error": f"Genre '{genre}' not found"}), 404
         
-        import random
-        selected_movie = random.choice(movies)
-        
-        movie_details = get_movie_details_from_apis(selected_movie)
-        recommendations = []
-        
-        if movie_details and movie_details.get("title"):
-            recommendations = get_movie_recommendations(movie_details["title"])
-        
-        genre_responses = {
-            "slashers": f"SLASHER PICK: {selected_movie}! Classic masked killer mayhem with plenty of creative kills.",
-            "zombies": f"ZOMBIE PICK: {selected_movie}! Brain-munching undead action at its finest.",
-            "vampires": f"VAMPIRE PICK: {selected_movie}! Bloodsucking terror from the children of the night.",
-            "gore-fests": f"GORE FEST: {selected_movie}! Prepare for gallons of blood and extreme violence.",
-            "supernatural": f"SUPERNATURAL: {selected_movie}! Ghostly encounters and paranormal terror.",
-            "demons": f"DEMONIC: {selected_movie}! Hell's minions bring pure evil to Earth.",
-            "psycho-killers": f"PSYCHO KILLER: {selected_movie}! Human monsters are the scariest of all.",
-            "alien-horror": f"ALIEN HORROR: {selected_movie}! Terror from beyond the stars.",
-            "creature-features": f"CREATURE FEATURE: {selected_movie}! Monsters, beasts, and things that go bump.",
-            "haunted-houses": f"HAUNTED HOUSE: {selected_movie}! Spooky dwellings with dark secrets.",
-            "psychological": f"PSYCHOLOGICAL: {selected_movie}! Mind-bending terror that gets under your skin.",
-            "cult-horror": f"CULT HORROR: {selected_movie}! Religious fanatics and occult nightmares."
-        }
+        picked = genre_pools.pick(genre_key)
+        if picked:
+            selected_movie, entry = picked
+            movie_details = entry["details"]
+            recommendations = entry["recommendations"]
+        else:
+            # Pool still warming up - fetch this one inline (and keep it for next time)
+            selected_movie = random.choice(GENRE_MOVIES[genre_key])
+            entry = genre_pools.hydrate(selected_movie)
+            movie_details = entry["details"] or empty_movie_details(selected_movie)
+            recommendations = entry["recommendations"]
         
-        response_text = genre_responses.get(genre.lower(), f"Horror pick: {selected_movie}!")
+        response_text = GENRE_RESPONSES.get(genre_key, "Horror pick: {title}!").format(title=selected_movie)
         
         return jsonify({
             "response": response_text,
@@ -1079,17 +2820,15 @@ def get_trailer():
         if not movie_title or not TMDB_API_KEY:
             return jsonify({"error": "Missing title or TMDB API key"}), 400
         
-        search_url = f"https://api.themoviedb.org/3/search/movie?api_key={TMDB_API_KEY}&query={quote(movie_title)}"
-        search_response = requests.get(search_url)
-        search_data = search_response.json()
+        tmdb_movie = resolve_tmdb_movie(movie_title)
         
-        if not search_data.get("results"):
+        if not tmdb_movie:
             return jsonify({"error": "Movie not found"}), 404
         
-        movie_id = search_data["results"][0]["id"]
+        movie_id = tmdb_movie["id"]
         
         videos_url = f"https://api.themoviedb.org/3/movie/{movie_id}/videos?api_key={TMDB_API_KEY}"
-        videos_response = requests.get(videos_url)
+        videos_response = request_upstream_get(videos_url)
         videos_data = videos_response.json()
         
         for video in videos_data.get("results", []):
@@ -1105,31 +2844,135 @@ def get_trailer():
 
 @app.route("/quiz")
 def quiz():
+    """Serve a shuffled pre-generated question set; cold titles are generated in the background"""
     movie = request.args.get("movie", "unknown")
-    prompt = f"""
-    Write 10 multiple-choice trivia questions about the horror movie '{movie}'.
-    Format as JSON:
-    [
-      {{ "question": "Question text", "options": ["A","B","C","D"], "answer": "A" }},
-      ...
-    ]
-    """
     
-    if client:
-        try:
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=800
-            )
-            import json
-            data = json.loads(resp.choices[0].message.content)
-        except Exception:
-            data = {"error": "format error"}
-    else:
-        data = {"error": "OpenAI API not configured"}
+    try:
+        sets = quiz_bank.quiz_sets(get_quiz_db(), movie)
+    except Exception as e:
+        print(f"Quiz bank error: {e}")
+        sets = []
+    
+    # Keep a few sets per title so repeat players don't see the same quiz
+    refilling = schedule_quiz_refill(movie, quiz_bank.SETS_PER_TITLE - len(sets))
+    
+    if sets:
+        quiz_counters["served"] += 1
+        questions = quiz_bank.shuffled_quiz(random.choice(sets))
+        return jsonify({"movie": movie, "questions": questions, "status": "ready"})
+    
+    # Nothing stored yet - the frontend falls back to its local questions
+    quiz_counters["cold"] += 1
+    status = "generating" if refilling else "unavailable"
+    return jsonify({"movie": movie, "questions": [], "status": status})
+
+@app.route("/get-movie-reviews", methods=["GET"])
+def get_movie_reviews():
+    """Page through a movie's reviews, newest first (?cursor=<next_cursor>&limit=N)"""
+    movie_title = request.args.get("movie_title", "")
+    if not movie_title:
+        return jsonify({"error": "Movie title required"}), 400
+    
+    cursor = request.args.get("cursor", type=int)
+    limit = max(1, min(request.args.get("limit", REVIEW_PAGE_SIZE, type=int), 100))
+    reviews, next_cursor = list_reviews(movie_title, cursor, limit)
+    return jsonify({"reviews": [public_review(review) for review in reviews], "next_cursor": next_cursor})
+
+# ----- ADMIN (moderation) -----
+
+def admin_session_value():
+    """Cookie value for a logged-in admin - derived from ADMIN_TOKEN, so the token itself never sits in a cookie"""
+    return hmac.new(ADMIN_TOKEN.encode("utf-8"), b"horror-oracle-admin-session", hashlib.sha256).hexdigest()
+
+def is_admin_request():
+    """True if the request carries ADMIN_TOKEN (X-Admin-Token header) or an admin session cookie"""
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get("X-Admin-Token")
+    if token:
+        return hmac.compare_digest(token, ADMIN_TOKEN)
+    return hmac.compare_digest(request.cookies.get("admin_session") or "", admin_session_value())
+
+@app.route("/admin/check", methods=["GET"])
+def admin_check():
+    return jsonify({"is_admin": is_admin_request()})
+
+@app.route("/admin/login", methods=["POST"])
+def admin_login():
+    """Exchange ADMIN_TOKEN for an HttpOnly session cookie (what admin.html authenticates with)"""
+    token = str((request.get_json(silent=True) or {}).get("token") or "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({"error": "Invalid admin token"}), 403
+    
+    response = jsonify({"is_admin": True})
+    response.set_cookie("admin_session", admin_session_value(), max_age=ADMIN_SESSION_MAX_AGE, path="/admin",
+                        httponly=True, samesite="Strict", secure=request.is_secure)
+    return response
+
+@app.route("/admin/logout", methods=["POST"])
+def admin_logout():
+    response = jsonify({"is_admin": False})
+    response.delete_cookie("admin_session", path="/admin", httponly=True, samesite="Strict", secure=request.is_secure)
+    return response
+
+@app.route("/admin/stats", methods=["GET"])
+def admin_stats():
+    """Totals for the admin dashboard"""
+    if not is_admin_request():
+        return jsonify({"error": "Admin access required"}), 403
+    
+    conn = get_user_db()
+    return jsonify({
+        "total_users": conn.execute('SELECT COUNT(*) FROM users').fetchone()[0],
+        "total_ratings": conn.execute('SELECT COALESCE(SUM(count), 0) FROM rating_aggregates').fetchone()[0],
+        "total_reviews": conn.execute('SELECT COUNT(*) FROM reviews').fetchone()[0]
+    })
+
+@app.route("/admin/reviews", methods=["GET"])
+def admin_reviews():
+    """Newest reviews across all movies, cursor-paginated like /get-movie-reviews"""
+    if not is_admin_request():
+        return jsonify({"error": "Admin access required"}), 403
+    
+    cursor = request.args.get("cursor", type=int)
+    limit = max(1, min(request.args.get("limit", 50, type=int), 200))
+    reviews, next_cursor = list_reviews(request.args.get("movie_title"), cursor, limit)
+    return jsonify({"reviews": reviews, "next_cursor": next_cursor})
+
+@app.route("/admin/reviews/delete/<int:review_id>", methods=["DELETE"])
+def admin_delete_review(review_id):
+    if not is_admin_request():
+        return jsonify({"error": "Admin access required"}), 403
     
-    return jsonify({"movie": movie, "questions": data})
+    if not delete_review(review_id):
+        return jsonify({"success": False, "error": "Review not found"}), 404
+    print(f"🗑️ Review {review_id} deleted by admin")
+    return jsonify({"success": True})
+
+@app.route("/upstream-stats", methods=["GET"])
+def upstream_stats():
+    """Per-host latency/error counters and circuit breaker states for TMDB/OMDB"""
+    return jsonify(upstream.stats())
+
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss counters for the movie details cache and request coalescing"""
+    return jsonify({
+        "movie_details": details_cache.stats(),
+        "tmdb_ids": tmdb_id_cache.stats(),
+        "responses": response_cache.stats(),
+        "recent_reviews": recent_reviews.stats(),
+        "genre_pools": genre_pools.stats(),
+        "release_feeds": {feed.name: feed.stats() for feed in (theater_feed, recent_feed)},
+        "quiz_bank": dict(quiz_counters, refills_in_flight=len(quiz_refills)),
+        "overnight": {
+            "movies": len(overnight_cache["store"]) if overnight_cache["store"] is not None else 0,
+            "generation": overnight_cache["store"].generation if overnight_cache["store"] is not None else None,
+            "hits": overnight_cache["hits"],
+            "misses": overnight_cache["misses"]
+        },
+        "single_flight": upstream_flight.stats()
+    })
 
 if __name__ == "__main__":
     print("\n" + "="*50)
@@ -1138,8 +2981,25 @@ if __name__ == "__main__":
     print(f"📊 Server running on http://localhost:5000")
     print(f"🎬 OMDB API: {'CONNECTED' if OMDB_API_KEY else 'MISSING - Limited functionality'}")
     print(f"🎥 TMDB API: {'CONNECTED' if TMDB_API_KEY else 'MISSING - No posters/recommendations'}")
-    print(f"🧠 OpenAI: {'CONNECTED' if OPENAI_API_KEY else 'MISSING - Using fallback responses'}")
+    print(f"🧠 OpenAI: {'FAKE (offline)' if isinstance(client, FakeOpenAI) else 'CONNECTED' if OPENAI_API_KEY else 'MISSING - Using fallback responses'}")
     print(f"📦 Pinecone: {'CONNECTED' if index else 'DISCONNECTED'}")
+    print(f"🔎 Title index: {'READY' if TITLE_INDEX_READY else 'NOT BUILT - run import_tmdb.py'}")
+    print(f"🧭 Semantic search: {'PINECONE' if index else 'LOCAL INDEX' if semantic_index() is not None else 'NOT BUILT - run semantic-index-builder.py'}")
+    print(f"🎃 Horror subset: {'READY' if HORROR_TABLE_READY else 'NOT BUILT - run import_tmdb.py --horror-subset'}")
+    refresh_recommendation_graph()
+    print(f"🕸️ Recommendation graph: {len(rec_graph['by_id'])} movies" if rec_graph["by_id"] else "🕸️ Recommendation graph: NOT BUILT - live TMDB only")
+    refresh_overnight_cache()
+    print(f"🌙 Overnight cache: {len(overnight_cache['store'])} movies" if overnight_cache["store"] is not None else "🌙 Overnight cache: NOT BUILT - run overnight-cache-builder.py")
+    quiz_titles = len(quiz_bank.set_counts(get_quiz_db()))
+    print(f"🧩 Quiz bank: {quiz_titles} titles" if quiz_titles else "🧩 Quiz bank: EMPTY - run quiz-bank-builder.py (cold titles fill in the background)")
+    print(f"⚡ Details cache: {DETAILS_CACHE_FILE} (LRU {DETAILS_CACHE_SIZE}, TTL {DETAILS_CACHE_TTL // 3600}h)")
     print("="*50 + "\n")
     
+    # Turn SIGTERM into a normal exit so atexit handlers (genre click flush) run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    # The debug reloader runs this file twice; only the serving child starts background work
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_workers()
+    
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
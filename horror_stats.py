@@ -0,0 +1,155 @@
+"""
+Horror stats engine
+Stable gore / fear / kills scores per title, computed offline by
+horror-stats-builder.py into horror_stats.db and looked up by /get-movie-stats.
+
+Scores come from the cached movie metadata (genres, plot keywords), the
+horror subset's TMDB genre flags and the community rating aggregates, plus
+a small per-title offset hashed from the title key, so two similar movies
+don't get identical bars. Nothing is random: the same inputs always give
+the same numbers, and titles with no inputs at all still get a fixed score.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+
+from title_index import normalize_title_key
+
+HORROR_STATS_FILE = os.getenv("HORROR_STATS_FILE", "horror_stats.db")
+
+# Starting point for any horror movie
+BASE_GORE = 40
+BASE_FEAR = 6.0
+BASE_KILLS = 4
+
+# TMDB genre id -> (gore, fear, kills) adjustment
+GENRE_WEIGHTS = {
+    53: (0, 0.5, 2),       # Thriller
+    9648: (-5, 0.5, 0),    # Mystery
+    878: (5, 0.0, 2),      # Science Fiction
+    35: (5, -1.5, 1),      # Comedy
+    28: (10, -0.5, 5),     # Action
+    80: (5, 0.0, 3),       # Crime
+    18: (-5, 0.3, -1),     # Drama
+    10749: (-10, -1.0, -1),  # Romance
+    10752: (10, 0.0, 6),   # War
+    16: (-25, -2.0, -2),   # Animation
+    10751: (-30, -2.5, -3),  # Family
+    99: (-20, -2.0, -3),   # Documentary
+}
+
+# Genre names as they appear in OMDB/TMDB "genres" strings
+GENRE_IDS = {
+    "thriller": 53, "mystery": 9648, "sci-fi": 878, "science fiction": 878,
+    "comedy": 35, "action": 28, "crime": 80, "drama": 18, "romance": 10749,
+    "war": 10752, "animation": 16, "family": 10751, "documentary": 99,
+}
+
+# Plot keywords (matched as word prefixes) and what each hit adds
+GORE_TERMS = ["gore", "blood", "gruesome", "massacre", "chainsaw", "dismember", "butcher", "cannibal",
+              "torture", "mutilat", "splatter", "zombie", "flesh", "carnage", "brutal", "slaughter"]
+FEAR_TERMS = ["haunt", "possess", "demon", "ghost", "curse", "terror", "nightmare", "supernatural",
+              "entity", "exorcis", "paranormal", "spirit", "dread", "witch", "sinister", "unseen"]
+KILL_TERMS = ["killer", "murder", "slasher", "serial", "massacre", "kills", "victims", "picks off",
+              "stalk", "hunted", "rampage", "body count", "one by one"]
+GORE_PER_HIT, GORE_KEYWORD_CAP = 8, 40
+FEAR_PER_HIT, FEAR_KEYWORD_CAP = 0.4, 2.5
+KILLS_PER_HIT, KILLS_KEYWORD_CAP = 3, 15
+
+# Community ratings (1-5) nudge fear; full weight at this many ratings
+RATING_FULL_WEIGHT = 20
+
+
+def open_stats_db(path=HORROR_STATS_FILE):
+    """Open (and create if needed) the stats table"""
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS horror_stats (
+            title_key TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            gore INTEGER NOT NULL,
+            fear REAL NOT NULL,
+            kills INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    return conn
+
+
+def keyword_hits(text, terms):
+    """Number of distinct terms that start a word in the text"""
+    text = " " + text.lower()
+    return sum(1 for term in terms if " " + term in text)
+
+
+def title_offset(title_key, salt, spread):
+    """Fixed offset in [-spread, spread] derived from the title key"""
+    digest = hashlib.sha1(f"{salt}:{title_key}".encode("utf-8")).digest()
+    return (int.from_bytes(digest[:4], "little") / 0xFFFFFFFF * 2 - 1) * spread
+
+
+def genre_ids_from_details(details):
+    names = [name.strip().lower() for name in (details.get("genres") or "").split(",")]
+    return {GENRE_IDS[name] for name in names if name in GENRE_IDS}
+
+
+def compute_stats(title, details=None, genre_ids=None, rating=None):
+    """{"gore", "fear", "kills"} for a title.
+
+    details:   cached movie details (genres string, plot), optional
+    genre_ids: TMDB genre ids, e.g. from the horror subset's genre flags, optional
+    rating:    community {"average", "count"}, optional"""
+    key = normalize_title_key(title)
+    gore, fear, kills = float(BASE_GORE), BASE_FEAR, float(BASE_KILLS)
+
+    ids = set(genre_ids or ())
+    if details:
+        ids |= genre_ids_from_details(details)
+    for genre_id in ids:
+        d_gore, d_fear, d_kills = GENRE_WEIGHTS.get(genre_id, (0, 0.0, 0))
+        gore += d_gore
+        fear += d_fear
+        kills += d_kills
+
+    plot = (details or {}).get("plot") or ""
+    if plot and plot != "N/A":
+        gore += min(GORE_KEYWORD_CAP, keyword_hits(plot, GORE_TERMS) * GORE_PER_HIT)
+        fear += min(FEAR_KEYWORD_CAP, keyword_hits(plot, FEAR_TERMS) * FEAR_PER_HIT)
+        kills += min(KILLS_KEYWORD_CAP, keyword_hits(plot, KILL_TERMS) * KILLS_PER_HIT)
+
+    if rating and rating.get("count"):
+        weight = min(rating["count"], RATING_FULL_WEIGHT) / RATING_FULL_WEIGHT
+        fear += (rating["average"] - 3) * 0.5 * weight
+
+    gore += title_offset(key, "gore", 6)
+    fear += title_offset(key, "fear", 0.4)
+    kills += title_offset(key, "kills", 2)
+
+    return {
+        "gore": int(round(min(100, max(5, gore)))),
+        "fear": round(min(10.0, max(1.0, fear)), 1),
+        "kills": int(round(min(30, max(0, kills))))
+    }
+
+
+def save_stats(conn, rows):
+    """Replace stats rows: (title, stats dict, source) tuples"""
+    now = time.time()
+    conn.executemany(
+        'INSERT OR REPLACE INTO horror_stats (title_key, title, gore, fear, kills, source, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(normalize_title_key(title), title, stats["gore"], stats["fear"], stats["kills"], source, now)
+         for title, stats, source in rows]
+    )
+    conn.commit()
+
+
+def lookup_stats(conn, title):
+    """Stored stats for a title, or None"""
+    row = conn.execute(
+        'SELECT gore, fear, kills FROM horror_stats WHERE title_key = ?', (normalize_title_key(title),)
+    ).fetchone()
+    return {"gore": row[0], "fear": row[1], "kills": row[2]} if row else None
@@ -1,51 +1,83 @@
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import gzip
 import json
+import time
 import sqlite3
+import argparse
+import datetime
 from tqdm import tqdm
 
-print("🩸 HORROR ORACLE - TMDB IMPORT SCRIPT 🩸")
-print("=" * 50)
-
-# Create database
-print("\n📦 Creating database...")
-conn = sqlite3.connect('horror_movies.db')
-cursor = conn.cursor()
-
-# Create table
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS movies (
-        id INTEGER PRIMARY KEY,
-        title TEXT NOT NULL,
-        original_title TEXT,
-        adult INTEGER DEFAULT 0,
-        popularity REAL,
-        video INTEGER DEFAULT 0
-    )
-''')
-
-cursor.execute('CREATE INDEX IF NOT EXISTS idx_title ON movies(title)')
-cursor.execute('CREATE INDEX IF NOT EXISTS idx_original_title ON movies(original_title)')
-
-print("✅ Database created!")
-
-# Read and import JSON
-print("\n📂 Reading TMDB export file...")
-print("⚠️  This will take 5-10 minutes...")
-
-try:
-    with open('movie_ids_10_18_2025.json', 'r', encoding='utf-8') as f:
+import upstream_client as upstream
+from title_index import build_title_index, create_title_indexes, has_title_index, create_horror_table, horror_row_from_tmdb, upsert_horror_movies, HORROR_TABLE
+
+TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+HORROR_GENRE_ID = 27
+HORROR_FIRST_YEAR = 1895
+TMDB_RATE = float(os.getenv("TMDB_RATE", "35"))
+
+EXPORT_FILE = 'movie_ids_10_18_2025.json'
+
+# Streaming mode (--stream): rows per transaction; the resume checkpoint commits with each one
+STREAM_CHUNK_LINES = 250000
+
+# B-tree indexes dropped during a streaming load and rebuilt afterwards
+SECONDARY_INDEXES = ['idx_title_nocase', 'idx_original_title_nocase']
+
+# Only touch rows that are new or whose title/popularity moved since the last export
+UPSERT_SQL = '''
+    INSERT INTO movies (id, title, original_title, adult, popularity, video)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title,
+        original_title = excluded.original_title,
+        adult = excluded.adult,
+        popularity = excluded.popularity,
+        video = excluded.video
+    WHERE movies.title IS NOT excluded.title OR movies.popularity IS NOT excluded.popularity
+'''
+
+
+def create_schema(cursor):
+    """Create the movies table (its title indexes come with build_title_index)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movies (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            original_title TEXT,
+            adult INTEGER DEFAULT 0,
+            popularity REAL,
+            video INTEGER DEFAULT 0
+        )
+    ''')
+
+    # Title lookups compare with COLLATE NOCASE, so only the NOCASE indexes are used;
+    # the old BINARY ones just doubled the index maintenance on every import
+    cursor.execute('DROP INDEX IF EXISTS idx_title')
+    cursor.execute('DROP INDEX IF EXISTS idx_original_title')
+
+
+def import_export(conn, cursor):
+    """Load every movie in the TMDB export file into the movies table"""
+    print("\n📂 Reading TMDB export file...")
+    print("⚠️  This will take 5-10 minutes...")
+
+    with open(EXPORT_FILE, 'r', encoding='utf-8') as f:
         total_movies = 0
         imported_movies = 0
         batch = []
         batch_size = 1000
-        
+
         for line_num, line in enumerate(f, 1):
             if line_num % 100000 == 0:
                 print(f"📊 Processed {line_num:,} lines... ({imported_movies:,} movies imported)")
-            
+
             try:
                 movie = json.loads(line.strip())
                 total_movies += 1
-                
+
                 # Import ALL movies (we'll filter later in the app)
                 batch.append((
                     movie.get('id'),
@@ -55,53 +87,308 @@ try:
                     movie.get('popularity', 0.0),
                     movie.get('video', 0)
                 ))
-                
+
                 # Insert in batches for speed
                 if len(batch) >= batch_size:
                     cursor.executemany('''
-                        INSERT OR REPLACE INTO movies 
+                        INSERT OR REPLACE INTO movies
                         (id, title, original_title, adult, popularity, video)
                         VALUES (?, ?, ?, ?, ?, ?)
                     ''', batch)
                     conn.commit()
                     imported_movies += len(batch)
                     batch = []
-                    
+
             except json.JSONDecodeError:
                 continue
-        
+
         # Insert remaining batch
         if batch:
             cursor.executemany('''
-                INSERT OR REPLACE INTO movies 
+                INSERT OR REPLACE INTO movies
                 (id, title, original_title, adult, popularity, video)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', batch)
             conn.commit()
             imported_movies += len(batch)
-        
+
         print(f"\n✅ IMPORT COMPLETE!")
         print(f"📊 Total lines processed: {total_movies:,}")
         print(f"🎬 Movies imported: {imported_movies:,}")
-        
+
+
+def open_export(path):
+    """Open a TMDB daily export as text, decompressing .gz on the fly"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def create_checkpoint_table(conn):
+    """Streaming import progress per export file.
+    indexed is 0 while rows this export changed are missing from the title index."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_checkpoint (
+            export_file TEXT PRIMARY KEY,
+            lines_done INTEGER NOT NULL,
+            rows_changed INTEGER NOT NULL,
+            finished INTEGER NOT NULL DEFAULT 0,
+            indexed INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(import_checkpoint)')}
+    if 'indexed' not in columns:
+        # Older checkpoints rebuilt the index in the same run that finished them
+        conn.execute('ALTER TABLE import_checkpoint ADD COLUMN indexed INTEGER NOT NULL DEFAULT 0')
+        conn.execute('UPDATE import_checkpoint SET indexed = finished')
+        conn.commit()
+
+
+def read_checkpoint(conn, export_name):
+    """(lines already imported, finished) for an export file"""
+    create_checkpoint_table(conn)
+    row = conn.execute('SELECT lines_done, finished FROM import_checkpoint WHERE export_file = ?', (export_name,)).fetchone()
+    return (row[0], bool(row[1])) if row else (0, False)
+
+
+def write_checkpoint(conn, export_name, lines_done, rows_changed, finished=False):
+    """Record progress - called inside the chunk's transaction so data and checkpoint commit together"""
+    conn.execute('''
+        INSERT INTO import_checkpoint (export_file, lines_done, rows_changed, finished, indexed, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(export_file) DO UPDATE SET
+            lines_done = excluded.lines_done,
+            rows_changed = import_checkpoint.rows_changed + excluded.rows_changed,
+            finished = excluded.finished,
+            indexed = import_checkpoint.indexed AND excluded.indexed,
+            updated_at = excluded.updated_at
+    ''', (export_name, lines_done, rows_changed, int(finished), int(rows_changed == 0), time.time()))
+
+
+def index_pending(conn):
+    """True if a finished stream import changed rows the title index hasn't seen yet"""
+    create_checkpoint_table(conn)
+    return conn.execute('SELECT 1 FROM import_checkpoint WHERE finished = 1 AND indexed = 0 LIMIT 1').fetchone() is not None
+
+
+def mark_indexed(conn):
+    """Record a title index rebuild - only after it committed, so a crash mid-build retries it"""
+    create_checkpoint_table(conn)
+    conn.execute('UPDATE import_checkpoint SET indexed = 1 WHERE finished = 1')
+    conn.commit()
+
+
+def stream_import(conn, path, restart=False):
+    """Stream a (gzipped) TMDB export into movies, upserting only changed rows.
+
+    Secondary indexes are dropped for the load and rebuilt once at the end,
+    and each STREAM_CHUNK_LINES chunk is one transaction that also records
+    the resume checkpoint. The title index is left to the caller (see
+    index_pending / mark_indexed).
+    """
+    export_name = os.path.basename(path)
+    lines_done, finished = read_checkpoint(conn, export_name)
+    if restart:
+        lines_done, finished = 0, False
+    if finished:
+        print(f"✅ {export_name} was already imported (use --restart to import it again)")
+        return
+
+    # Bulk-load tuning: no fsync per commit, big page cache, temp b-trees in memory
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute('PRAGMA cache_size=-262144')
+    conn.execute('PRAGMA temp_store=MEMORY')
+
+    print(f"\n📂 Streaming {export_name}" + (f" (resuming after line {lines_done:,})" if lines_done else "") + "...")
+    for index_name in SECONDARY_INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+    conn.isolation_level = None
+    rows_changed = 0
+    chunk_changed_from = conn.total_changes
+    line_num = 0
+    batch = []
+
+    with open_export(path) as f:
+        conn.execute('BEGIN')
+        for line_num, line in enumerate(tqdm(f, desc="Importing", unit=" lines"), 1):
+            if line_num <= lines_done:
+                continue
+
+            try:
+                movie = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not movie.get('id'):
+                continue
+
+            batch.append((
+                movie['id'],
+                movie.get('title') or '',
+                movie.get('original_title') or '',
+                int(movie.get('adult', 0)),
+                movie.get('popularity', 0.0),
+                int(movie.get('video', 0))
+            ))
+            if len(batch) >= 10000:
+                conn.executemany(UPSERT_SQL, batch)
+                batch = []
+
+            if line_num % STREAM_CHUNK_LINES == 0:
+                if batch:
+                    conn.executemany(UPSERT_SQL, batch)
+                    batch = []
+                chunk_changed = conn.total_changes - chunk_changed_from
+                rows_changed += chunk_changed
+                write_checkpoint(conn, export_name, line_num, chunk_changed)
+                conn.execute('COMMIT')
+                chunk_changed_from = conn.total_changes
+                conn.execute('BEGIN')
+
+        if batch:
+            conn.executemany(UPSERT_SQL, batch)
+        chunk_changed = conn.total_changes - chunk_changed_from
+        rows_changed += chunk_changed
+        write_checkpoint(conn, export_name, line_num, chunk_changed, finished=True)
+        conn.execute('COMMIT')
+
+    conn.isolation_level = ''
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+    print(f"\n✅ STREAMING IMPORT COMPLETE!")
+    print(f"📊 Total lines processed: {line_num:,}")
+    print(f"🎬 Rows inserted or changed: {rows_changed:,}")
+
+    # Deferred index builds - one sorted pass each instead of per-row maintenance
+    print("\n🗂️  Rebuilding indexes...")
+    create_title_indexes(conn.cursor())
+    conn.commit()
+
+
+def discover_horror_year(year):
+    """Every horror movie TMDB discover returns for one release year.
+    Slicing by year keeps each query under discover's 500-page cap."""
+    movies = []
+    page = 1
+    while True:
+        response = upstream.get("https://api.themoviedb.org/3/discover/movie", params={
+            "api_key": TMDB_API_KEY,
+            "with_genres": str(HORROR_GENRE_ID),
+            "primary_release_year": year,
+            "sort_by": "popularity.desc",
+            "include_adult": "false",
+            "page": page
+        }, retries=5)
+        data = response.json()
+        if "results" not in data:
+            raise Exception(data.get("status_message", "discover failed"))
+
+        movies.extend(data["results"])
+        if page >= min(data.get("total_pages", page), 500):
+            return movies
+        page += 1
+
+
+def build_horror_subset(conn):
+    """Post-import stage: enrich ids with TMDB genre data and materialize horror_movies"""
+    if not TMDB_API_KEY:
+        print("❌ TMDB_API_KEY is not set - can't fetch genre data")
+        return
+
+    print("\n🎃 Building horror_movies subset from TMDB discover...")
+    upstream.set_rate_limit("tmdb", TMDB_RATE)
+    create_horror_table(conn)
+
+    started = time.time()
+    failed_years = []
+    total = 0
+    for year in tqdm(range(HORROR_FIRST_YEAR, datetime.date.today().year + 2), desc="Years", unit=" year"):
+        try:
+            movies = discover_horror_year(year)
+        except Exception as e:
+            print(f"  ❌ {year}: {e}")
+            failed_years.append(year)
+            continue
+        upsert_horror_movies(conn, [horror_row_from_tmdb(movie, started) for movie in movies])
+        conn.commit()
+        total += len(movies)
+
+    # Movies that lost the horror genre since the last build - only safe to prune after a clean run
+    if not failed_years:
+        pruned = conn.execute(f'DELETE FROM {HORROR_TABLE} WHERE updated_at < ?', (started,)).rowcount
+        if pruned:
+            print(f"🧹 Removed {pruned:,} movies no longer tagged horror")
+    else:
+        print(f"⚠️  {len(failed_years)} years failed ({', '.join(map(str, failed_years[:10]))}...) - re-run to fill them in")
+
+    conn.execute(f'ANALYZE {HORROR_TABLE}')
+    conn.commit()
+    print(f"✅ horror_movies ready: {total:,} movies fetched")
+
+
+def main():
+    """Import the TMDB export, then build the title index"""
+    parser = argparse.ArgumentParser(description="Import the TMDB daily movie export into horror_movies.db")
+    parser.add_argument("--index-only", action="store_true", help="skip the import, just (re)build the title index")
+    parser.add_argument("--stream", metavar="EXPORT", help="stream a daily export (.json or .json.gz), upserting only changed rows; resumable")
+    parser.add_argument("--restart", action="store_true", help="ignore the --stream checkpoint and start from the first line")
+    parser.add_argument("--horror-subset", action="store_true", help="after importing, build the horror_movies table from TMDB discover")
+    args = parser.parse_args()
+
+    print("🩸 HORROR ORACLE - TMDB IMPORT SCRIPT 🩸")
+    print("=" * 50)
+
+    # Create database
+    print("\n📦 Creating database...")
+    conn = sqlite3.connect('horror_movies.db')
+    cursor = conn.cursor()
+    create_schema(cursor)
+    print("✅ Database created!")
+
+    export_file = args.stream or EXPORT_FILE
+    try:
+        if args.stream:
+            stream_import(conn, args.stream, restart=args.restart)
+        elif not args.index_only:
+            import_export(conn, cursor)
+
+        # Full-text title index used by horror.py's title resolver - the FTS rebuild
+        # rescans every row, so skip it when no stream import changed anything since the last one
+        if args.stream and not index_pending(conn) and has_title_index(conn):
+            print("\n⏭️  No rows changed - title search index is already up to date")
+        else:
+            print("\n🔎 Building title search index...")
+            build_title_index(conn)
+            mark_indexed(conn)
+            print("✅ Title index ready!")
+
+        if args.horror_subset:
+            build_horror_subset(conn)
+
         # Show some stats
         cursor.execute('SELECT COUNT(*) FROM movies')
         db_count = cursor.fetchone()[0]
         print(f"💾 Movies in database: {db_count:,}")
-        
+
         # Show sample
         print("\n🎬 Sample movies:")
         cursor.execute('SELECT title FROM movies ORDER BY popularity DESC LIMIT 5')
         for row in cursor.fetchall():
             print(f"  • {row[0]}")
-        
-except FileNotFoundError:
-    print("❌ ERROR: movie_ids_10_18_2025.json not found!")
-    print("Make sure the file is in the same folder as this script.")
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-finally:
-    conn.close()
-
-print("\n🩸 DONE! Your database is ready!")
-print("=" * 50)
+
+    except FileNotFoundError:
+        print(f"❌ ERROR: {export_file} not found!")
+        print("Make sure the file is in the same folder as this script.")
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+    finally:
+        conn.close()
+
+    print("\n🩸 DONE! Your database is ready!")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
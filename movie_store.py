@@ -0,0 +1,282 @@
+"""
+Append-only movie cache store
+Log-structured replacement for movie_cache.pkl, shared by
+overnight-cache-builder.py (writer) and horror.py (reader).
+
+Layout of the store directory:
+    MANIFEST              {"generation": N, "segments": [...], "retired": [[segment, time], ...]}
+                          - replaced atomically
+    segment-000001.jsonl  one JSON record per line: {"k": key, "v": value, "t": time}
+
+Writes append one line to the active segment, so a put is O(1) and a crash
+can at worst leave a torn last line, which is ignored on load. The writer
+calls publish() at checkpoints, which bumps the MANIFEST generation; readers
+notice the new generation and index just the bytes appended since their
+last look. Compaction rewrites the live records into a fresh segment and
+publishes it; the old segments are only retired, and deleted RETIRE_GRACE
+seconds later, so readers still holding offsets into them keep working
+until they reload. Readers keep an in-memory key -> (segment, offset) index
+and read values lazily, so nothing is ever unpickled.
+"""
+
+import os
+import json
+import time
+import threading
+
+MOVIE_STORE_DIR = os.getenv("MOVIE_STORE_DIR", "movie_cache")
+MANIFEST_FILE = "MANIFEST"
+SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+RETIRE_GRACE = 600  # seconds a compacted-away segment stays on disk for readers that haven't reloaded
+
+
+def _segment_name(number):
+    return f"segment-{number:06d}.jsonl"
+
+
+def _segment_number(name):
+    return int(name.split("-")[1].split(".")[0])
+
+
+class MovieStore:
+    """Append-only key/value store of movie records with an O(1) in-memory index"""
+
+    def __init__(self, path=MOVIE_STORE_DIR, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.lock = threading.RLock()
+        self.index = {}
+        self.records = 0
+        self.generation = 0
+        self.segments = []
+        self.retired = []
+        self.indexed = {}  # segment -> offset just past the last complete record indexed
+        self.active = None
+
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # ----- manifest -----
+
+    def _manifest_path(self):
+        return os.path.join(self.path, MANIFEST_FILE)
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path(), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"generation": 0, "segments": [], "retired": []}
+
+    def _write_manifest(self):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"generation": self.generation, "segments": self.segments, "retired": self.retired}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._manifest_path())
+
+    def _remove_retired(self):
+        """Delete retired segments whose grace period is over (writer only)"""
+        now = time.time()
+        keep = []
+        for segment, retired_at in self.retired:
+            if now - retired_at < RETIRE_GRACE:
+                keep.append([segment, retired_at])
+                continue
+            try:
+                os.remove(os.path.join(self.path, segment))
+            except OSError:
+                pass
+        self.retired = keep
+
+    # ----- loading -----
+
+    def _load(self, manifest=None):
+        manifest = manifest or self._read_manifest()
+        index = {}
+        indexed = {}
+        records = 0
+        for segment in manifest["segments"]:
+            count, indexed[segment] = self._index_segment(segment, index)
+            records += count
+
+        self.index = index
+        self.indexed = indexed
+        self.records = records
+        self.generation = manifest["generation"]
+        self.segments = list(manifest["segments"])
+        self.retired = [list(item) for item in manifest.get("retired", [])]
+
+    def _index_segment(self, segment, index, start=0):
+        """Add the complete records from `start` on to the index (later records win).
+        Returns (record count, offset just past the last complete record)"""
+        segment_path = os.path.join(self.path, segment)
+        records = 0
+        try:
+            f = open(segment_path, "rb")
+        except OSError:
+            return 0, start
+        with f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn (or still being written) final line
+                try:
+                    record = json.loads(line)
+                    index[record["k"]] = (segment, offset)
+                    records += 1
+                except (ValueError, KeyError):
+                    pass
+                offset += len(line)
+
+        # A torn final line (crash mid-append) is cut off so the next append starts clean
+        if not self.read_only and offset != os.path.getsize(segment_path):
+            with open(segment_path, "r+b") as f:
+                f.truncate(offset)
+        return records, offset
+
+    def reload_if_changed(self):
+        """Catch up with the writer if it published a new generation. Returns True if anything changed.
+
+        Appends to segments we already know are indexed incrementally; after a
+        compaction (a segment we know disappeared) the index is rebuilt."""
+        manifest = self._read_manifest()
+        if manifest["generation"] == self.generation:
+            return False
+        with self.lock:
+            if not set(self.segments) <= set(manifest["segments"]):
+                self._load(manifest)
+                return True
+            for segment in manifest["segments"]:
+                count, self.indexed[segment] = self._index_segment(segment, self.index, self.indexed.get(segment, 0))
+                self.records += count
+            self.generation = manifest["generation"]
+            self.segments = list(manifest["segments"])
+            self.retired = [list(item) for item in manifest.get("retired", [])]
+        return True
+
+    # ----- reads -----
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def record_count(self):
+        """Records on disk, including ones superseded by later writes"""
+        return self.records
+
+    def keys(self):
+        return list(self.index.keys())
+
+    def get(self, key, default=None):
+        location = self.index.get(key)
+        if location is None:
+            return default
+        segment, offset = location
+        try:
+            with open(os.path.join(self.path, segment), "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())["v"]
+        except (OSError, ValueError, KeyError):
+            return default
+
+    def items(self):
+        for key in self.keys():
+            value = self.get(key)
+            if value is not None:
+                yield key, value
+
+    # ----- writes -----
+
+    def _open_active(self):
+        """Append to the last segment, or start a new one when it's full"""
+        if self.active is not None:
+            return
+        if not self.segments or os.path.getsize(os.path.join(self.path, self.segments[-1])) >= SEGMENT_MAX_BYTES:
+            number = _segment_number(self.segments[-1]) + 1 if self.segments else 1
+            self.segments.append(_segment_name(number))
+            self.generation += 1
+            open(os.path.join(self.path, self.segments[-1]), "ab").close()
+            self._write_manifest()
+        self.active = open(os.path.join(self.path, self.segments[-1]), "ab")
+
+    def put(self, key, value):
+        if self.read_only:
+            raise RuntimeError("MovieStore opened read-only")
+        line = (json.dumps({"k": key, "v": value, "t": time.time()}, separators=(",", ":")) + "\n").encode("utf-8")
+        with self.lock:
+            self._open_active()
+            offset = self.active.tell()
+            self.active.write(line)
+            self.active.flush()
+            self.index[key] = (self.segments[-1], offset)
+            self.records += 1
+            if offset + len(line) >= SEGMENT_MAX_BYTES:
+                self.active.close()
+                self.active = None
+
+    def sync(self):
+        """fsync the active segment (call at checkpoints, not on every put)"""
+        with self.lock:
+            if self.active is not None:
+                self.active.flush()
+                os.fsync(self.active.fileno())
+
+    def publish(self):
+        """Checkpoint: fsync and bump the MANIFEST generation so readers pick up new records"""
+        if self.read_only:
+            raise RuntimeError("MovieStore opened read-only")
+        with self.lock:
+            self.sync()
+            self.generation += 1
+            self._remove_retired()
+            self._write_manifest()
+
+    def compact(self):
+        """Rewrite live records into one new segment and publish it as a new generation"""
+        if self.read_only:
+            raise RuntimeError("MovieStore opened read-only")
+        with self.lock:
+            self.sync()
+            if self.active is not None:
+                self.active.close()
+                self.active = None
+
+            old_segments = list(self.segments)
+            number = _segment_number(old_segments[-1]) + 1 if old_segments else 1
+            new_segment = _segment_name(number)
+            new_index = {}
+
+            with open(os.path.join(self.path, new_segment), "wb") as f:
+                for key in list(self.index.keys()):
+                    value = self.get(key)
+                    if value is None:
+                        continue
+                    new_index[key] = (new_segment, f.tell())
+                    f.write((json.dumps({"k": key, "v": value, "t": time.time()}, separators=(",", ":")) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Publishing the manifest is the commit point; readers still see the old set until then,
+            # and the old segments stay on disk until they've had RETIRE_GRACE to reload
+            now = time.time()
+            self.segments = [new_segment]
+            self.retired.extend([segment, now] for segment in old_segments)
+            self.generation += 1
+            self._remove_retired()
+            self._write_manifest()
+            self.index = new_index
+            self.indexed = {new_segment: os.path.getsize(os.path.join(self.path, new_segment))}
+            self.records = len(new_index)
+
+    def close(self):
+        with self.lock:
+            if self.active is not None:
+                self.sync()
+                self.active.close()
+                self.active = None
@@ -9,40 +9,93 @@ load_dotenv()
 
 import os
 import json
-import requests
 import time
-import pickle
+import pickle  # only for migrating the old movie_cache.pkl
+import argparse
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import quote
 from datetime import datetime
 
+import upstream_client as upstream
+from movie_store import MovieStore, MOVIE_STORE_DIR
+
 # API Keys
 OMDB_API_KEY = os.getenv("OMDB_API_KEY")
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 
-# Cache storage
-CACHE_FILE = "movie_cache.pkl"
-movie_cache = {}
+# Provider quotas (requests per second) - the crawl runs as fast as these allow
+OMDB_RATE = float(os.getenv("OMDB_RATE", "10"))
+TMDB_RATE = float(os.getenv("TMDB_RATE", "35"))
+UPSTREAM_RETRIES = 5  # 429s back off and retry instead of failing the title
+
+# Cache storage - append-only store shared with horror.py (see movie_store.py)
+LEGACY_CACHE_FILE = "movie_cache.pkl"
+PROGRESS_FILE = "cache_builder_progress.json"
+COMPACT_RATIO = 1.5  # compact when the segments hold this many records per live movie
+movie_cache = MovieStore(MOVIE_STORE_DIR)
+cache_lock = threading.Lock()
+
+def migrate_legacy_cache():
+    """One-time import of the old pickle cache into the store"""
+    if not os.path.exists(LEGACY_CACHE_FILE):
+        return
+    with open(LEGACY_CACHE_FILE, 'rb') as f:
+        legacy = pickle.load(f)
+    for cache_key, movie_details in legacy.items():
+        if cache_key not in movie_cache:
+            movie_cache.put(cache_key, movie_details)
+    movie_cache.publish()
+    os.replace(LEGACY_CACHE_FILE, LEGACY_CACHE_FILE + ".migrated")
+    print(f"📦 Migrated {len(legacy)} movies from {LEGACY_CACHE_FILE}")
 
-# Load existing cache if it exists
-if os.path.exists(CACHE_FILE):
-    with open(CACHE_FILE, 'rb') as f:
-        movie_cache = pickle.load(f)
-        print(f"📦 Loaded existing cache with {len(movie_cache)} movies")
+migrate_legacy_cache()
+if len(movie_cache):
+    print(f"📦 Loaded existing cache with {len(movie_cache)} movies")
 
 def save_cache():
-    """Save cache to file"""
-    with open(CACHE_FILE, 'wb') as f:
-        pickle.dump(movie_cache, f)
+    """Checkpoint the store: fsync the records and publish a new generation so a running server sees them"""
+    movie_cache.publish()
     print(f"💾 Saved cache with {len(movie_cache)} movies")
 
+def compact_cache():
+    """Drop superseded records once the log has grown enough to be worth rewriting"""
+    records = movie_cache.record_count()
+    if records > len(movie_cache) * COMPACT_RATIO:
+        movie_cache.compact()
+        print(f"🗜️  Compacted cache: {records} records -> {len(movie_cache)}")
+
+def load_progress():
+    """Titles a previous run already gave up on (not found in either API)"""
+    try:
+        with open(PROGRESS_FILE, 'r') as f:
+            return set(json.load(f).get("not_found", []))
+    except (OSError, ValueError):
+        return set()
+
+def save_progress(not_found):
+    """Write progress atomically so an interrupted run can resume"""
+    tmp_file = PROGRESS_FILE + ".tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump({"not_found": sorted(not_found), "updated_at": datetime.now().isoformat()}, f)
+    os.replace(tmp_file, PROGRESS_FILE)
+
+def cache_movie(cache_key, movie_details):
+    """Thread-safe cache insert"""
+    with cache_lock:
+        movie_cache.put(cache_key, movie_details)
+
 def get_movie_details(title):
     """Get movie details from APIs"""
     cache_key = title.lower().strip()
     
     # Skip if already cached
-    if cache_key in movie_cache:
-        return "Already cached"
+    with cache_lock:
+        if cache_key in movie_cache:
+            return "Already cached"
     
+    failed = False
     movie_details = {
         "title": title,
         "year": None,
@@ -57,7 +110,7 @@ def get_movie_details(title):
     if OMDB_API_KEY:
         try:
             omdb_url = f"http://www.omdbapi.com/?t={quote(title)}&apikey={OMDB_API_KEY}"
-            omdb_response = requests.get(omdb_url, timeout=5)
+            omdb_response = upstream.get(omdb_url, retries=UPSTREAM_RETRIES)
             omdb_data = omdb_response.json()
             
             if omdb_data.get("Response") == "True":
@@ -70,16 +123,16 @@ def get_movie_details(title):
                 movie_details["genres"] = omdb_data.get("Genre", "Horror")
                 
                 # Cache it
-                movie_cache[cache_key] = movie_details
+                cache_movie(cache_key, movie_details)
                 return "Cached from OMDB"
         except Exception as e:
-            pass
+            failed = True
     
     # Try TMDB as fallback
     if TMDB_API_KEY:
         try:
             search_url = f"https://api.themoviedb.org/3/search/movie?api_key={TMDB_API_KEY}&query={quote(title)}"
-            search_response = requests.get(search_url, timeout=5)
+            search_response = upstream.get(search_url, retries=UPSTREAM_RETRIES)
             search_data = search_response.json()
             
             if search_data.get("results"):
@@ -87,7 +140,7 @@ def get_movie_details(title):
                 movie_id = movie["id"]
                 
                 detail_url = f"https://api.themoviedb.org/3/movie/{movie_id}?api_key={TMDB_API_KEY}&append_to_response=credits"
-                detail_response = requests.get(detail_url, timeout=5)
+                detail_response = upstream.get(detail_url, retries=UPSTREAM_RETRIES)
                 detail_data = detail_response.json()
                 
                 movie_details["title"] = detail_data.get("title", title)
@@ -98,12 +151,13 @@ def get_movie_details(title):
                 movie_details["genres"] = ", ".join([g["name"] for g in detail_data.get("genres", [])])
                 
                 # Cache it
-                movie_cache[cache_key] = movie_details
+                cache_movie(cache_key, movie_details)
                 return "Cached from TMDB"
         except Exception as e:
-            pass
+            failed = True
     
-    return "Not found"
+    # A network/quota failure isn't a real "not found" - leave it for the next run
+    return "Failed" if failed else "Not found"
 
 # Top horror movies to cache (add more!)
 HORROR_MOVIES = [
@@ -187,61 +241,111 @@ HORROR_MOVIES = [
     # Goal: Add enough to reach 500-1000 movies
 ]
 
+def load_titles(args):
+    """HORROR_MOVIES plus any extra titles from a file or the TMDB export database"""
+    titles = list(HORROR_MOVIES)
+    
+    if args.titles_file:
+        with open(args.titles_file, 'r', encoding='utf-8') as f:
+            titles.extend(line.strip() for line in f if line.strip())
+    
+    if args.from_db:
+        conn = sqlite3.connect(args.db)
+        try:
+            rows = conn.execute('SELECT title FROM movies ORDER BY popularity DESC LIMIT ?', (args.from_db,))
+            titles.extend(row[0] for row in rows if row[0])
+        finally:
+            conn.close()
+    
+    # De-duplicate on the cache key, keeping the first spelling
+    unique = {}
+    for title in titles:
+        unique.setdefault(title.lower().strip(), title)
+    return list(unique.values())
+
 def main():
     """Run the overnight cache builder"""
+    parser = argparse.ArgumentParser(description="Cache horror movie details from OMDB/TMDB")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent lookups (the rate limits are the real cap)")
+    parser.add_argument("--titles-file", help="extra titles, one per line")
+    parser.add_argument("--from-db", type=int, default=0, help="also crawl the N most popular titles in the TMDB export database")
+    parser.add_argument("--db", default="horror_movies.db", help="database used by --from-db")
+    parser.add_argument("--retry-missing", action="store_true", help="retry titles a previous run couldn't find")
+    args = parser.parse_args()
+    
+    upstream.set_rate_limit("omdb", OMDB_RATE)
+    upstream.set_rate_limit("tmdb", TMDB_RATE)
+    
+    titles = load_titles(args)
+    not_found = set() if args.retry_missing else load_progress()
+    with cache_lock:
+        already_cached = sum(1 for t in titles if t.lower().strip() in movie_cache)
+        todo = [t for t in titles if t.lower().strip() not in movie_cache and t.lower().strip() not in not_found]
+    known_missing = len(titles) - len(todo) - already_cached
+    
     print("🩸 DAVE'S SCREAMING OFFICIAL - OVERNIGHT CACHE BUILDER 🩸")
     print("="*50)
     print(f"Starting cache build at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Movies to cache: {len(HORROR_MOVIES)}")
-    print(f"Estimated time: {len(HORROR_MOVIES) * 2 / 60:.1f} minutes")
+    print(f"Movies to cache: {len(todo)} of {len(titles)} ({already_cached} cached, {known_missing} known missing)")
+    print(f"Workers: {args.workers} | OMDB {OMDB_RATE:g}/s | TMDB {TMDB_RATE:g}/s")
+    print(f"Estimated time: {len(todo) / OMDB_RATE / 60:.1f} minutes (bounded by the OMDB quota)")
     print("="*50)
     
     success_count = 0
-    already_cached = 0
-    not_found = 0
+    failed = 0
+    started = time.time()
     
-    for i, movie in enumerate(HORROR_MOVIES, 1):
-        print(f"\n[{i}/{len(HORROR_MOVIES)}] Processing: {movie}")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(get_movie_details, movie): movie for movie in todo}
         
-        result = get_movie_details(movie)
-        
-        if result == "Already cached":
-            print(f"  ✅ Already in cache")
-            already_cached += 1
-        elif result == "Not found":
-            print(f"  ❌ Not found in APIs")
-            not_found += 1
-        else:
-            print(f"  ✅ {result}")
-            success_count += 1
+        for i, future in enumerate(as_completed(futures), 1):
+            movie = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  ❌ {movie}: {e}")
+                result = "Failed"
             
-            # Save every 10 movies
-            if success_count % 10 == 0:
-                save_cache()
-        
-        # Rate limiting - adjust as needed
-        time.sleep(2)  # 2 seconds between requests
-        
-        # Progress update every 25 movies
-        if i % 25 == 0:
-            elapsed = i * 2 / 60
-            remaining = (len(HORROR_MOVIES) - i) * 2 / 60
-            print(f"\n📊 PROGRESS: {i}/{len(HORROR_MOVIES)} movies")
-            print(f"   Time elapsed: {elapsed:.1f} minutes")
-            print(f"   Time remaining: {remaining:.1f} minutes")
+            if result == "Not found":
+                print(f"  ❌ Not found in APIs: {movie}")
+                not_found.add(movie.lower().strip())
+            elif result == "Failed":
+                print(f"  ⚠️  Lookup failed, will retry next run: {movie}")
+                failed += 1
+            elif result != "Already cached":
+                print(f"  ✅ {movie}: {result}")
+                success_count += 1
+                
+                # Save every 10 movies
+                if success_count % 10 == 0:
+                    save_cache()
+                    save_progress(not_found)
+            
+            # Progress update every 25 movies
+            if i % 25 == 0:
+                elapsed = time.time() - started
+                rate = i / elapsed if elapsed else 0
+                remaining = (len(todo) - i) / rate if rate else 0
+                print(f"\n📊 PROGRESS: {i}/{len(todo)} movies ({rate:.1f}/s)")
+                print(f"   Time elapsed: {elapsed / 60:.1f} minutes")
+                print(f"   Time remaining: {remaining / 60:.1f} minutes")
     
     # Final save
     save_cache()
+    compact_cache()
+    movie_cache.close()
+    save_progress(not_found)
     
     # Summary
     print("\n" + "="*50)
     print("🎉 CACHE BUILD COMPLETE!")
     print(f"✅ Newly cached: {success_count}")
     print(f"📦 Already cached: {already_cached}")
-    print(f"❌ Not found: {not_found}")
+    print(f"❌ Not found: {len(not_found)}")
+    print(f"⚠️  Failed (will retry next run): {failed}")
     print(f"💾 Total in cache: {len(movie_cache)}")
     print(f"Finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,132 @@
+"""
+DAVE'S SCREAMING OFFICIAL LLM CHATBOT
+Quiz Bank Builder Script
+Pre-generates validated trivia sets for every movie in the overnight movie
+cache (see movie_store.py) and stores several per title in quiz_bank.db, so
+/quiz can serve them instantly (see quiz_bank.py). Titles that already have
+enough sets are skipped, so reruns only top up.
+
+    python quiz-bank-builder.py --limit 500
+    python quiz-bank-builder.py --titles-file titles.txt --sets 5
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from movie_store import MovieStore, MOVIE_STORE_DIR
+from quiz_bank import (QUIZ_BANK_FILE, SETS_PER_TITLE, open_quiz_bank, generate_quiz_set,
+                       add_quiz_set, set_counts)
+from title_index import normalize_title_key
+from fake_openai import FakeOpenAI
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+
+def open_chat_client(fake=False):
+    """OpenAI client, or the offline fake when OPENAI_FAKE=1 / --fake"""
+    if fake or os.getenv("OPENAI_FAKE") == "1":
+        return FakeOpenAI(chunk_delay=0)
+    if not OPENAI_API_KEY:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+def load_titles(args):
+    """Titles from the movie store (most recently cached last) plus any extra titles file"""
+    titles = []
+    if args.titles_file:
+        with open(args.titles_file, 'r', encoding='utf-8') as f:
+            titles.extend(line.strip() for line in f if line.strip())
+
+    store = MovieStore(MOVIE_STORE_DIR, read_only=True)
+    titles.extend(details["title"] for _, details in store.items() if details and details.get("title"))
+    store.close()
+
+    # De-duplicate on the quiz bank key, keeping the first spelling
+    unique = {}
+    for title in titles:
+        key = normalize_title_key(title)
+        if key:
+            unique.setdefault(key, title)
+    return list(unique.values())
+
+
+def main():
+    """Run the quiz bank builder"""
+    parser = argparse.ArgumentParser(description="Pre-generate trivia sets for /quiz")
+    parser.add_argument("--sets", type=int, default=SETS_PER_TITLE, help="question sets to keep per title")
+    parser.add_argument("--limit", type=int, default=0, help="only fill this many titles this run")
+    parser.add_argument("--titles-file", help="extra titles, one per line (filled first)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent generation requests")
+    parser.add_argument("--fake", action="store_true", help="offline fake questions (same as OPENAI_FAKE=1)")
+    args = parser.parse_args()
+
+    client = open_chat_client(args.fake)
+    if client is None:
+        print("❌ OPENAI_API_KEY is not set (or use --fake for offline questions)")
+        return
+
+    conn = open_quiz_bank(QUIZ_BANK_FILE)
+    write_lock = threading.Lock()
+    counts = set_counts(conn)
+    titles = load_titles(args)
+
+    # One job per missing set, so a title with 1 of 3 sets gets 2 more
+    jobs = []
+    todo = 0
+    for title in titles:
+        missing = args.sets - counts.get(normalize_title_key(title), 0)
+        if missing > 0:
+            todo += 1
+            jobs.extend([title] * missing)
+            if args.limit and todo >= args.limit:
+                break
+
+    print("🩸 DAVE'S SCREAMING OFFICIAL - QUIZ BANK BUILDER 🩸")
+    print("=" * 50)
+    print(f"Starting quiz bank build at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Titles to fill: {todo} of {len(titles)} | sets to generate: {len(jobs)} ({args.sets} per title)")
+    print(f"Bank: {QUIZ_BANK_FILE} | workers: {args.workers}")
+    print("=" * 50)
+
+    added = 0
+    failed = 0
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(generate_quiz_set, client, title): title for title in jobs}
+        for i, future in enumerate(as_completed(futures), 1):
+            title = futures[future]
+            questions = future.result()
+            if not questions:
+                print(f"  ❌ No valid set for {title} - will retry next run")
+                failed += 1
+                continue
+
+            with write_lock:
+                add_quiz_set(conn, title, questions)
+            added += 1
+            print(f"  ✅ {title}: {len(questions)} questions")
+
+            if i % 25 == 0:
+                elapsed = time.time() - started
+                print(f"📊 PROGRESS: {i}/{len(jobs)} sets ({i / elapsed:.1f}/s)")
+
+    conn.close()
+    print("\n" + "=" * 50)
+    print("🎉 QUIZ BANK BUILD COMPLETE!")
+    print(f"✅ Sets added: {added}")
+    print(f"❌ Failed (will retry next run): {failed}")
+    print(f"Finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Quiz bank
+Pre-generated, validated trivia sets per movie, stored in quiz_bank.db.
+quiz-bank-builder.py fills it offline; horror.py's /quiz serves a shuffled set
+straight from it and only generates (in the background) for titles it has
+never seen.
+
+Stored questions are normalized to {"question", "options": [4 strings], "answer_index"}.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import sqlite3
+
+from title_index import normalize_title_key
+
+QUIZ_BANK_FILE = os.getenv("QUIZ_BANK_FILE", "quiz_bank.db")
+QUIZ_MODEL = "gpt-4o-mini"
+SETS_PER_TITLE = 3
+QUESTIONS_PER_SET = 10
+MIN_VALID_QUESTIONS = 5
+MAX_ATTEMPTS = 3
+
+QUIZ_PROMPT = """Write {count} multiple-choice trivia questions about the horror movie '{movie}'.
+Every question has exactly 4 distinct options and exactly one correct answer.
+Respond with ONLY a JSON array, no prose and no code fences:
+[
+  {{"question": "Question text", "options": ["A", "B", "C", "D"], "answer": "A"}}
+]
+"answer" is the letter (A-D) of the correct option."""
+
+
+def open_quiz_bank(path=QUIZ_BANK_FILE):
+    """Open (and create if needed) the quiz bank"""
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA busy_timeout=10000')
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS quiz_sets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title_key TEXT NOT NULL,
+            movie TEXT NOT NULL,
+            questions TEXT NOT NULL,
+            model TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_quiz_sets_title_key ON quiz_sets(title_key);
+    ''')
+    return conn
+
+
+# ----- VALIDATION -----
+
+def extract_json_array(text):
+    """The JSON array in a model reply, tolerating code fences and surrounding prose"""
+    text = re.sub(r"```(?:json)?", "", text or "")
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, list) else None
+
+
+def normalize_question(item):
+    """One validated question, or None if it's malformed"""
+    if not isinstance(item, dict):
+        return None
+    question = str(item.get("question") or item.get("q") or "").strip()
+    options = item.get("options") or item.get("a")
+    if not question or not isinstance(options, list) or len(options) != 4:
+        return None
+    options = [str(option).strip() for option in options]
+    if not all(options) or len({option.lower() for option in options}) != 4:
+        return None
+
+    # The answer may be a letter, the option text, or an index
+    answer = item.get("answer", item.get("correct"))
+    answer_index = None
+    if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < 4:
+        answer_index = answer
+    elif isinstance(answer, str):
+        letter = answer.strip().upper().rstrip(").")
+        if len(letter) == 1 and letter in "ABCD":
+            answer_index = "ABCD".index(letter)
+        else:
+            matches = [i for i, option in enumerate(options) if option.lower() == answer.strip().lower()]
+            answer_index = matches[0] if matches else None
+    if answer_index is None:
+        return None
+
+    return {"question": question, "options": options, "answer_index": answer_index}
+
+
+def validate_questions(raw):
+    """Normalized questions from a parsed reply, or None if too few survived validation"""
+    if not isinstance(raw, list):
+        return None
+    questions, seen = [], set()
+    for item in raw:
+        question = normalize_question(item)
+        if question and question["question"].lower() not in seen:
+            seen.add(question["question"].lower())
+            questions.append(question)
+    return questions if len(questions) >= MIN_VALID_QUESTIONS else None
+
+
+# ----- GENERATION -----
+
+def generate_quiz_set(client, movie, count=QUESTIONS_PER_SET, model=QUIZ_MODEL):
+    """Ask the model for a question set, retrying until one validates. Returns questions or None"""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            resp = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": QUIZ_PROMPT.format(count=count, movie=movie)}],
+                max_tokens=1200,
+                temperature=0.8
+            )
+            questions = validate_questions(extract_json_array(resp.choices[0].message.content))
+            if questions:
+                return questions
+            print(f"  ⚠️  Quiz for {movie} failed validation (attempt {attempt + 1})")
+        except Exception as e:
+            print(f"  ⚠️  Quiz generation error for {movie}: {e}")
+    return None
+
+
+# ----- STORAGE -----
+
+def add_quiz_set(conn, movie, questions, model=QUIZ_MODEL):
+    conn.execute(
+        'INSERT INTO quiz_sets (title_key, movie, questions, model, created_at) VALUES (?, ?, ?, ?, ?)',
+        (normalize_title_key(movie), movie, json.dumps(questions), model, time.time())
+    )
+    conn.commit()
+
+
+def quiz_sets(conn, movie):
+    """All stored question sets for a movie"""
+    rows = conn.execute('SELECT questions FROM quiz_sets WHERE title_key = ?', (normalize_title_key(movie),))
+    return [json.loads(row[0]) for row in rows]
+
+
+def set_counts(conn):
+    """{title_key: number of sets} for the whole bank"""
+    return dict(conn.execute('SELECT title_key, COUNT(*) FROM quiz_sets GROUP BY title_key'))
+
+
+# ----- SERVING -----
+
+def shuffled_quiz(question_set, count=QUESTIONS_PER_SET, rng=random):
+    """Questions in random order with shuffled options, in the /quiz response format"""
+    picked = rng.sample(question_set, min(count, len(question_set)))
+    quiz = []
+    for question in picked:
+        order = list(range(len(question["options"])))
+        rng.shuffle(order)
+        correct = order.index(question["answer_index"])
+        quiz.append({
+            "question": question["question"],
+            "options": [question["options"][i] for i in order],
+            "answer": "ABCD"[correct],
+            "correct": correct
+        })
+    return quiz
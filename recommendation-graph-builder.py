@@ -0,0 +1,141 @@
+"""
+DAVE'S SCREAMING OFFICIAL LLM CHATBOT
+Recommendation Graph Builder Script
+Crawls TMDB recommendations for the horror catalogue into recommendation_graph.db
+so horror.py can answer "movies like X" without any live TMDB calls.
+
+    python recommendation-graph-builder.py --pages 50 --limit 5000
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import time
+import argparse
+from collections import deque
+from datetime import datetime
+
+import upstream_client as upstream
+from recommendation_graph import GRAPH_FILE, HORROR_GENRE_ID, open_graph, save_neighbours, built_since, neighbour_from_tmdb
+
+TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+
+
+def discover_horror_seeds(pages):
+    """Most popular horror movies from TMDB discover: [(id, title)]"""
+    seeds = []
+    for page in range(1, pages + 1):
+        try:
+            response = upstream.get("https://api.themoviedb.org/3/discover/movie", params={
+                "api_key": TMDB_API_KEY,
+                "with_genres": str(HORROR_GENRE_ID),
+                "sort_by": "popularity.desc",
+                "page": page
+            })
+            data = response.json()
+        except Exception as e:
+            print(f"❌ Discover page {page} failed: {e}")
+            continue
+
+        results = data.get("results", [])
+        seeds.extend((movie["id"], movie.get("title", "")) for movie in results)
+        if page >= data.get("total_pages", page):
+            break
+    return seeds
+
+
+def fetch_neighbours(movie_id):
+    """Recommended movies for one TMDB id, as compact neighbour records"""
+    response = upstream.get(f"https://api.themoviedb.org/3/movie/{movie_id}/recommendations", params={
+        "api_key": TMDB_API_KEY
+    })
+    data = response.json()
+    if "results" not in data:
+        raise Exception(data.get("status_message", "no results"))
+    return [movie for movie in data["results"] if movie.get("id") != movie_id]
+
+
+def crawl(conn, seeds, fresh, limit, fetch=fetch_neighbours, delay=0):
+    """Breadth-first crawl from the seeds, expanding horror neighbours.
+
+    Fresh nodes aren't refetched, but are still expanded from their stored
+    neighbours, so a rerun after an interruption carries on where the last
+    run stopped. Returns (crawled, skipped, failed)."""
+    queue = deque(seeds)
+    seen = {movie_id for movie_id, _ in seeds}
+    crawled = skipped = failed = 0
+
+    while queue and crawled + skipped < limit:
+        movie_id, title = queue.popleft()
+
+        if movie_id in fresh:
+            neighbours = fresh[movie_id]
+            skipped += 1
+        else:
+            try:
+                results = fetch(movie_id)
+            except Exception as e:
+                print(f"  ❌ {title} ({movie_id}): {e}")
+                failed += 1
+                continue
+
+            neighbours = [neighbour_from_tmdb(movie) for movie in results]
+            save_neighbours(conn, movie_id, title, neighbours)
+            crawled += 1
+
+            if crawled % 100 == 0:
+                conn.commit()
+                print(f"📊 PROGRESS: {crawled} crawled, {skipped} fresh, {len(queue)} queued, {failed} failed")
+            time.sleep(delay)
+
+        for neighbour in neighbours:
+            if neighbour["id"] not in seen and neighbour.get("horror"):
+                seen.add(neighbour["id"])
+                queue.append((neighbour["id"], neighbour.get("title") or ""))
+
+    conn.commit()
+    return crawled, skipped, failed
+
+
+def main():
+    """Run the recommendation graph builder"""
+    parser = argparse.ArgumentParser(description="Build the offline recommendation graph")
+    parser.add_argument("--pages", type=int, default=50, help="discover pages of horror seeds (20 movies each)")
+    parser.add_argument("--limit", type=int, default=5000, help="max movies to crawl, including expanded neighbours")
+    parser.add_argument("--max-age-days", type=float, default=7, help="skip nodes crawled more recently than this")
+    parser.add_argument("--delay", type=float, default=0.05, help="pause between TMDB calls (seconds)")
+    args = parser.parse_args()
+
+    if not TMDB_API_KEY:
+        print("❌ TMDB_API_KEY is not set")
+        return
+
+    print("🩸 DAVE'S SCREAMING OFFICIAL - RECOMMENDATION GRAPH BUILDER 🩸")
+    print("=" * 50)
+    print(f"Starting graph build at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    conn = open_graph(GRAPH_FILE)
+    fresh = built_since(conn, time.time() - args.max_age_days * 86400)
+    print(f"📦 {len(fresh)} nodes are fresh and will be skipped")
+
+    seeds = discover_horror_seeds(args.pages)
+    print(f"🌱 Seeds: {len(seeds)} horror movies")
+    print("=" * 50)
+
+    crawled, skipped, failed = crawl(conn, seeds, fresh, args.limit, delay=args.delay)
+    total = conn.execute('SELECT COUNT(*) FROM rec_graph').fetchone()[0]
+    conn.close()
+
+    print("\n" + "=" * 50)
+    print("🎉 GRAPH BUILD COMPLETE!")
+    print(f"✅ Crawled: {crawled}")
+    print(f"📦 Skipped (fresh): {skipped}")
+    print(f"❌ Failed: {failed}")
+    print(f"🕸️  Nodes in graph: {total}")
+    print(f"Finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Recommendation graph store
+Adjacency list built offline by recommendation-graph-builder.py:
+TMDB movie id -> top-k recommended neighbours (id, title, year, poster path, horror flag).
+horror.py loads it into memory so a recommendation lookup is a dict read.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+GRAPH_FILE = os.getenv("RECOMMENDATION_GRAPH_FILE", "recommendation_graph.db")
+TOP_K = 10
+HORROR_GENRE_ID = 27
+
+
+def open_graph(path=GRAPH_FILE):
+    """Open (and create if needed) the graph database"""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS rec_graph (
+            movie_id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            neighbours TEXT NOT NULL,
+            built_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS graph_titles (
+            title_key TEXT PRIMARY KEY,
+            movie_id INTEGER NOT NULL
+        );
+    ''')
+    return conn
+
+
+def title_key(title):
+    """Same normalization horror.py uses for its caches"""
+    return title.lower().strip()
+
+
+def neighbour_from_tmdb(movie):
+    """Compact neighbour record from a TMDB list result"""
+    release_date = movie.get("release_date") or ""
+    return {
+        "id": movie["id"],
+        "title": movie.get("title"),
+        "year": release_date.split("-")[0] if release_date else None,
+        "poster_path": movie.get("poster_path"),
+        "horror": HORROR_GENRE_ID in (movie.get("genre_ids") or [])
+    }
+
+
+def save_neighbours(conn, movie_id, title, neighbours):
+    """Store one node's adjacency list (caller commits)"""
+    conn.execute(
+        'INSERT OR REPLACE INTO rec_graph (movie_id, title, neighbours, built_at) VALUES (?, ?, ?, ?)',
+        (movie_id, title, json.dumps(neighbours[:TOP_K], separators=(",", ":")), time.time())
+    )
+    conn.execute(
+        'INSERT OR REPLACE INTO graph_titles (title_key, movie_id) VALUES (?, ?)',
+        (title_key(title), movie_id)
+    )
+
+
+def built_since(conn, cutoff):
+    """{movie_id: neighbours} for nodes crawled after `cutoff` (for resuming).
+    Nodes stored before neighbours carried the horror flag are left out, so they get recrawled."""
+    fresh = {}
+    for movie_id, neighbours in conn.execute('SELECT movie_id, neighbours FROM rec_graph WHERE built_at >= ?', (cutoff,)):
+        neighbours = json.loads(neighbours)
+        if all("horror" in neighbour for neighbour in neighbours):
+            fresh[movie_id] = neighbours
+    return fresh
+
+
+def load_graph(path=GRAPH_FILE):
+    """Load the whole graph into memory: ({movie_id: neighbours}, {title_key: movie_id}).
+    Returns None if it can't be read right now (e.g. locked mid-build) - keep the current graph"""
+    if not os.path.exists(path):
+        return {}, {}
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            by_id = {movie_id: json.loads(neighbours) for movie_id, neighbours in conn.execute('SELECT movie_id, neighbours FROM rec_graph')}
+            by_title = dict(conn.execute('SELECT title_key, movie_id FROM graph_titles'))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️ Recommendation graph not readable ({e}) - keeping the current one")
+        return None
+    return by_id, by_title
@@ -0,0 +1,113 @@
+"""
+DAVE'S SCREAMING OFFICIAL LLM CHATBOT
+Semantic Index Builder Script
+Embeds movie plots from the overnight movie cache (see movie_store.py) or a
+details_cache.db-style SQLite table and upserts them into the Pinecone
+"horror-movies" index, or into the local vector index (semantic_index.f32/.db)
+when Pinecone isn't configured or --local is passed. Batching, concurrency and
+skip-unchanged logic live in embedding_pipeline.py.
+
+    python semantic-index-builder.py --local
+    python semantic-index-builder.py --source sqlite --db details_cache.db --concurrency 8
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import argparse
+from datetime import datetime
+
+from movie_store import MovieStore, MOVIE_STORE_DIR
+from vector_index import LocalVectorIndex, VECTOR_INDEX_PATH
+from embedding_pipeline import run_pipeline, records_from_store, records_from_sqlite, BATCH_SIZE, MAX_IN_FLIGHT
+from fake_openai import FakeOpenAI
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+INDEX_NAME = "horror-movies"
+EMBED_MODEL = "text-embedding-3-small"
+EMBED_DIMENSION = 1536
+
+
+def open_embedding_client(fake=False):
+    """OpenAI client, or the offline fake when OPENAI_FAKE=1 / --fake"""
+    if fake or os.getenv("OPENAI_FAKE") == "1":
+        return FakeOpenAI(embedding_dim=EMBED_DIMENSION)
+    if not OPENAI_API_KEY:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+def open_vector_index(local):
+    """Pinecone index (created if missing), or the local stand-in"""
+    if local or not PINECONE_API_KEY:
+        return LocalVectorIndex(VECTOR_INDEX_PATH, writable=True)
+
+    from pinecone import Pinecone, ServerlessSpec
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    if INDEX_NAME not in pc.list_indexes().names():
+        print(f"📦 Creating Pinecone index {INDEX_NAME}...")
+        pc.create_index(name=INDEX_NAME, dimension=EMBED_DIMENSION, metric="cosine",
+                        spec=ServerlessSpec(cloud="aws", region="us-east-1"))
+    return pc.Index(INDEX_NAME)
+
+
+def main():
+    """Run the semantic index builder"""
+    parser = argparse.ArgumentParser(description="Embed movie plots into the semantic search index")
+    parser.add_argument("--local", action="store_true", help="write the local vector index even if Pinecone is configured")
+    parser.add_argument("--source", choices=["store", "sqlite"], default="store", help="overnight movie store, or a SQLite cache table")
+    parser.add_argument("--db", default="details_cache.db", help="database for --source sqlite")
+    parser.add_argument("--table", default="movie_details", help="cache_key/payload table for --source sqlite")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="texts per embeddings request")
+    parser.add_argument("--concurrency", type=int, default=MAX_IN_FLIGHT, help="embeddings requests in flight")
+    parser.add_argument("--force", action="store_true", help="re-embed records even if their text is unchanged")
+    parser.add_argument("--fake", action="store_true", help="offline fake embeddings (same as OPENAI_FAKE=1)")
+    args = parser.parse_args()
+
+    client = open_embedding_client(args.fake)
+    if client is None:
+        print("❌ OPENAI_API_KEY is not set (or use --fake for offline embeddings)")
+        return
+
+    print("🩸 DAVE'S SCREAMING OFFICIAL - SEMANTIC INDEX BUILDER 🩸")
+    print("=" * 50)
+    print(f"Starting index build at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if args.source == "sqlite":
+        records = records_from_sqlite(args.db, args.table)
+        print(f"🎬 Source: {args.db} ({args.table})")
+    else:
+        records = records_from_store(MovieStore(MOVIE_STORE_DIR, read_only=True))
+        print(f"🎬 Source: {MOVIE_STORE_DIR}")
+
+    index = open_vector_index(args.local)
+    if isinstance(index, LocalVectorIndex):
+        target = f"local:{os.path.abspath(VECTOR_INDEX_PATH)}"
+        force = args.force or not len(index)  # a wiped index has to be rebuilt in full
+    else:
+        target = f"pinecone:{INDEX_NAME}"
+        force = args.force
+    print(f"📦 Target: {target}")
+    print(f"⚙️  Batch {args.batch} | {args.concurrency} requests in flight | model {EMBED_MODEL}")
+    print("=" * 50)
+
+    stats = run_pipeline(client, index, records, target, model=EMBED_MODEL,
+                         batch_size=args.batch, max_in_flight=args.concurrency, force=force)
+
+    if isinstance(index, LocalVectorIndex):
+        index.close()
+
+    print("\n" + "=" * 50)
+    print("🎉 SEMANTIC INDEX BUILD COMPLETE!")
+    print(f"✅ Embedded: {stats['embedded']} in {stats['requests']} requests ({stats['seconds']}s)")
+    print(f"📦 Unchanged (skipped): {stats['skipped']}")
+    print(f"❌ Failed (will retry next run): {stats['failed']}")
+    print(f"Finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# The app's modules live flat in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+DATA_FILES = {
+    "DETAILS_CACHE_FILE": "details_cache.db",
+    "USER_DB_FILE": "user_data.db",
+    "HORROR_STATS_FILE": "horror_stats.db",
+    "MOVIE_STORE_DIR": "movie_cache",
+    "QUIZ_BANK_FILE": "quiz_bank.db",
+    "RECOMMENDATION_GRAPH_FILE": "recommendation_graph.db",
+}
+
+
+@pytest.fixture(scope="session")
+def horror(tmp_path_factory):
+    """horror.py imported offline, with its SQLite files in a scratch directory"""
+    scratch = tmp_path_factory.mktemp("horror")
+    os.environ["OPENAI_FAKE"] = "1"
+    os.environ["BACKGROUND_WORKERS"] = "0"
+    # Absolute paths, so connections opened after the chdir back stay in the scratch directory
+    for name, filename in DATA_FILES.items():
+        os.environ[name] = str(scratch / filename)
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    try:
+        import horror as module
+    finally:
+        os.chdir(cwd)
+    return module
@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.fixture
+def admin_client(horror, monkeypatch):
+    monkeypatch.setattr(horror, "ADMIN_TOKEN", "s3cret-token")
+    return horror.app.test_client()
+
+
+def test_login_sets_an_http_only_strict_session_cookie(admin_client):
+    assert admin_client.get("/admin/check").get_json() == {"is_admin": False}
+    assert admin_client.post("/admin/login", json={"token": "wrong"}).status_code == 403
+
+    response = admin_client.post("/admin/login", json={"token": "s3cret-token"})
+    assert response.status_code == 200
+    cookie = response.headers["Set-Cookie"]
+    assert cookie.startswith("admin_session=") and "s3cret-token" not in cookie
+    assert "HttpOnly" in cookie and "SameSite=Strict" in cookie and "Path=/admin" in cookie
+
+    assert admin_client.get("/admin/check").get_json() == {"is_admin": True}
+    assert admin_client.get("/admin/stats").status_code == 200
+
+    admin_client.post("/admin/logout")
+    assert admin_client.get("/admin/check").get_json() == {"is_admin": False}
+
+
+def test_header_token_still_works_and_raw_token_cookie_does_not(admin_client):
+    assert admin_client.get("/admin/check", headers={"X-Admin-Token": "s3cret-token"}).get_json() == {"is_admin": True}
+    assert admin_client.get("/admin/check", headers={"X-Admin-Token": "nope"}).get_json() == {"is_admin": False}
+    admin_client.set_cookie("admin_token", "s3cret-token")
+    assert admin_client.get("/admin/check").get_json() == {"is_admin": False}
+
+
+def test_admin_is_disabled_without_a_token(horror, monkeypatch):
+    monkeypatch.setattr(horror, "ADMIN_TOKEN", None)
+    client = horror.app.test_client()
+    assert client.post("/admin/login", json={"token": ""}).status_code == 403
+    assert client.get("/admin/stats").status_code == 403
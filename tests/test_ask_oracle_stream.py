@@ -0,0 +1,49 @@
+import json
+
+from fake_openai import FakeOpenAI
+
+
+def read_events(response):
+    events = []
+    for block in response.get_data(as_text=True).split("\n\n"):
+        if not block.strip():
+            continue
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def event_order(events):
+    """Event names, with each run of token events collapsed into one"""
+    order = []
+    for name, _ in events:
+        if not (name == "token" and order and order[-1] == "token"):
+            order.append(name)
+    return order
+
+
+def test_stream_event_order_and_cached_replay(horror, monkeypatch):
+    fake = FakeOpenAI(chunk_delay=0)
+    monkeypatch.setattr(horror, "client", fake)
+    monkeypatch.setattr(horror, "response_cache", horror.ResponseCache(100, 3600, 1))
+    monkeypatch.setattr(horror, "get_movie_details_from_apis",
+                        lambda title: {"title": title, "year": "1978", "plot": "A night he came home"})
+    monkeypatch.setattr(horror, "get_movie_recommendations", lambda title: [{"title": "Sequel"}])
+    client = horror.app.test_client()
+    query = "what are the bloodiest movies ever made"
+
+    first = client.get("/ask-oracle-stream", query_string={"query": query})
+    assert first.mimetype == "text/event-stream"
+    events = read_events(first)
+    assert event_order(events) == ["meta", "token", "movie_details", "recommendations", "done"]
+    assert events[0][1] == {"query_type": "bloodiest"}
+    assert sum(1 for name, _ in events if name == "token") > 1
+    assert dict(events)["recommendations"] == [{"title": "Sequel"}]
+    text = "".join(data["text"] for name, data in events if name == "token")
+    assert len(fake.calls) == 1
+
+    # The same question again replays the cached reply without another completion
+    second = read_events(client.post("/ask-oracle-stream", json={"query": query}))
+    assert event_order(second) == ["meta", "token", "movie_details", "recommendations", "done"]
+    assert "".join(data["text"] for name, data in second if name == "token") == text
+    assert len(fake.calls) == 1
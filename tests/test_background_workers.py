@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECK = """
+import threading
+import horror
+names = sorted(t.name for t in threading.enumerate())
+assert names == ["MainThread"], names
+horror.start_background_workers()
+names = sorted(t.name for t in threading.enumerate())
+assert "genre-flush" in names, names
+assert "release-refresher" not in names and "genre-pools" not in names, names
+print("ok")
+"""
+
+
+def test_import_starts_no_threads_and_keyless_start_skips_upstream_work(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k not in ("TMDB_API_KEY", "OMDB_API_KEY", "BACKGROUND_WORKERS")}
+    env.update(OPENAI_FAKE="1", PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", CHECK], cwd=str(tmp_path), env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
@@ -0,0 +1,22 @@
+from embedding_pipeline import run_pipeline, UPSERT_BATCH
+from fake_openai import FakeOpenAI
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, vectors, **kwargs):
+        self.upserts.append(len(vectors))
+
+
+def test_large_embedding_batches_are_upserted_in_small_chunks(tmp_path):
+    records = [(f"movie {i}", {"title": f"Movie {i}", "plot": f"plot {i}"}) for i in range(300)]
+    index = RecordingIndex()
+    stats = run_pipeline(FakeOpenAI(embedding_dim=8), index, records, "test",
+                         state_path=str(tmp_path / "state.db"), batch_size=256)
+
+    assert stats["embedded"] == 300
+    assert stats["requests"] == 2
+    assert max(index.upserts) <= UPSERT_BATCH
+    assert sum(index.upserts) == 300
@@ -0,0 +1,61 @@
+import pytest
+
+
+@pytest.fixture
+def buffer(horror, monkeypatch):
+    """A GenreSearchBuffer that only writes on an explicit flush"""
+    buffer = horror.GenreSearchBuffer(flush_interval=60, max_pending=3)
+    buffer.thread = object()  # stands in for the flush thread, so add() doesn't write through
+    monkeypatch.setattr(horror, "genre_buffer", buffer)
+    return buffer
+
+
+def test_clicks_merge_until_flushed(horror, buffer):
+    buffer.add("genre-user-1", "slashers")
+    buffer.add("genre-user-1", "slashers")
+    assert not buffer.wake.is_set()
+    buffer.add("genre-user-1", "zombies")
+    assert buffer.wake.is_set()  # max_pending reached - wakes the flush thread early
+
+    assert horror.get_stored_genre_searches("genre-user-1") == {}
+    assert horror.get_genre_searches("genre-user-1") == {"slashers": 2, "zombies": 1}
+    assert horror.get_user("genre-user-1")["horror_profile"] == "Slasher Fan"
+
+    buffer.flush()
+    assert buffer.pending_for("genre-user-1") == {}
+    assert horror.get_stored_genre_searches("genre-user-1") == {"slashers": 2, "zombies": 1}
+
+    buffer.add("genre-user-1", "zombies")
+    buffer.add("genre-user-1", "zombies")
+    buffer.flush()
+    assert horror.get_stored_genre_searches("genre-user-1") == {"slashers": 2, "zombies": 3}
+    profile = horror.get_user_db().execute(
+        "SELECT horror_profile FROM users WHERE google_id = 'genre-user-1'"
+    ).fetchone()[0]
+    assert profile == "Zombie Enthusiast"
+
+
+def test_failed_flush_keeps_the_batch_for_the_next_one(horror, buffer, monkeypatch):
+    buffer.add("genre-user-2", "vampires")
+    buffer.add("genre-user-2", "vampires")
+
+    def broken_db():
+        raise horror.sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(horror, "get_user_db", broken_db)
+        buffer.flush()
+    assert buffer.pending_for("genre-user-2") == {"vampires": 2}
+    assert buffer.pending_clicks == 2
+
+    buffer.add("genre-user-2", "vampires")
+    buffer.flush()
+    assert horror.get_stored_genre_searches("genre-user-2") == {"vampires": 3}
+    assert buffer.pending_for("genre-user-2") == {}
+
+
+def test_clicks_write_through_without_a_flush_thread(horror):
+    client = horror.app.test_client()
+    response = client.post("/track-genre-preference", json={"googleId": "genre-user-3", "genre": "Demons"})
+    assert response.get_json()["horror_profile"] == "Demon Hunter"
+    assert horror.get_stored_genre_searches("genre-user-3") == {"demons": 1}
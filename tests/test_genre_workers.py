@@ -0,0 +1,33 @@
+def test_genre_clicks_write_through_without_the_flush_thread(horror):
+    buffer = horror.GenreSearchBuffer(3600, 500)
+    assert buffer.thread is None
+    buffer.add("no-thread-user", "zombies")
+    buffer.add("no-thread-user", "zombies")
+
+    assert buffer.pending == {}
+    assert horror.get_stored_genre_searches("no-thread-user") == {"zombies": 2}
+
+
+def test_genre_pools_share_hydrated_entries(horror, tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(horror, "get_movie_details_from_apis",
+                        lambda title: calls.append(title) or {"title": title, "plot": "It comes at night", "poster": None})
+    monkeypatch.setattr(horror, "get_movie_recommendations", lambda title: [{"title": "Sequel"}])
+    db_path = str(tmp_path / "pools.db")
+    genres = {"zombies": ["Dawn of the Dead", "Day of the Dead"]}
+
+    first = horror.GenrePools(genres, 3600, 0, db_path)
+    conn = horror.open_sqlite(db_path)
+    conn.execute('CREATE TABLE genre_pool_entries (title_key TEXT PRIMARY KEY, entry TEXT NOT NULL, hydrated_at REAL NOT NULL)')
+    for title in first._due():
+        first.hydrate(title, conn)
+    assert len(calls) == 2
+
+    # A second worker starts warm from the shared copy and has nothing to fetch
+    second = horror.GenrePools(genres, 3600, 0, db_path)
+    assert second.pick("zombies") is None
+    assert second.load_shared(conn) == 2
+    assert second._due() == []
+    title, entry = second.pick("zombies")
+    assert title in genres["zombies"] and entry["recommendations"] == [{"title": "Sequel"}]
+    assert second.load_shared(conn) == 0
@@ -0,0 +1,75 @@
+import json
+import sqlite3
+import sys
+
+import pytest
+
+import import_tmdb
+from title_index import build_title_index
+
+
+@pytest.fixture
+def export(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    def write(movies, name="movie_ids.json"):
+        path = tmp_path / name
+        path.write_text("".join(json.dumps(movie) + "\n" for movie in movies))
+        return str(path)
+    return write
+
+
+def run_stream(monkeypatch, path, *extra):
+    monkeypatch.setattr(sys, "argv", ["import_tmdb.py", "--stream", path, *extra])
+    import_tmdb.main()
+
+
+def fts_titles(term):
+    conn = sqlite3.connect("horror_movies.db")
+    try:
+        return [row[0] for row in conn.execute(
+            'SELECT m.original_title FROM movies_fts f JOIN movies m ON m.id = f.rowid WHERE movies_fts MATCH ?', (term,))]
+    finally:
+        conn.close()
+
+
+def counting_build(monkeypatch, fail=False):
+    calls = []
+
+    def build(conn):
+        calls.append(1)
+        if fail:
+            raise RuntimeError("killed mid-build")
+        return build_title_index(conn)
+    monkeypatch.setattr(import_tmdb, "build_title_index", build)
+    return calls
+
+
+def test_rerun_with_no_changes_skips_the_index_rebuild(export, monkeypatch):
+    path = export([{"id": 1, "original_title": "Halloween", "popularity": 5}])
+    calls = counting_build(monkeypatch)
+    run_stream(monkeypatch, path)
+    assert len(calls) == 1
+    assert fts_titles("halloween") == ["Halloween"]
+
+    run_stream(monkeypatch, path)
+    run_stream(monkeypatch, path, "--restart")
+    assert len(calls) == 1
+
+
+def test_rerun_after_an_interrupted_index_build_rebuilds(export, monkeypatch):
+    path = export([{"id": 1, "original_title": "Halloween", "popularity": 5}])
+    run_stream(monkeypatch, path)
+
+    path = export([{"id": 1, "original_title": "Halloween", "popularity": 5},
+                   {"id": 2, "original_title": "Scream", "popularity": 3}], name="movie_ids_next_day.json")
+    counting_build(monkeypatch, fail=True)
+    run_stream(monkeypatch, path)
+    assert fts_titles("scream") == []
+
+    calls = counting_build(monkeypatch)
+    run_stream(monkeypatch, path)
+    assert len(calls) == 1
+    assert fts_titles("scream") == ["Scream"]
+
+    run_stream(monkeypatch, path)
+    assert len(calls) == 1
@@ -0,0 +1,79 @@
+import os
+
+import movie_store
+from movie_store import MovieStore
+
+
+def test_reader_sees_published_appends(tmp_path):
+    writer = MovieStore(str(tmp_path))
+    writer.put("alien", {"title": "Alien"})
+    writer.publish()
+
+    reader = MovieStore(str(tmp_path), read_only=True)
+    assert reader.get("alien") == {"title": "Alien"}
+    assert not reader.reload_if_changed()
+
+    writer.put("the thing", {"title": "The Thing"})
+    assert reader.get("the thing") is None  # not published yet
+    writer.publish()
+    assert reader.reload_if_changed()
+    assert reader.get("the thing") == {"title": "The Thing"}
+    assert len(reader) == 2
+
+
+def test_second_writer_run_is_picked_up(tmp_path):
+    writer = MovieStore(str(tmp_path))
+    writer.put("alien", {"title": "Alien"})
+    writer.publish()
+    writer.close()
+    reader = MovieStore(str(tmp_path), read_only=True)
+
+    # A later builder run appends to the same segment
+    writer = MovieStore(str(tmp_path))
+    writer.put("halloween", {"title": "Halloween"})
+    writer.publish()
+    writer.close()
+
+    assert reader.reload_if_changed()
+    assert reader.get("halloween") == {"title": "Halloween"}
+    assert reader.get("alien") == {"title": "Alien"}
+
+
+def test_unpublished_torn_line_is_not_indexed(tmp_path):
+    writer = MovieStore(str(tmp_path))
+    writer.put("alien", {"title": "Alien"})
+    writer.publish()
+    reader = MovieStore(str(tmp_path), read_only=True)
+
+    with open(os.path.join(str(tmp_path), writer.segments[-1]), "ab") as f:
+        f.write(b'{"k":"half')
+    writer.generation += 1
+    writer._write_manifest()
+
+    assert reader.reload_if_changed()
+    assert len(reader) == 1
+
+
+def test_compaction_keeps_old_segments_for_readers(tmp_path, monkeypatch):
+    writer = MovieStore(str(tmp_path))
+    writer.put("alien", {"title": "Alien"})
+    writer.put("alien", {"title": "Alien", "year": "1979"})
+    writer.publish()
+    reader = MovieStore(str(tmp_path), read_only=True)
+    old_segments = list(writer.segments)
+
+    writer.compact()
+    # A reader that hasn't reloaded still reads through its old offsets
+    for segment in old_segments:
+        assert os.path.exists(os.path.join(str(tmp_path), segment))
+    assert reader.get("alien") == {"title": "Alien", "year": "1979"}
+
+    assert reader.reload_if_changed()
+    assert reader.segments == writer.segments
+    assert reader.get("alien") == {"title": "Alien", "year": "1979"}
+
+    # Once the grace period is over the next publish deletes them
+    monkeypatch.setattr(movie_store, "RETIRE_GRACE", 0)
+    writer.publish()
+    for segment in old_segments:
+        assert not os.path.exists(os.path.join(str(tmp_path), segment))
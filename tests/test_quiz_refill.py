@@ -0,0 +1,38 @@
+import pytest
+
+from fake_openai import FakeOpenAI
+
+
+@pytest.fixture
+def refills(horror, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(horror, "client", FakeOpenAI(chunk_delay=0))
+    monkeypatch.setattr(horror.quiz_executor, "submit", lambda fn, movie, missing: submitted.append((movie, missing)))
+    monkeypatch.setattr(horror, "quiz_refills", set())
+    known = {"Halloween": {"id": 948, "title": "Halloween", "original_title": "Halloween"},
+             "living dead": {"id": 10331, "title": "Night of the Living Dead", "original_title": "Night of the Living Dead"}}
+    monkeypatch.setattr(horror, "resolve_title_locally", lambda title: known.get(title))
+    return submitted
+
+
+def test_only_known_titles_get_a_refill(horror, refills):
+    client = horror.app.test_client()
+    response = client.get("/quiz", query_string={"movie": "asdf qwerty 123"}).get_json()
+    assert response["status"] == "unavailable"
+    # A partial FTS match isn't the title the bank would store
+    assert client.get("/quiz", query_string={"movie": "living dead"}).get_json()["status"] == "unavailable"
+    assert refills == []
+
+    assert client.get("/quiz", query_string={"movie": "Halloween"}).get_json()["status"] == "generating"
+    assert client.get("/quiz", query_string={"movie": "Halloween"}).get_json()["status"] == "generating"
+    assert refills == [("Halloween", horror.quiz_bank.SETS_PER_TITLE)]
+
+
+def test_queued_refills_are_capped(horror, refills, monkeypatch):
+    monkeypatch.setattr(horror, "QUIZ_REFILL_MAX_QUEUED", 2)
+    monkeypatch.setattr(horror, "is_known_title", lambda movie: True)
+    assert horror.schedule_quiz_refill("Movie 1", 3)
+    assert horror.schedule_quiz_refill("Movie 2", 3)
+    assert not horror.schedule_quiz_refill("Movie 3", 3)
+    assert horror.schedule_quiz_refill("Movie 1", 3)  # already queued
+    assert len(refills) == 2
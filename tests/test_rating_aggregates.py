@@ -0,0 +1,43 @@
+import threading
+
+
+def test_ratings_fold_into_one_row_per_title(horror):
+    assert horror.get_rating_summary("Rating Test One") == {"average": 0, "count": 0, "histogram": [0] * 5}
+    horror.record_rating("Rating Test One", 5)
+    horror.record_rating("rating test one", 4)
+    summary = horror.record_rating("  RATING TEST ONE ", 4)
+    assert summary == {"average": 4.3, "count": 3, "histogram": [0, 0, 0, 2, 1]}
+    assert horror.get_rating_summary("Rating Test One") == summary
+
+
+def test_concurrent_ratings_are_not_lost(horror):
+    def rate(rating):
+        for _ in range(10):
+            horror.record_rating("Rating Test Two", rating)
+
+    threads = [threading.Thread(target=rate, args=(rating,)) for rating in (1, 2, 3, 4, 5, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = horror.get_rating_summary("Rating Test Two")
+    assert summary["count"] == 60
+    assert summary["histogram"] == [10, 10, 10, 10, 20]
+    assert summary["average"] == 3.3
+
+
+def test_submit_rating_route(horror):
+    client = horror.app.test_client()
+    for rating in (3, 4.0):
+        response = client.post("/submit-rating", json={"movie_title": "Rating Test Three", "rating": rating})
+        assert response.status_code == 200
+    assert response.get_json()["average_rating"] == 3.5
+    assert response.get_json()["total_ratings"] == 2
+
+    for rating in (0, 6, 3.5, True, "5"):
+        response = client.post("/submit-rating", json={"movie_title": "Rating Test Three", "rating": rating})
+        assert response.status_code == 400
+    assert client.post("/submit-rating", json={"rating": 3}).status_code == 400
+
+    stats = client.get("/get-movie-stats", query_string={"movie_title": "Rating Test Three"}).get_json()
+    assert stats["rating"] == {"average": 3.5, "count": 2, "histogram": [0, 0, 1, 1, 0]}
@@ -0,0 +1,88 @@
+import importlib.util
+import os
+import time
+
+from recommendation_graph import open_graph, built_since, load_graph
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_builder():
+    spec = importlib.util.spec_from_file_location("graph_builder", os.path.join(ROOT, "recommendation-graph-builder.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def chain_fetch(calls):
+    """Movie n recommends n + 1 (horror) and 1000 + n (not horror)"""
+    def fetch(movie_id):
+        calls.append(movie_id)
+        return [
+            {"id": movie_id + 1, "title": f"Movie {movie_id + 1}", "genre_ids": [27]},
+            {"id": 1000 + movie_id, "title": f"Comedy {movie_id}", "genre_ids": [35]},
+        ]
+    return fetch
+
+
+def test_resume_expands_fresh_nodes_from_stored_neighbours(tmp_path):
+    builder = load_builder()
+    conn = open_graph(str(tmp_path / "graph.db"))
+    seeds = [(1, "Movie 1")]
+
+    # First run is interrupted after three nodes
+    calls = []
+    assert builder.crawl(conn, seeds, {}, 3, fetch=chain_fetch(calls)) == (3, 0, 0)
+    assert calls == [1, 2, 3]
+
+    # The rerun walks through the fresh nodes without refetching them and carries on
+    calls = []
+    fresh = built_since(conn, time.time() - 3600)
+    crawled, skipped, failed = builder.crawl(conn, seeds, fresh, 6, fetch=chain_fetch(calls))
+    assert (crawled, skipped, failed) == (3, 3, 0)
+    assert calls == [4, 5, 6]
+
+
+def test_nodes_without_horror_flag_are_recrawled(tmp_path):
+    conn = open_graph(str(tmp_path / "graph.db"))
+    conn.execute("INSERT INTO rec_graph (movie_id, title, neighbours, built_at) VALUES (1, 'Old', '[{\"id\": 2}]', ?)", (time.time(),))
+    assert built_since(conn, 0) == {}
+
+
+def test_load_graph_returns_none_when_unreadable(tmp_path):
+    path = tmp_path / "graph.db"
+    path.write_bytes(b"not a sqlite database" * 100)
+    assert load_graph(str(path)) is None
+    assert load_graph(str(tmp_path / "missing.db")) == ({}, {})
+
+
+def test_failed_reload_keeps_the_live_graph(horror, monkeypatch, tmp_path):
+    path = tmp_path / "graph.db"
+    path.write_bytes(b"x")
+    monkeypatch.setattr(horror, "GRAPH_FILE", str(path))
+    monkeypatch.setattr(horror, "load_graph", lambda _: None)
+    monkeypatch.setitem(horror.rec_graph, "by_id", {1: [{"id": 2}]})
+    monkeypatch.setitem(horror.rec_graph, "checked_at", 0)
+    monkeypatch.setitem(horror.rec_graph, "mtime", None)
+
+    horror.refresh_recommendation_graph()
+    assert horror.rec_graph["by_id"] == {1: [{"id": 2}]}
+    assert horror.rec_graph["mtime"] is None
+
+
+def test_graph_recommendations_fall_through_when_nothing_usable(horror, monkeypatch):
+    monkeypatch.setattr(horror, "refresh_recommendation_graph", lambda: None)
+    monkeypatch.setitem(horror.rec_graph, "by_id", {
+        1: [{"id": 2, "title": "Scream 2", "horror": True}, {"id": 3, "title": "Clueless", "horror": False}],
+        4: [],
+        5: [{"id": 6, "title": "Clueless", "horror": False}],
+    })
+    monkeypatch.setitem(horror.rec_graph, "by_title", {"scream": 1, "lonely": 4, "romcom": 5})
+
+    assert [movie["title"] for movie in horror.graph_recommendations("Scream")] == ["Scream 2"]
+    assert horror.graph_recommendations("Lonely") is None
+    assert horror.graph_recommendations("Romcom") is None
+
+    monkeypatch.setattr(horror, "similarity_recommendations", lambda title: None)
+    monkeypatch.setattr(horror, "fetch_movie_recommendations", lambda title: [{"title": "Live pick"}])
+    assert horror.get_movie_recommendations("Romcom") == [{"title": "Live pick"}]
@@ -0,0 +1,78 @@
+import pytest
+
+
+def make_feed(horror, count):
+    feed = horror.ReleaseFeed("test", dict, dict, 3, 3600, 1)
+    feed._publish([{"title": f"Movie {i}"} for i in range(count)], 1e12)
+    return feed
+
+
+def test_limits_past_the_list_share_one_body(horror):
+    feed = make_feed(horror, 20)
+    for limit in range(1, 5000):
+        feed.body(limit)
+    assert len(feed.bodies) == 20
+    assert feed.body(10 ** 9) == feed.body(20)
+
+
+def test_default_limit_and_cold_feed(horror):
+    feed = make_feed(horror, 20)
+    assert feed.body()[0].count(b'"title"') == 3
+
+    cold = horror.ReleaseFeed("cold", dict, dict, 3, 3600, 1)
+    assert cold.body(50)[0] == b'{"releases": []}'
+    assert cold.bodies == {}
+
+
+def test_non_positive_limit_is_rejected(horror, monkeypatch):
+    feed = make_feed(horror, 5)
+    with pytest.raises(ValueError):
+        feed.body(0)
+    assert feed.bodies == {}
+
+    monkeypatch.setattr(horror, "TMDB_API_KEY", "test")
+    client = horror.app.test_client()
+    assert client.get("/theater-releases?limit=0").status_code == 400
+    assert client.get("/recent-releases?limit=-3").status_code == 400
+
+
+def test_cold_feed_seeds_from_the_shared_copy(horror, tmp_path, monkeypatch):
+    conn = horror.open_release_db(str(tmp_path / "shared.db"))
+    conn.execute('INSERT INTO release_feeds (name, payload, fetched_at) VALUES (?, ?, ?)',
+                 ("shared", '[{"title": "Movie 0"}]', 1e12))
+    feed = horror.ReleaseFeed("shared", dict, dict, 3, 3600, 1)
+    monkeypatch.setattr(feed, "fetch", lambda **kwargs: pytest.fail("should not call TMDB"))
+
+    feed.seed(conn)
+    assert feed.body()[0] == b'{"releases": [{"title": "Movie 0"}]}'
+
+
+def test_cold_feed_without_a_shared_copy_fetches_once_bounded(horror, tmp_path, monkeypatch):
+    conn = horror.open_release_db(str(tmp_path / "empty.db"))
+    feed = horror.ReleaseFeed("seeded", dict, dict, 3, 3600, 3)
+    calls = []
+    monkeypatch.setattr(feed, "fetch", lambda **kwargs: calls.append(kwargs) or [{"title": "Fresh"}])
+
+    feed.seed(conn)
+    feed.seed(conn)
+    assert calls == [{"pages": 1, "timeout": horror.RELEASES_SEED_TIMEOUT, "retries": 0}]
+    assert feed.releases == [{"title": "Fresh"}]
+    # Stored stale, so the refresher replaces the one-page list with the full one
+    assert feed.is_stale()
+    assert conn.execute('SELECT payload FROM release_feeds WHERE name = ?', ("seeded",)).fetchone()[0] == '[{"title": "Fresh"}]'
+
+
+def test_failed_seed_backs_off(horror, tmp_path, monkeypatch):
+    conn = horror.open_release_db(str(tmp_path / "down.db"))
+    feed = horror.ReleaseFeed("down", dict, dict, 3, 3600, 1)
+    calls = []
+
+    def fetch(**kwargs):
+        calls.append(kwargs)
+        raise horror.upstream.UpstreamError("tmdb is down")
+    monkeypatch.setattr(feed, "fetch", fetch)
+
+    feed.seed(conn)
+    feed.seed(conn)
+    assert len(calls) == 1
+    assert feed.body()[0] == b'{"releases": []}'
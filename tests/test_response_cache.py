@@ -0,0 +1,73 @@
+class CountingEmbedder:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, text):
+        self.calls.append(text)
+        if self.fail:
+            raise RuntimeError("embeddings down")
+        # One axis per first letter, so different queries never look alike
+        return [1.0 if i == ord(text[0]) % 26 else 0.0 for i in range(26)]
+
+
+def make_cache(horror, embed_fn):
+    return horror.ResponseCache(100, 3600, 1, similarity=0.99, embed_fn=embed_fn)
+
+
+def test_a_miss_embeds_its_query_once(horror):
+    embed = CountingEmbedder()
+    cache = make_cache(horror, embed)
+
+    # First miss: no candidates to compare against, so only put() needs the embedding
+    assert cache.get("general", "bloodiest movies") is None
+    cache.put("general", "bloodiest movies", None, 0, "reply one")
+    assert len(embed.calls) == 1
+
+    # Second miss: get() embeds to compare, put() reuses it
+    assert cache.get("general", "scariest ghosts ever") is None
+    cache.put("general", "scariest ghosts ever", None, 0, "reply two")
+    assert len(embed.calls) == 2
+    assert cache.query_embeddings == {}
+    assert cache.get("general", "scariest ghosts ever") == "reply two"
+    assert len(embed.calls) == 2
+
+
+def test_a_failed_embedding_is_retried_not_remembered(horror):
+    embed = CountingEmbedder()
+    cache = make_cache(horror, embed)
+    cache.put("general", "bloodiest movies", None, 0, "reply one")
+
+    embed.fail = True
+    assert cache.get("general", "goriest films") is None
+    assert cache.query_embeddings == {}
+
+    embed.fail = False
+    cache.put("general", "goriest films", None, 0, "reply two")
+    assert len(embed.calls) == 3
+    assert cache.entries[("general", "goriest films", "", 0)]["embedding"] is not None
+    assert cache.get("general", "goriest films") == "reply two"
+
+
+def test_expired_entries_and_aliases_are_re_cached(horror, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(horror.time, "time", lambda: clock[0])
+    embed = CountingEmbedder()
+    embed_fn = lambda text: embed("x" + text)  # every query lands on the same axis
+    cache = horror.ResponseCache(100, 60, 1, similarity=0.5, embed_fn=embed_fn)
+
+    cache.put("general", "bloodiest movies", None, 0, "A")
+    assert cache.get("general", "goriest films") == "A"
+    assert cache.aliases
+
+    clock[0] += 61
+    assert cache.get("general", "goriest films") is None
+    cache.put("general", "goriest films", None, 0, "B")
+    assert cache.get("general", "goriest films") == "B"
+    assert cache.get("general", "bloodiest movies") == "B"
+    assert list(cache.entries) == [("general", "goriest films", "", 0)]
+
+    clock[0] += 61
+    assert cache.get("general", "bloodiest movies") is None
+    cache.put("general", "bloodiest movies", None, 0, "C")
+    assert cache.get("general", "bloodiest movies") == "C"
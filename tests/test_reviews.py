@@ -0,0 +1,98 @@
+import pytest
+
+
+@pytest.fixture
+def recent(horror, monkeypatch):
+    """A small ring-buffer cache: 3 reviews per title, 2 titles"""
+    monkeypatch.setattr(horror, "RECENT_REVIEWS", 3)
+    cache = horror.RecentReviewCache(max_titles=2, per_title=3, ttl=30)
+    monkeypatch.setattr(horror, "recent_reviews", cache)
+    return cache
+
+
+def review_texts(reviews):
+    return [review["review_text"] for review in reviews]
+
+
+def test_ring_buffer_keeps_the_newest_reviews(horror, recent):
+    for n in range(4):
+        horror.add_review("Review Test One", f"take {n}")
+    assert review_texts(horror.get_recent_reviews("Review Test One")) == ["take 1", "take 2", "take 3"]
+    assert recent.stats()["misses"] == 1
+
+    # Warm entry: new reviews go straight into the deque, no re-read
+    horror.add_review("review test one", "take 4")
+    assert review_texts(horror.get_recent_reviews("Review Test One")) == ["take 2", "take 3", "take 4"]
+    assert recent.stats() == {"hits": 1, "misses": 1, "titles": 1}
+
+
+def test_ring_buffer_is_lru_bounded_and_expires(horror, recent, monkeypatch):
+    for title in ("Review Test Two", "Review Test Three", "Review Test Two", "Review Test Four"):
+        horror.get_recent_reviews(title)
+    assert list(recent.entries) == ["review test two", "review test four"]
+
+    # Another worker's write lands in the database but not in this worker's deque
+    horror.get_user_db().execute(
+        "INSERT INTO reviews (title_key, movie_title, user_name, review_text, created_at) VALUES (?, ?, ?, ?, ?)",
+        ("review test two", "Review Test Two", "Anonymous", "written by another worker", "2026-10-18T00:00:00")
+    )
+    assert horror.get_recent_reviews("Review Test Two") == []
+
+    now = horror.time.time()
+    monkeypatch.setattr(horror.time, "time", lambda: now + 31)
+    assert review_texts(horror.get_recent_reviews("Review Test Two")) == ["written by another worker"]
+
+
+def test_deleting_a_review_drops_the_cached_title(horror, recent):
+    review, _ = horror.add_review("Review Test Five", "spoilers")
+    horror.add_review("Review Test Five", "fine")
+    assert len(horror.get_recent_reviews("Review Test Five")) == 2
+    assert horror.delete_review(review["id"])
+    assert "review test five" not in recent.entries
+    assert review_texts(horror.get_recent_reviews("Review Test Five")) == ["fine"]
+    assert not horror.delete_review(review["id"])
+
+
+def test_cursor_pagination_walks_newest_first(horror):
+    for n in range(5):
+        horror.add_review("Review Test Six", f"page {n}")
+    horror.add_review("Review Test Seven", "other title")
+
+    reviews, cursor = horror.list_reviews("Review Test Six", limit=2)
+    assert review_texts(reviews) == ["page 4", "page 3"]
+    reviews, cursor = horror.list_reviews("Review Test Six", cursor, limit=2)
+    assert review_texts(reviews) == ["page 2", "page 1"]
+    reviews, cursor = horror.list_reviews("Review Test Six", cursor, limit=2)
+    assert review_texts(reviews) == ["page 0"]
+    assert cursor is None
+
+    # A review written mid-walk doesn't shift the pages already handed out
+    reviews, cursor = horror.list_reviews("Review Test Six", limit=3)
+    horror.add_review("Review Test Six", "page 5")
+    reviews, cursor = horror.list_reviews("Review Test Six", cursor, limit=3)
+    assert review_texts(reviews) == ["page 1", "page 0"]
+
+
+def test_get_movie_reviews_route(horror):
+    client = horror.app.test_client()
+    for n in range(3):
+        assert client.post("/submit-review", json={"movie_title": "Review Test Eight", "review": f"route {n}"}).status_code == 200
+
+    page = client.get("/get-movie-reviews", query_string={"movie_title": "Review Test Eight", "limit": 2}).get_json()
+    assert [review["text"] for review in page["reviews"]] == ["route 2", "route 1"]
+    page = client.get("/get-movie-reviews", query_string={
+        "movie_title": "Review Test Eight", "limit": 2, "cursor": page["next_cursor"]
+    }).get_json()
+    assert [review["text"] for review in page["reviews"]] == ["route 0"]
+    assert page["next_cursor"] is None
+    assert client.get("/get-movie-reviews").status_code == 400
+
+
+def test_moderation_hook_rejects_before_storing(horror, monkeypatch):
+    monkeypatch.setattr(horror, "review_moderation_hooks", [])
+    horror.review_moderation_hook(lambda review: "No links" if "http" in review["review_text"] else None)
+    client = horror.app.test_client()
+    response = client.post("/submit-review", json={"movie_title": "Review Test Nine", "review": "see http://spam"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "No links"
+    assert horror.count_reviews("Review Test Nine") == 0
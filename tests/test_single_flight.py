@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+
+def run_with_follower(horror, leader_fn, follower_fn):
+    """Start a leader blocked inside leader_fn, join a follower, then let the leader finish"""
+    flight = horror.SingleFlight()
+    entered, release = threading.Event(), threading.Event()
+    outcome = {}
+
+    def leader_body():
+        entered.set()
+        release.wait(5)
+        return leader_fn()
+
+    def leader():
+        try:
+            outcome["leader"] = flight.do("key", leader_body)
+        except BaseException as e:
+            outcome["leader_error"] = e
+
+    def follower():
+        try:
+            outcome["follower"] = flight.do("key", follower_fn)
+        except BaseException as e:
+            outcome["follower_error"] = e
+
+    threads = [threading.Thread(target=leader)]
+    threads[0].start()
+    entered.wait(5)
+    threads.append(threading.Thread(target=follower))
+    threads[1].start()
+    while flight.stats().get("shared", 0) < 1:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return flight, outcome
+
+
+def test_followers_share_the_leaders_result_and_exception(horror):
+    flight, outcome = run_with_follower(horror, lambda: "answer", lambda: pytest.fail("follower ran"))
+    assert outcome == {"leader": "answer", "follower": "answer"}
+
+    def boom():
+        raise ValueError("upstream down")
+    flight, outcome = run_with_follower(horror, boom, lambda: pytest.fail("follower ran"))
+    assert isinstance(outcome["leader_error"], ValueError)
+    assert outcome["follower_error"] is outcome["leader_error"]
+
+
+def test_follower_retries_when_the_leader_is_torn_down(horror):
+    def killed():
+        raise SystemExit(0)
+    flight, outcome = run_with_follower(horror, killed, lambda: "fresh answer")
+    assert isinstance(outcome["leader_error"], SystemExit)
+    assert outcome["follower"] == "fresh answer"
+    assert "follower_error" not in outcome
+    assert flight.stats()["retried"] == 1 and flight.stats()["in_flight"] == 0
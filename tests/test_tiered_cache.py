@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def clock(horror, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(horror.time, "time", lambda: now[0])
+    return now
+
+
+def make_cache(horror, tmp_path, max_items=2):
+    return horror.TieredCache(str(tmp_path / "cache.db"), "details", max_items, ttl=100, negative_ttl=10)
+
+
+def test_values_survive_a_restart_through_the_disk_tier(horror, tmp_path, clock):
+    cache = make_cache(horror, tmp_path)
+    cache.set("halloween", {"title": "Halloween", "year": "1978"})
+
+    reopened = make_cache(horror, tmp_path)
+    assert reopened.get("halloween") == {"title": "Halloween", "year": "1978"}
+    assert reopened.get("halloween") == {"title": "Halloween", "year": "1978"}
+    assert reopened.stats()["disk_hits"] == 1 and reopened.stats()["memory_hits"] == 1
+    assert reopened.get("scream") is horror.CACHE_MISS
+
+
+def test_lru_evicts_from_memory_but_not_from_disk(horror, tmp_path, clock):
+    cache = make_cache(horror, tmp_path, max_items=2)
+    for title in ("a", "b", "c"):
+        cache.set(title, {"title": title})
+    assert list(cache.memory) == ["b", "c"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("a") == {"title": "a"}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_entries_expire_after_their_ttl(horror, tmp_path, clock):
+    cache = make_cache(horror, tmp_path)
+    cache.set("halloween", {"title": "Halloween"})
+    cache.set("short", {"title": "Short"}, ttl=5)
+
+    clock[0] += 6
+    assert cache.get("short") is horror.CACHE_MISS
+    assert cache.get("halloween") == {"title": "Halloween"}
+    clock[0] += 100
+    assert cache.get("halloween") is horror.CACHE_MISS
+    assert make_cache(horror, tmp_path).get("halloween") is horror.CACHE_MISS
+
+
+def test_negative_entries_use_the_negative_ttl(horror, tmp_path, clock):
+    cache = make_cache(horror, tmp_path)
+    cache.set("not a movie", None)
+    assert cache.get("not a movie") is None
+    assert make_cache(horror, tmp_path).get("not a movie") is None
+    assert cache.stats()["negative_hits"] == 1
+
+    clock[0] += 11
+    assert cache.get("not a movie") is horror.CACHE_MISS
@@ -0,0 +1,29 @@
+import sqlite3
+
+import title_index
+from title_index import build_title_index, resolve_title
+
+
+def make_db(titles):
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE movies (id INTEGER PRIMARY KEY, title TEXT NOT NULL, original_title TEXT, '
+                 'adult INTEGER DEFAULT 0, popularity REAL, video INTEGER DEFAULT 0)')
+    conn.executemany('INSERT INTO movies (id, title, original_title, popularity) VALUES (?, ?, ?, ?)',
+                     [(i, title, title, popularity) for i, (title, popularity) in enumerate(titles, 1)])
+    build_title_index(conn)
+    return conn
+
+
+def test_phrase_match_picks_the_most_popular_candidate():
+    conn = make_db([("Night of the Living Dead", 40.0), ("The Living Dead Girl", 5.0),
+                    ("Return of the Living Dead", 20.0), ("Tokyo Story", 90.0)])
+    assert resolve_title(conn, "living dead")["title"] == "Night of the Living Dead"
+    assert resolve_title(conn, "night of the living dead!")["id"] == 1
+    assert resolve_title(conn, "nothing like it") is None
+
+
+def test_phrase_match_only_sorts_the_best_ranked_hits(monkeypatch):
+    # A long title ranks below the short exact-ish one under bm25, however popular it is
+    conn = make_db([("Halloween", 10.0), ("Halloween " + "party " * 30, 99.0)])
+    monkeypatch.setattr(title_index, "FTS_CANDIDATES", 1)
+    assert resolve_title(conn, "halloween!")["id"] == 1
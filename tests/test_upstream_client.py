@@ -0,0 +1,118 @@
+import pytest
+import requests
+
+import upstream_client
+from upstream_client import CircuitBreaker, CircuitOpenError, UpstreamClient, UpstreamError
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class FakeSession:
+    """Hands out the queued outcomes: a status code, or an exception to raise"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def get(self, url, params=None, timeout=None):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(upstream_client.time, "time", clock.time)
+    return clock
+
+
+def make_client(monkeypatch, outcomes, threshold=2, cooldown=30):
+    monkeypatch.setattr(upstream_client, "BREAKER_THRESHOLD", threshold)
+    monkeypatch.setattr(upstream_client, "BREAKER_COOLDOWN", cooldown)
+    client = UpstreamClient()
+    client.sessions["api.example.com"] = FakeSession(outcomes)
+    return client
+
+
+def test_breaker_opens_then_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 31
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_client_opens_and_recovers_the_circuit(clock, monkeypatch):
+    client = make_client(monkeypatch, [503, requests.ConnectionError("down"), 200])
+    url = "https://api.example.com/movie"
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            client.get(url, retries=0)
+    with pytest.raises(CircuitOpenError):
+        client.get(url, retries=0)
+
+    clock.now += 31
+    assert client.get(url, retries=0).status_code == 200
+    assert client.breaker("api.example.com").state == "closed"
+
+
+@pytest.mark.parametrize("error", [ValueError("bad params"), KeyboardInterrupt()])
+def test_trial_that_raises_anything_else_still_settles_the_breaker(clock, monkeypatch, error):
+    client = make_client(monkeypatch, [503, 503, error, 200])
+    url = "https://api.example.com/movie"
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            client.get(url, retries=0)
+
+    clock.now += 31
+    with pytest.raises(type(error)):
+        client.get(url, retries=0)
+    breaker = client.breaker("api.example.com")
+    assert not breaker.trial_in_flight
+    assert breaker.state == "open"
+
+    clock.now += 31
+    assert client.get(url, retries=0).status_code == 200
+
+
+def test_total_budget_caps_retries_and_timeouts(monkeypatch):
+    client = make_client(monkeypatch, [requests.Timeout("slow")] * 10, threshold=100)
+    session = client.sessions["api.example.com"]
+    timeouts = []
+    session_get = session.get
+    monkeypatch.setattr(session, "get", lambda url, params=None, timeout=None: timeouts.append(timeout) or session_get(url))
+    monkeypatch.setattr(UpstreamClient, "backoff_delay", staticmethod(lambda attempt, response=None: 0.2))
+
+    started = upstream_client.time.monotonic()
+    with pytest.raises(UpstreamError):
+        client.get("https://api.example.com/movie", timeout=(3.05, 5), retries=9, budget=0.5)
+    assert upstream_client.time.monotonic() - started < 1.0
+    assert 1 <= len(timeouts) <= 3
+    assert all(max(timeout) <= 0.5 for timeout in timeouts)
+    assert client.stats()["hosts"]["api.example.com"]["budget_exhausted"] == 1
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def fresh_store(horror, tmp_path, monkeypatch):
+    """An empty user store in tmp_path, with user_data.json read from there too"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(horror, "USER_DB_FILE", str(tmp_path / "user_data.db"))
+    monkeypatch.setattr(horror.user_db_local, "conn", None)
+    return tmp_path
+
+
+def test_list_and_rating_upserts(horror):
+    assert horror.add_to_list("store-user-1", "Halloween") == ["Halloween"]
+    assert horror.add_to_list("store-user-1", "Halloween") == ["Halloween"]
+    assert horror.add_to_list("store-user-1", "The Thing") == ["Halloween", "The Thing"]
+
+    horror.set_rating("store-user-1", "Halloween", 4)
+    horror.set_rating("store-user-1", "Halloween", 5)
+    horror.set_rating("store-user-1", "The Thing", 3)
+
+    user = horror.get_user("store-user-1")
+    assert user["myList"] == ["Halloween", "The Thing"]
+    assert user["ratings"] == {"Halloween": 5, "The Thing": 3}
+    assert user["history"] == []
+    assert user["horror_profile"] == "New Horror Fan"
+    rows = horror.get_user_db().execute("SELECT COUNT(*) FROM users WHERE google_id = 'store-user-1'").fetchone()
+    assert rows[0] == 1
+
+
+def test_user_routes_round_trip(horror):
+    client = horror.app.test_client()
+    assert client.post("/get-user-data", json={"googleId": "store-user-2"}).get_json()["myList"] == []
+    assert horror.get_user("store-user-2") is None
+
+    client.post("/save-to-list", json={"googleId": "store-user-2", "movie": "Alien"})
+    client.post("/save-rating", json={"googleId": "store-user-2", "movie": "Alien", "rating": 5})
+    user = client.post("/get-user-data", json={"googleId": "store-user-2"}).get_json()
+    assert user["myList"] == ["Alien"]
+    assert user["ratings"] == {"Alien": 5}
+    assert client.post("/save-to-list", json={"movie": "Alien"}).status_code == 400
+
+
+def test_json_store_is_migrated_once(horror, fresh_store):
+    (fresh_store / "user_data.json").write_text(json.dumps({
+        "legacy-user": {
+            "myList": ["Scream"],
+            "ratings": {"Scream": 4},
+            "history": ["Scream"],
+            "genre_searches": {"slashers": 3},
+            "horror_profile": "Slasher Fan",
+        }
+    }))
+    horror.init_user_store()
+    user = horror.get_user("legacy-user")
+    assert user["myList"] == ["Scream"]
+    assert user["ratings"] == {"Scream": 4}
+    assert user["history"] == ["Scream"]
+    assert user["genre_searches"] == {"slashers": 3}
+    assert user["horror_profile"] == "Slasher Fan"
+
+    # Changes made after the migration survive a restart - the JSON file isn't re-imported
+    horror.add_to_list("legacy-user", "Halloween")
+    horror.init_user_store()
+    assert horror.get_user("legacy-user")["myList"] == ["Scream", "Halloween"]
@@ -0,0 +1,81 @@
+import numpy as np
+
+from fake_openai import FakeOpenAI
+from vector_index import LocalVectorIndex, top_k_rows
+
+
+def vector(id, values, cache_key=None, **metadata):
+    return {"id": id, "values": values, "metadata": dict(metadata, cache_key=cache_key or id)}
+
+
+def test_top_k_rows_is_best_first():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.8, 0.2, 0.6, 0.0]], dtype=np.float32)
+    assert top_k_rows(scores, 2).tolist() == [[1, 3], [0, 2]]
+    assert top_k_rows(scores[0], 10).tolist() == [1, 3, 2, 0]
+
+
+def test_query_ranks_by_cosine_similarity(tmp_path):
+    index = LocalVectorIndex(str(tmp_path / "index"), writable=True)
+    index.upsert(vectors=[vector("a", [1, 0, 0]), vector("b", [1, 1, 0]), vector("c", [0, 0, 5])])
+
+    matches = index.query(vector=[2, 0.1, 0], top_k=2, include_metadata=True)["matches"]
+    assert [m["id"] for m in matches] == ["a", "b"]
+    assert abs(matches[0]["score"] - 0.99875) < 1e-3
+    assert matches[1]["metadata"]["cache_key"] == "b"
+    assert [m["id"] for m in index.similar("a", top_k=1)] == ["b"]
+    assert index.similar("unknown") is None
+    assert [[m["id"] for m in ms] for ms in index.query_many([[0, 0, 1], [0, 1, 0]], top_k=1)] == [["c"], ["b"]]
+
+
+def test_upsert_overwrites_an_existing_id(tmp_path):
+    index = LocalVectorIndex(str(tmp_path / "index"), writable=True)
+    index.upsert(vectors=[vector("a", [1, 0], cache_key="old title"), vector("b", [0, 1])])
+    index.upsert(vectors=[vector("a", [0, 1], cache_key="new title")])
+
+    assert len(index) == 2
+    assert np.allclose(index.matrix[0], [0, 1])
+    assert "old title" not in index.key_positions
+    assert index.similar("old title") is None
+    assert [m["id"] for m in index.similar("new title", top_k=1)] == ["b"]
+
+    reopened = LocalVectorIndex(str(tmp_path / "index"))
+    assert set(reopened.key_positions) == {"new title", "b"}
+
+
+def test_reader_reopened_after_the_writer_grows_sees_new_rows(tmp_path):
+    path = str(tmp_path / "index")
+    writer = LocalVectorIndex(path, writable=True)
+    writer.upsert(vectors=[vector("a", [1, 0, 0])])
+    reader = LocalVectorIndex(path)
+    assert len(reader) == 1
+
+    writer.upsert(vectors=[vector("b", [0, 1, 0]), vector("c", [0, 0, 1])])
+    assert len(reader) == 1  # a reader keeps the rows it mapped
+    assert [m["id"] for m in reader.query(vector=[0, 1, 0], top_k=1)["matches"]] == ["a"]
+
+    reader.close()
+    reader = LocalVectorIndex(path)
+    assert len(reader) == 3
+    assert [m["id"] for m in reader.query(vector=[0, 1, 0], top_k=1)["matches"]] == ["b"]
+
+
+def test_semantic_search_uses_the_local_index(horror, tmp_path, monkeypatch):
+    fake = FakeOpenAI(embedding_dim=64)
+    path = str(tmp_path / "semantic_index")
+    plots = {"Night of the Living Dead": "zombies rise from the grave and attack a farmhouse",
+             "Nosferatu": "a vampire count travels to a plague stricken town by ship"}
+    writer = LocalVectorIndex(path, writable=True)
+    writer.upsert(vectors=[vector(title, fake.embeddings.create(model="m", input=[plot]).data[0].embedding,
+                                  cache_key=title.lower(), title=title, year="1968", poster="", genres="", plot=plot)
+                           for title, plot in plots.items()])
+
+    monkeypatch.setattr(horror, "client", fake)
+    monkeypatch.setattr(horror, "index", None)
+    monkeypatch.setattr(horror, "VECTOR_INDEX_PATH", path)
+    monkeypatch.setitem(horror.local_vectors, "index", None)
+    monkeypatch.setitem(horror.local_vectors, "checked_at", 0)
+    monkeypatch.setitem(horror.local_vectors, "mtime", None)
+
+    matches = horror.semantic_search("zombies attack the farmhouse", top_k=2)
+    assert matches[0]["title"] == "Night of the Living Dead"
+    assert all(m["score"] >= horror.SEMANTIC_MIN_SCORE for m in matches)
@@ -0,0 +1,244 @@
+"""
+Title index for horror_movies.db
+Builds an FTS5 full-text index over movies.title / original_title so a typed
+title resolves to a TMDB id locally, instead of a LIKE '%x%' scan or a
+search/movie round-trip, plus the compact horror_movies subset table.
+"""
+
+import re
+import unicodedata
+
+FTS_TABLE = "movies_fts"
+
+# Phrase matches ranked by bm25 before picking the most popular - common words
+# like "night" match tens of thousands of rows, and sorting all of them is slow
+FTS_CANDIDATES = 50
+
+
+def create_title_indexes(cursor):
+    """Exact, case-insensitive matches go through plain B-tree indexes"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_title_nocase ON movies(title COLLATE NOCASE)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_original_title_nocase ON movies(original_title COLLATE NOCASE)')
+
+
+def build_title_index(conn):
+    """Create the NOCASE title indexes and (re)build the FTS5 table from movies"""
+    cursor = conn.cursor()
+    create_title_indexes(cursor)
+
+    # External-content FTS5 table: stores only the token index, rows live in movies
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            title,
+            original_title,
+            content='movies',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+    conn.commit()
+
+
+def has_title_index(conn):
+    """True if the database has a movies table with a built FTS index"""
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "movies" not in tables or FTS_TABLE not in tables:
+            return False
+        return conn.execute('SELECT 1 FROM movies LIMIT 1').fetchone() is not None
+    except Exception:
+        return False
+
+
+def fts_phrase(title):
+    """Turn free text into a safe FTS5 phrase query ("night of the living dead")"""
+    tokens = re.findall(r"\w+", title.lower())
+    if not tokens:
+        return None
+    return '"' + " ".join(tokens) + '"'
+
+
+def resolve_title(conn, title):
+    """Resolve a title to the most popular matching movie row, or None"""
+    title = title.strip()
+    if not title:
+        return None
+
+    # STEP 1: Exact title match (uses the NOCASE indexes)
+    row = conn.execute('''
+        SELECT id, title, original_title, popularity FROM movies WHERE title = ? COLLATE NOCASE
+        UNION ALL
+        SELECT id, title, original_title, popularity FROM movies WHERE original_title = ? COLLATE NOCASE
+        ORDER BY popularity DESC
+        LIMIT 1
+    ''', (title, title)).fetchone()
+
+    # STEP 2: Phrase match on the full-text index
+    if not row:
+        phrase = fts_phrase(title)
+        if not phrase:
+            return None
+        row = conn.execute(f'''
+            SELECT m.id, m.title, m.original_title, m.popularity
+            FROM (
+                SELECT rowid FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            ) f
+            JOIN movies m ON m.id = f.rowid
+            ORDER BY m.popularity DESC
+            LIMIT 1
+        ''', (phrase, FTS_CANDIDATES)).fetchone()
+
+    if not row:
+        return None
+
+    return {
+        "id": row[0],
+        "title": row[1],
+        "original_title": row[2],
+        "popularity": row[3]
+    }
+
+
+# ----- HORROR SUBSET -----
+# Compact table of horror movies only (built by `import_tmdb.py --horror-subset`),
+# small enough to stay in the page cache. Title lookups try it before the full export.
+
+HORROR_TABLE = "horror_movies"
+
+# TMDB movie genre id -> bit in horror_movies.genre_flags
+GENRE_BITS = {
+    27: 1 << 0,      # Horror
+    53: 1 << 1,      # Thriller
+    9648: 1 << 2,    # Mystery
+    878: 1 << 3,     # Science Fiction
+    14: 1 << 4,      # Fantasy
+    35: 1 << 5,      # Comedy
+    28: 1 << 6,      # Action
+    12: 1 << 7,      # Adventure
+    18: 1 << 8,      # Drama
+    80: 1 << 9,      # Crime
+    16: 1 << 10,     # Animation
+    10749: 1 << 11,  # Romance
+    99: 1 << 12,     # Documentary
+    10751: 1 << 13,  # Family
+    36: 1 << 14,     # History
+    10402: 1 << 15,  # Music
+    10770: 1 << 16,  # TV Movie
+    10752: 1 << 17,  # War
+    37: 1 << 18,     # Western
+}
+
+
+def genre_flags(genre_ids):
+    """Pack a list of TMDB genre ids into a bitmask"""
+    flags = 0
+    for genre_id in genre_ids or []:
+        flags |= GENRE_BITS.get(genre_id, 0)
+    return flags
+
+
+def normalize_title_key(title):
+    """Lookup key for a title: accents stripped, lowercase, punctuation collapsed
+    ("Don't Breathe" / "dont breathe" / "DON'T  BREATHE!" all match)"""
+    decomposed = unicodedata.normalize("NFKD", title or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    stripped = stripped.lower().replace("'", "").replace("’", "").replace("&", " and ")
+    return " ".join(re.findall(r"\w+", stripped))
+
+
+def create_horror_table(conn):
+    """Create the horror_movies subset table and its key indexes"""
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {HORROR_TABLE} (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            original_title TEXT,
+            title_key TEXT NOT NULL,
+            original_title_key TEXT,
+            year INTEGER,
+            genre_flags INTEGER NOT NULL DEFAULT 0,
+            poster_path TEXT,
+            popularity REAL,
+            updated_at REAL
+        )
+    ''')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_horror_title_key ON {HORROR_TABLE}(title_key)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_horror_original_title_key ON {HORROR_TABLE}(original_title_key)')
+
+
+def horror_row_from_tmdb(movie, updated_at):
+    """horror_movies row from a TMDB discover/list result"""
+    release_date = movie.get("release_date") or ""
+    title = movie.get("title") or movie.get("original_title") or ""
+    original_title = movie.get("original_title") or title
+    return (
+        movie["id"],
+        title,
+        original_title,
+        normalize_title_key(title),
+        normalize_title_key(original_title),
+        int(release_date[:4]) if release_date[:4].isdigit() else None,
+        genre_flags(movie.get("genre_ids")),
+        movie.get("poster_path"),
+        movie.get("popularity"),
+        updated_at
+    )
+
+
+def upsert_horror_movies(conn, rows):
+    """Insert or refresh horror_movies rows (caller commits)"""
+    conn.executemany(f'''
+        INSERT INTO {HORROR_TABLE}
+        (id, title, original_title, title_key, original_title_key, year, genre_flags, poster_path, popularity, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            title = excluded.title,
+            original_title = excluded.original_title,
+            title_key = excluded.title_key,
+            original_title_key = excluded.original_title_key,
+            year = excluded.year,
+            genre_flags = excluded.genre_flags,
+            poster_path = excluded.poster_path,
+            popularity = excluded.popularity,
+            updated_at = excluded.updated_at
+    ''', rows)
+
+
+def has_horror_table(conn):
+    """True if the horror_movies subset has been built"""
+    try:
+        return conn.execute(f'SELECT 1 FROM {HORROR_TABLE} LIMIT 1').fetchone() is not None
+    except Exception:
+        return False
+
+
+def resolve_horror_title(conn, title):
+    """Resolve a title against the horror subset by normalized key, or None"""
+    key = normalize_title_key(title)
+    if not key:
+        return None
+
+    row = conn.execute(f'''
+        SELECT id, title, original_title, popularity, year, poster_path, genre_flags FROM {HORROR_TABLE} WHERE title_key = ?
+        UNION ALL
+        SELECT id, title, original_title, popularity, year, poster_path, genre_flags FROM {HORROR_TABLE} WHERE original_title_key = ?
+        ORDER BY popularity DESC
+        LIMIT 1
+    ''', (key, key)).fetchone()
+
+    if not row:
+        return None
+
+    return {
+        "id": row[0],
+        "title": row[1],
+        "original_title": row[2],
+        "popularity": row[3],
+        "year": row[4],
+        "poster_path": row[5],
+        "genre_flags": row[6]
+    }
@@ -0,0 +1,315 @@
+"""
+Shared HTTP client for upstream APIs (TMDB, OMDB)
+One pooled keep-alive session per host, uniform connect/read timeouts,
+bounded retries with jittered backoff, a circuit breaker and optional
+token-bucket rate limit per provider, and per-host latency/error counters.
+
+    import upstream_client as upstream
+    response = upstream.get("https://api.themoviedb.org/3/movie/694", params={...})
+"""
+
+import os
+import time
+import random
+import threading
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "5"))
+MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.25"))  # seconds, doubled per attempt
+BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "4"))
+POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "32"))
+# Wall-clock cap on one get(), retries and backoff included (callers on a request path pass less)
+TOTAL_BUDGET = float(os.getenv("UPSTREAM_TOTAL_BUDGET", "20"))
+
+# Circuit breaker: this many consecutive failures opens the circuit for BREAKER_COOLDOWN seconds
+BREAKER_THRESHOLD = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("UPSTREAM_BREAKER_COOLDOWN", "30"))
+
+PROVIDERS = {
+    "api.themoviedb.org": "tmdb",
+    "www.omdbapi.com": "omdb",
+    "omdbapi.com": "omdb",
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """An upstream call failed after all retries"""
+
+
+class CircuitOpenError(UpstreamError):
+    """The provider's circuit is open - the call was not attempted"""
+
+
+def provider_for(host):
+    """Provider name for a host (unknown hosts are their own provider)"""
+    return PROVIDERS.get(host, host)
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open after `cooldown`"""
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.time() - self.opened_at < self.cooldown:
+                return False
+            # Half-open: let a single trial request through
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.time()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.time() - self.opened_at < self.cooldown:
+                return "open"
+            return "half-open"
+
+
+class TokenBucket:
+    """Token-bucket rate limiter with adaptive backoff.
+
+    acquire() blocks until a request may go out. throttle() (called on HTTP
+    429) halves the rate and pauses the bucket; recover() creeps the rate back
+    up towards the configured maximum on each success.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def throttle(self, pause=1.0):
+        with self.lock:
+            now = time.monotonic()
+            # Concurrent workers tend to hit the same 429 burst - only back off once per pause
+            if now >= self.paused_until:
+                self.rate = max(self.max_rate * 0.05, self.rate / 2)
+            self.tokens = 0
+            self.paused_until = max(self.paused_until, now + pause)
+
+    def recover(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.02)
+
+
+class UpstreamClient:
+    """Pooled sessions, retries and circuit breakers for every upstream host"""
+
+    def __init__(self):
+        self.sessions = {}
+        self.breakers = {}
+        self.buckets = {}
+        self.counters = defaultdict(lambda: defaultdict(int))
+        self.latencies = defaultdict(lambda: deque(maxlen=500))
+        self.lock = threading.Lock()
+
+    def _session(self, host):
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[host] = session
+            return session
+
+    def breaker(self, provider):
+        with self.lock:
+            breaker = self.breakers.get(provider)
+            if breaker is None:
+                breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+                self.breakers[provider] = breaker
+            return breaker
+
+    def set_rate_limit(self, provider, rate, burst=None):
+        """Cap requests per second to a provider (None removes the cap)"""
+        with self.lock:
+            if rate:
+                self.buckets[provider] = TokenBucket(rate, burst)
+            else:
+                self.buckets.pop(provider, None)
+
+    def _record(self, host, key, latency=None):
+        with self.lock:
+            self.counters[host][key] += 1
+            if latency is not None:
+                self.latencies[host].append(latency)
+
+    @staticmethod
+    def backoff_delay(attempt, response=None):
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends one"""
+        if response is not None and response.headers.get("Retry-After"):
+            try:
+                return min(float(response.headers["Retry-After"]), BACKOFF_MAX)
+            except ValueError:
+                pass
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    @staticmethod
+    def clamp_timeout(timeout, remaining):
+        """A requests timeout (float or (connect, read)) cut down to the remaining budget"""
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+    def get(self, url, params=None, timeout=None, retries=None, budget=None):
+        """GET with pooling, timeouts, retries and the provider's circuit breaker.
+
+        Returns the requests.Response (4xx included - those are answers, not
+        outages). Raises UpstreamError once retries or the `budget` (seconds,
+        all attempts and backoff together) are exhausted, or CircuitOpenError
+        without calling out if the provider is failing.
+        """
+        host = urlparse(url).hostname or ""
+        provider = provider_for(host)
+        breaker = self.breaker(provider)
+        timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+        retries = MAX_RETRIES if retries is None else retries
+        deadline = time.monotonic() + (TOTAL_BUDGET if budget is None else budget)
+
+        if not breaker.allow():
+            self._record(host, "short_circuited")
+            raise CircuitOpenError(f"{provider} circuit is open")
+
+        # Whatever happens below - including errors that aren't RequestExceptions -
+        # the breaker has to hear about it, or a half-open trial stays in flight forever
+        settled = False
+        try:
+            session = self._session(host)
+            bucket = self.buckets.get(provider)
+            last_error = None
+
+            for attempt in range(retries + 1):
+                if attempt:
+                    self._record(host, "retries")
+                if bucket:
+                    bucket.acquire()
+                started = time.perf_counter()
+                response = None
+                try:
+                    remaining = max(0.1, deadline - time.monotonic())
+                    response = session.get(url, params=params, timeout=self.clamp_timeout(timeout, remaining))
+                    latency = time.perf_counter() - started
+                    if response.status_code not in RETRY_STATUSES:
+                        self._record(host, "requests", latency)
+                        breaker.record_success()
+                        settled = True
+                        if bucket:
+                            bucket.recover()
+                        return response
+                    self._record(host, "requests", latency)
+                    self._record(host, f"status_{response.status_code}")
+                    if response.status_code == 429 and bucket:
+                        bucket.throttle(self.backoff_delay(attempt, response) or BACKOFF_BASE)
+                    last_error = UpstreamError(f"{provider} returned HTTP {response.status_code}")
+                except requests.RequestException as e:
+                    self._record(host, "requests", time.perf_counter() - started)
+                    self._record(host, "timeouts" if isinstance(e, requests.Timeout) else "connection_errors")
+                    last_error = UpstreamError(f"{provider} request failed: {e}")
+
+                if attempt < retries:
+                    delay = self.backoff_delay(attempt, response)
+                    # Not worth a retry that would start after the budget is spent
+                    if time.monotonic() + delay >= deadline:
+                        self._record(host, "budget_exhausted")
+                        break
+                    time.sleep(delay)
+
+            self._record(host, "errors")
+            breaker.record_failure()
+            settled = True
+            raise last_error
+        finally:
+            if not settled:
+                breaker.record_failure()
+
+    def stats(self):
+        """Per-host counters and latency percentiles (ms), plus breaker states"""
+        with self.lock:
+            hosts = {}
+            for host, counters in self.counters.items():
+                samples = sorted(self.latencies[host])
+                entry = dict(counters)
+                if samples:
+                    entry["latency_ms"] = {
+                        "p50": round(samples[len(samples) // 2] * 1000, 1),
+                        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1),
+                        "max": round(samples[-1] * 1000, 1),
+                    }
+                hosts[host] = entry
+            breakers = list(self.breakers.items())
+            rate_limits = {provider: round(bucket.rate, 2) for provider, bucket in self.buckets.items()}
+        return {
+            "hosts": hosts,
+            "circuits": {provider: breaker.state for provider, breaker in breakers},
+            "rate_limits": rate_limits
+        }
+
+
+default_client = UpstreamClient()
+
+
+def get(url, params=None, timeout=None, retries=None, budget=None):
+    """GET through the shared client (see UpstreamClient.get)"""
+    return default_client.get(url, params=params, timeout=timeout, retries=retries, budget=budget)
+
+
+def set_rate_limit(provider, rate, burst=None):
+    """Rate-limit a provider on the shared client"""
+    default_client.set_rate_limit(provider, rate, burst)
+
+
+def stats():
+    """Counters for the shared client"""
+    return default_client.stats()
@@ -0,0 +1,131 @@
+"""
+DAVE'S SCREAMING OFFICIAL LLM CHATBOT
+Vector Search Benchmark Script
+Times top-k queries against the local memory-mapped index (single and batched)
+and, if PINECONE_API_KEY is set, the same queries against the Pinecone index.
+
+    python vector-benchmark.py --queries 200
+    python vector-benchmark.py --synthetic 50000   # random catalogue, no build needed
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import time
+import shutil
+import tempfile
+import argparse
+
+import numpy as np
+
+from vector_index import LocalVectorIndex, VECTOR_INDEX_PATH
+
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+INDEX_NAME = "horror-movies"
+
+
+def percentiles(samples):
+    """p50/p95/max of a list of seconds, as milliseconds"""
+    samples = sorted(samples)
+    return {
+        "p50": samples[len(samples) // 2] * 1000,
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "max": samples[-1] * 1000
+    }
+
+
+def report(label, samples):
+    stats = percentiles(samples)
+    print(f"  {label:<28} p50 {stats['p50']:9.3f} ms   p95 {stats['p95']:9.3f} ms   max {stats['max']:9.3f} ms")
+
+
+def build_synthetic_index(path, count, dimension):
+    """Random unit vectors, written in batches like the real builder does"""
+    index = LocalVectorIndex(path, writable=True)
+    rng = np.random.default_rng(27)
+    for start in range(0, count, 5000):
+        rows = rng.standard_normal((min(5000, count - start), dimension)).astype(np.float32)
+        index.upsert(vectors=[
+            {"id": f"movie-{start + i}", "values": row, "metadata": {"title": f"Movie {start + i}", "cache_key": f"movie {start + i}"}}
+            for i, row in enumerate(rows)
+        ])
+    index.close()
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark local vs Pinecone vector search")
+    parser.add_argument("--queries", type=int, default=200, help="number of query vectors")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, default=0, help="benchmark a random index of this many movies instead")
+    parser.add_argument("--dimension", type=int, default=1536, help="vector size for --synthetic")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = VECTOR_INDEX_PATH
+    if args.synthetic:
+        tmp_dir = tempfile.mkdtemp(prefix="vector-bench-")
+        path = os.path.join(tmp_dir, "semantic_index")
+        print(f"🧪 Building synthetic index: {args.synthetic} x {args.dimension}...")
+        build_synthetic_index(path, args.synthetic, args.dimension)
+
+    try:
+        index = LocalVectorIndex(path)
+        if not len(index):
+            print("❌ Local vector index is empty - run semantic-index-builder.py --local (or pass --synthetic N)")
+            return
+
+        # Query with perturbed copies of stored vectors, so results are realistic
+        rng = np.random.default_rng(13)
+        rows = rng.integers(0, len(index), args.queries)
+        queries = np.asarray(index.matrix[rows]) + rng.normal(0, 0.01, (args.queries, index.dimension)).astype(np.float32)
+
+        print("🩸 VECTOR SEARCH BENCHMARK 🩸")
+        print("=" * 50)
+        print(f"Index: {len(index)} vectors x {index.dimension} dims | {args.queries} queries | top_k={args.top_k}")
+
+        # Warm the page cache once so the first query doesn't pay for the disk read
+        index.query(vector=queries[0], top_k=args.top_k)
+
+        samples = []
+        for query in queries:
+            started = time.perf_counter()
+            index.query(vector=query, top_k=args.top_k, include_metadata=True)
+            samples.append(time.perf_counter() - started)
+        report("local query", samples)
+
+        started = time.perf_counter()
+        index.query_many(queries, top_k=args.top_k, include_metadata=True)
+        batched = time.perf_counter() - started
+        print(f"  {'local query_many (batched)':<28} {batched * 1000:9.3f} ms total, {batched / args.queries * 1000:.3f} ms/query")
+
+        samples = []
+        keys = [index.keys[row] for row in rows if index.keys[row]]
+        for key in keys:
+            started = time.perf_counter()
+            index.similar(key, top_k=args.top_k)
+            samples.append(time.perf_counter() - started)
+        if samples:
+            report("local similar (by title)", samples)
+
+        if PINECONE_API_KEY and not args.synthetic:
+            from pinecone import Pinecone
+            remote = Pinecone(api_key=PINECONE_API_KEY).Index(INDEX_NAME)
+            samples = []
+            for query in queries:
+                started = time.perf_counter()
+                remote.query(vector=query.tolist(), top_k=args.top_k, include_metadata=True)
+                samples.append(time.perf_counter() - started)
+            report("pinecone query", samples)
+        else:
+            print("  pinecone query               skipped (no PINECONE_API_KEY, or --synthetic)")
+        print("=" * 50)
+        index.close()
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
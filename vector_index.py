@@ -0,0 +1,252 @@
+"""
+Local vector index
+In-process stand-in for the Pinecone "horror-movies" index, so semantic search
+works (and can be tested) without Pinecone or a network hop. Same calling
+convention as a Pinecone Index for the parts the app uses:
+
+    index.upsert(vectors=[{"id": ..., "values": [...], "metadata": {...}}])
+    index.query(vector=[...], top_k=5, include_metadata=True)["matches"]
+
+Storage is two files next to each other:
+    semantic_index.f32  contiguous float32 rows (L2-normalized), memory-mapped read-only
+    semantic_index.db   side table: row number -> vector id, movie cache key (from metadata), metadata
+
+Cosine similarity is then one matrix-vector product over the mapped matrix,
+and top-k uses argpartition instead of a full sort.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "semantic_index")
+
+
+def vector_id(cache_key):
+    """Stable ASCII vector id for a movie cache key (Pinecone ids must be ASCII)"""
+    return "movie-" + hashlib.sha1(cache_key.encode("utf-8")).hexdigest()[:20]
+
+
+def normalize_rows(matrix):
+    """L2-normalize each row (zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_rows(scores, top_k):
+    """Indices of the top_k scores along the last axis, best first"""
+    n = scores.shape[-1]
+    if top_k >= n:
+        return np.argsort(-scores, axis=-1)
+    candidates = np.argpartition(-scores, top_k - 1, axis=-1)[..., :top_k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1)
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+class LocalVectorIndex:
+    """Memory-mapped float32 cosine-similarity index with a Pinecone-like upsert/query API"""
+
+    def __init__(self, path=VECTOR_INDEX_PATH, writable=False):
+        self.path = path
+        self.matrix_path = path + ".f32"
+        self.table_path = path + ".db"
+        self.writable = writable
+        self.lock = threading.Lock()
+        self.dimension = 0
+        self.ids = []
+        self.keys = []
+        self.metadata = []
+        self.positions = {}
+        self.key_positions = {}
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+        if writable or os.path.exists(self.table_path):
+            self.conn = sqlite3.connect(self.table_path, check_same_thread=False)
+            if writable:
+                self.conn.execute('PRAGMA journal_mode=WAL')
+                self.conn.executescript('''
+                    CREATE TABLE IF NOT EXISTS vectors (
+                        row INTEGER PRIMARY KEY,
+                        id TEXT NOT NULL UNIQUE,
+                        cache_key TEXT,
+                        metadata TEXT NOT NULL
+                    );
+                    CREATE TABLE IF NOT EXISTS index_meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    );
+                ''')
+            self.load()
+        else:
+            self.conn = None
+
+    # ----- loading -----
+
+    def load(self):
+        """Read the side table and map the matrix rows it covers"""
+        try:
+            row = self.conn.execute("SELECT value FROM index_meta WHERE key = 'dimension'").fetchone()
+            rows = self.conn.execute('SELECT row, id, cache_key, metadata FROM vectors ORDER BY row').fetchall()
+        except sqlite3.Error:
+            return
+        self.dimension = int(row[0]) if row else 0
+
+        self.ids = [r[1] for r in rows]
+        self.keys = [r[2] for r in rows]
+        self.metadata = [r[3] for r in rows]  # parsed on demand, only for returned matches
+        self.positions = {vid: i for i, vid in enumerate(self.ids)}
+        self.key_positions = {key: i for i, key in enumerate(self.keys) if key}
+        self._map_matrix()
+
+    def _map_matrix(self):
+        count = len(self.ids)
+        if not count or not self.dimension:
+            self.matrix = np.zeros((0, self.dimension), dtype=np.float32)
+            return
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(count, self.dimension))
+
+    # ----- writes -----
+
+    def upsert(self, vectors, **kwargs):
+        """Insert or replace vectors given as dicts or (id, values, metadata) tuples.
+        Rows are written straight to disk; the side-table commit publishes them."""
+        if not self.writable:
+            raise RuntimeError("LocalVectorIndex opened read-only")
+
+        records = []
+        for vector in vectors:
+            if isinstance(vector, dict):
+                records.append((vector["id"], vector["values"], vector.get("metadata") or {}))
+            else:
+                records.append((vector[0], vector[1], vector[2] if len(vector) > 2 else {}))
+        if not records:
+            return {"upserted_count": 0}
+
+        values = normalize_rows(np.asarray([r[1] for r in records], dtype=np.float32))
+        with self.lock:
+            if not self.dimension:
+                self.dimension = values.shape[1]
+                self.conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('dimension', ?)", (str(self.dimension),))
+            if values.shape[1] != self.dimension:
+                raise ValueError(f"dimension {values.shape[1]} does not match index dimension {self.dimension}")
+
+            row_bytes = self.dimension * 4
+            mode = "r+b" if os.path.exists(self.matrix_path) else "w+b"
+            with open(self.matrix_path, mode) as f:
+                for (vid, _, metadata), row in zip(records, values):
+                    cache_key = metadata.get("cache_key")
+                    position = self.positions.get(vid)
+                    if position is None:
+                        position = len(self.ids)
+                        self.positions[vid] = position
+                        self.ids.append(vid)
+                        self.keys.append(cache_key)
+                        self.metadata.append(None)
+                    metadata_json = json.dumps(metadata)
+                    self.metadata[position] = metadata_json
+                    if cache_key:
+                        # Re-keyed vector: the old key must not keep pointing at this row
+                        old_key = self.keys[position]
+                        if old_key and old_key != cache_key and self.key_positions.get(old_key) == position:
+                            del self.key_positions[old_key]
+                        self.keys[position] = cache_key
+                        self.key_positions[cache_key] = position
+                    f.seek(position * row_bytes)
+                    f.write(row.tobytes())
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO vectors (row, id, cache_key, metadata) VALUES (?, ?, ?, ?)',
+                        (position, vid, self.keys[position], metadata_json)
+                    )
+                f.flush()
+                os.fsync(f.fileno())
+            self.conn.commit()
+            self._map_matrix()
+        return {"upserted_count": len(records)}
+
+    # ----- queries -----
+
+    def _matches(self, positions, scores, include_metadata):
+        matches = []
+        for position in positions:
+            match = {"id": self.ids[position], "score": float(scores[position])}
+            if include_metadata:
+                match["metadata"] = json.loads(self.metadata[position])
+            matches.append(match)
+        return matches
+
+    def query(self, vector=None, top_k=10, include_metadata=False, id=None, **kwargs):
+        """Top-k cosine matches for a vector (or a stored id): {"matches": [{"id", "score", "metadata"}]}"""
+        matrix = self.matrix
+        if not len(matrix):
+            return {"matches": []}
+        if vector is None:
+            if id not in self.positions:
+                return {"matches": []}
+            query = np.asarray(matrix[self.positions[id]])
+        else:
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm:
+                query = query / norm
+
+        scores = matrix @ query
+        return {"matches": self._matches(top_k_rows(scores, top_k), scores, include_metadata)}
+
+    def query_many(self, vectors, top_k=10, include_metadata=False):
+        """Batched query: one matrix product for all query vectors. Returns a list of match lists"""
+        matrix = self.matrix
+        queries = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if not len(matrix):
+            return [[] for _ in queries]
+        scores = queries @ matrix.T
+        best = top_k_rows(scores, top_k)
+        return [self._matches(best[i], scores[i], include_metadata) for i in range(len(queries))]
+
+    def similar(self, cache_key, top_k=5):
+        """Movies most similar to an indexed movie (excluding itself), or None if it isn't indexed"""
+        position = self.key_positions.get(cache_key)
+        if position is None:
+            return None
+        matches = self.query(id=self.ids[position], top_k=top_k + 1, include_metadata=True)["matches"]
+        return [m for m in matches if m["id"] != self.ids[position]][:top_k]
+
+    def describe_index_stats(self):
+        return {"dimension": self.dimension, "total_vector_count": len(self.ids)}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def movie_embedding_text(details):
+    """Text embedded for a movie: title, year, genres and plot"""
+    parts = [details.get("title") or ""]
+    if details.get("year"):
+        parts[0] += f" ({details['year']})"
+    if details.get("genres"):
+        parts.append(f"Genres: {details['genres']}")
+    if details.get("director"):
+        parts.append(f"Directed by {details['director']}")
+    if details.get("plot") and details["plot"] != "N/A":
+        parts.append(details["plot"])
+    return ". ".join(parts)
+
+
+def movie_metadata(cache_key, details):
+    """Metadata stored next to a movie's vector (enough to render a recommendation card)"""
+    return {
+        "cache_key": cache_key,
+        "title": details.get("title") or "",
+        "year": str(details.get("year") or ""),
+        "poster": details.get("poster") or "",
+        "genres": details.get("genres") or "",
+        "plot": (details.get("plot") or "")[:300]
+    }